@@ -13,6 +13,7 @@ from paz.abstract import messages
 from paz.abstract import processor
 from paz.abstract import loader
 from paz.abstract import sequence
+from paz.abstract import columnar
 from paz import models
 from paz import processors
 from paz.optimization import losses
@@ -21,6 +22,7 @@ from paz import datasets
 from paz import pipelines
 from paz.utils import logger
 from paz.utils import documentation
+from paz.utils import profiler
 
 EXCLUDE = {}
 
@@ -45,6 +47,12 @@ PAGES = [
             boxes.apply_non_max_suppression,
             boxes.nms_per_class,
             boxes._nms_per_class,
+            boxes.nms_per_class_batched,
+            boxes.nms_per_class_args,
+            boxes.nms_per_class_batch,
+            boxes.select_nms_candidates,
+            boxes.apply_batched_non_max_suppression,
+            boxes.decode_and_suppress,
             boxes.pre_filter_nms,
             boxes.merge_nms_box_with_class,
             boxes.suppress_other_class_scores,
@@ -58,10 +66,14 @@ PAGES = [
             boxes.flip_left_right,
             boxes.make_box_square,
             boxes.match,
+            boxes.match_batch,
+            boxes.compute_match_args,
+            boxes.compute_prior_ious,
             boxes.nms_per_class,
             boxes.to_image_coordinates,
             boxes.to_center_form,
             boxes.to_one_hot,
+            boxes.to_sparse_boxes,
             boxes.to_normalized_coordinates,
             boxes.to_corner_form,
             boxes.extract_bounding_box_corners,
@@ -117,12 +129,16 @@ PAGES = [
             keypoints.solve_least_squares,
             keypoints.get_bones_length,
             keypoints.compute_reprojection_error,
+            keypoints.compute_reprojection_residuals,
+            keypoints.compute_reprojection_jacobian,
+            keypoints.compute_reprojection_sparsity,
             keypoints.merge_into_mean,
             keypoints.filter_keypoints,
             keypoints.filter_keypoints3D,
             keypoints.filter_keypoints2D,
             keypoints.compute_optimized_pose3D,
-            keypoints.human_pose3D_to_pose6D
+            keypoints.human_pose3D_to_pose6D,
+            keypoints.human_poses3D_to_poses6D
         ],
     },
 
@@ -239,6 +255,15 @@ PAGES = [
             image.solarize,
             image.cutout,
             image.add_gaussian_noise,
+            image.write_image_store,
+        ],
+        'classes': [
+            image.ImageStore,
+            (image.BackgroundPool, [
+                image.BackgroundPool.sample,
+                image.BackgroundPool.fill,
+                image.BackgroundPool.refresh,
+                image.BackgroundPool.is_full])
         ],
     },
 
@@ -269,6 +294,11 @@ PAGES = [
             heatmaps.get_tags_heatmap,
             heatmaps.get_keypoints_locations,
             heatmaps.get_top_k_keypoints_numpy,
+            heatmaps.max_filter_heatmaps,
+            heatmaps.suppress_non_maximum_heatmaps,
+            heatmaps.select_top_k_keypoints,
+            heatmaps.shift_to_larger_neighbours,
+            heatmaps.resize_heatmaps,
             heatmaps.get_valid_detections
         ],
     },
@@ -291,6 +321,8 @@ PAGES = [
             standard.pad_matrix,
             standard.max_pooling_2d,
             standard.predict,
+            standard.pad_batch_dimension,
+            standard.predict_batch,
             standard.predict_with_nones,
             standard.weighted_average,
             standard.compute_common_row_indices,
@@ -413,6 +445,7 @@ PAGES = [
         'page': 'optimization/losses.md',
         'classes': [
             losses.MultiBoxLoss,
+            losses.CompactMultiBoxLoss,
             losses.KeypointNetLoss,
             losses.DiceLoss,
             losses.FocalLoss,
@@ -537,7 +570,9 @@ PAGES = [
             processors.MatchBoxes,
             processors.EncodeBoxes,
             processors.DecodeBoxes,
+            processors.ToSparseBoxes,
             processors.NonMaximumSuppressionPerClass,
+            processors.DecodeAndSuppressBoxes2D,
             processors.MergeNMSBoxWithClass,
             processors.FilterBoxes,
             processors.OffsetBoxes2D,
@@ -600,7 +635,8 @@ PAGES = [
     {
         'page': 'processors/munkres.md',
         'classes': [
-            processors.Munkres
+            processors.Munkres,
+            processors.LinearAssignment
         ]
     },
 
@@ -703,6 +739,7 @@ PAGES = [
             pipelines.PostprocessBoxes2D,
             pipelines.DetectSingleShot,
             pipelines.DetectHaarCascade,
+            pipelines.PredictCroppedBoxes2D,
             pipelines.SSD512HandDetection,
             pipelines.SSD512MinimalHandPose,
             pipelines.SSDPreprocess,
@@ -727,7 +764,8 @@ PAGES = [
     {
         'page': 'pipelines/heatmaps.md',
         'classes': [
-            pipelines.GetHeatmapsAndTags
+            pipelines.GetHeatmapsAndTags,
+            pipelines.GetMultiScaleHeatmapsAndTags
         ]
     },
 
@@ -769,8 +807,10 @@ PAGES = [
             pipelines.EstimatePoseKeypoints,
             pipelines.HeadPoseKeypointNet2D32,
             pipelines.SingleInstancePIX2POSE6D,
-            pipelines.MultiInstancePIX2POSE6D,
-            pipelines.MultiInstanceMultiClassPIX2POSE6D,
+            (pipelines.MultiInstancePIX2POSE6D, [
+                pipelines.MultiInstancePIX2POSE6D.close]),
+            (pipelines.MultiInstanceMultiClassPIX2POSE6D, [
+                pipelines.MultiInstanceMultiClassPIX2POSE6D.close]),
             pipelines.AugmentColor,
             pipelines.AugmentEfficientPose,
             pipelines.EfficientDetPreprocess,
@@ -838,9 +878,24 @@ PAGES = [
 
     {
         'page': 'abstract/sequence.md',
+        'functions': [
+            sequence.seed_sample
+        ],
         'classes': [
-            sequence.ProcessingSequence,
-            sequence.GeneratingSequence
+            (sequence.ProcessingSequence, [sequence.ProcessingSequence.close]),
+            (sequence.GeneratingSequence, [sequence.GeneratingSequence.close])
+        ]
+    },
+
+
+    {
+        'page': 'abstract/columnar.md',
+        'classes': [
+            (columnar.ColumnarDataset, [
+                columnar.ColumnarDataset.from_samples,
+                columnar.ColumnarDataset.load,
+                columnar.ColumnarDataset.save,
+                columnar.ColumnarDataset.to_list])
         ]
     },
 
@@ -854,7 +909,10 @@ PAGES = [
                 processor.SequentialProcessor.remove,
                 processor.SequentialProcessor.pop,
                 processor.SequentialProcessor.insert,
-                processor.SequentialProcessor.get_processor])
+                processor.SequentialProcessor.get_processor,
+                processor.SequentialProcessor.compile,
+                processor.SequentialProcessor.summary]),
+            (processor.ProcessorPlan, [processor.ProcessorPlan.summary])
         ]
     },
 
@@ -885,4 +943,20 @@ PAGES = [
 
     },
 
+    {
+        'page': 'utils/profiler.md',
+        'functions': [
+            profiler.compute_output_size
+        ],
+        'classes': [
+            (profiler.Profiler, [profiler.Profiler.enable,
+                                 profiler.Profiler.disable,
+                                 profiler.Profiler.reset,
+                                 profiler.Profiler.summary,
+                                 profiler.Profiler.to_dict,
+                                 profiler.Profiler.write_json,
+                                 profiler.Profiler.write_chrome_trace])
+        ]
+    },
+
 ]
@@ -0,0 +1,79 @@
+import os
+import glob
+import argparse
+import time
+
+import numpy as np
+from paz.backend.image import load_image
+from pose import EfficientPosePhi0LinemodDriller
+
+
+parser = argparse.ArgumentParser(
+    description='Frames per second of EfficientPose on LINEMOD images')
+parser.add_argument('-i', '--images_path', type=str, default=None,
+                    help='Directory of LINEMOD RGB images e.g. '
+                    'Linemod_preprocessed/data/08/rgb. If not given random '
+                    'images are used')
+parser.add_argument('-w', '--weights_path', type=str, default=None,
+                    help='Path to trained weights')
+parser.add_argument('-n', '--num_frames', type=int, default=50,
+                    help='Number of timed frames')
+parser.add_argument('--num_warmup', type=int, default=3,
+                    help='Number of frames processed before timing')
+parser.add_argument('--score_thresh', type=float, default=0.60,
+                    help='Box/class score threshold')
+parser.add_argument('--nms_thresh', type=float, default=0.45,
+                    help='Non-maximum suppression threshold')
+parser.add_argument('--no_base_weights', action='store_true',
+                    help='Build the model without downloading COCO weights')
+parser.add_argument('--seed', type=int, default=777,
+                    help='Seed of the random images')
+args = parser.parse_args()
+
+
+def load_images(images_path, num_images, seed):
+    if images_path is None:
+        random_state = np.random.RandomState(seed)
+        return [random_state.randint(0, 256, (480, 640, 3), dtype=np.uint8)
+                for _ in range(num_images)]
+    image_paths = sorted(glob.glob(os.path.join(images_path, '*.png')))
+    return [load_image(image_path) for image_path in image_paths[:num_images]]
+
+
+base_weights = None if args.no_base_weights else 'COCO'
+pipeline = EfficientPosePhi0LinemodDriller(
+    args.score_thresh, args.nms_thresh, show_boxes2D=True,
+    show_poses6D=True, base_weights=base_weights)
+if args.weights_path is not None:
+    pipeline.model.load_weights(args.weights_path)
+
+images = load_images(args.images_path, args.num_frames, args.seed)
+for image in images[:args.num_warmup]:
+    pipeline(image)
+
+stage_times = {'preprocess': [], 'model': [], 'postprocess': [], 'total': []}
+num_detections = 0
+for image in images:
+    start = time.perf_counter()
+    preprocessed_image, image_scale = pipeline.preprocess(image)
+    preprocess_end = time.perf_counter()
+    outputs = pipeline.model(preprocessed_image)
+    model_end = time.perf_counter()
+    boxes2D, poses6D = pipeline.postprocess(
+        preprocessed_image[0], outputs, image_scale)
+    for box2D, pose6D in zip(boxes2D, poses6D):
+        image = pipeline.draw_pose6D[box2D.class_name](image, pose6D)
+    end = time.perf_counter()
+    stage_times['preprocess'].append(preprocess_end - start)
+    stage_times['model'].append(model_end - preprocess_end)
+    stage_times['postprocess'].append(end - model_end)
+    stage_times['total'].append(end - start)
+    num_detections = num_detections + len(boxes2D)
+
+print('%d frames, %.1f detections per frame' % (
+    len(images), num_detections / len(images)))
+print('%12s %12s %12s' % ('stage', 'mean [ms]', 'median [ms]'))
+for stage, durations in stage_times.items():
+    print('%12s %12.2f %12.2f' % (
+        stage, np.mean(durations) * 1e3, np.median(durations) * 1e3))
+print('FPS: %.2f' % (1.0 / np.mean(stage_times['total'])))
@@ -16,6 +16,7 @@ class EfficientPosePhi0LinemodDriller(EstimateEfficientPose):
             are drawn in the returned image.
         show_poses6D: Boolean. If ``True`` estimated poses
             are drawn in the returned image.
+        base_weights: Str or ``None``. Base weights name.
 
      # References
         [EfficientPose: An efficient, accurate and scalable end-to-end
@@ -23,11 +24,11 @@ class EfficientPosePhi0LinemodDriller(EstimateEfficientPose):
             https://arxiv.org/pdf/2011.04307.pdf)
     """
     def __init__(self, score_thresh=0.60, nms_thresh=0.45,
-                 show_boxes2D=False, show_poses6D=True):
+                 show_boxes2D=False, show_poses6D=True, base_weights='COCO'):
         names = ['background', 'driller']
         model = EfficientPosePhi0(build_translation_anchors,
-                                  num_classes=len(names), base_weights='COCO',
-                                  head_weights=None)
+                                  num_classes=len(names),
+                                  base_weights=base_weights, head_weights=None)
         regress_translation = RegressTranslation(model.translation_priors)
         compute_tx_ty_tz = ComputeTxTyTz()
         super(EfficientPosePhi0LinemodDriller, self).__init__(
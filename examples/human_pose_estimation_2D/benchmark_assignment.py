@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import numpy as np
+from paz.processors import Munkres, LinearAssignment
+
+
+parser = argparse.ArgumentParser(description='Benchmark assignment solvers')
+parser.add_argument('-s', '--sizes', nargs='+', type=int,
+                    default=[10, 30, 50, 100, 200],
+                    help='Number of rows of the random cost matrices')
+parser.add_argument('-r', '--num_repetitions', type=int, default=3,
+                    help='Number of cost matrices per size')
+parser.add_argument('-m', '--max_munkres_size', type=int, default=200,
+                    help='Largest size solved with Munkres')
+parser.add_argument('--rectangular', action='store_true',
+                    help='Use cost matrices with twice as many columns')
+parser.add_argument('--seed', type=int, default=777,
+                    help='Seed of the random cost matrices')
+args = parser.parse_args()
+
+
+def measure(solve, cost_matrix):
+    start = time.perf_counter()
+    assignments = solve(cost_matrix)
+    duration = time.perf_counter() - start
+    cost = sum([cost_matrix[row, col] for row, col in assignments])
+    return duration, cost
+
+
+random_state = np.random.RandomState(args.seed)
+solvers = {'Munkres': Munkres().compute,
+           'LinearAssignment': LinearAssignment()}
+header = ('size', 'Munkres [ms]', 'Linear [ms]', 'speed-up')
+print('%8s %18s %18s %10s' % header)
+for size in args.sizes:
+    shape = (size, 2 * size) if args.rectangular else (size, size)
+    times = {name: [] for name in solvers.keys()}
+    for repetition_arg in range(args.num_repetitions):
+        cost_matrix = random_state.rand(*shape)
+        duration, cost = measure(solvers['LinearAssignment'], cost_matrix)
+        times['LinearAssignment'].append(duration)
+        if size <= args.max_munkres_size:
+            duration, munkres_cost = measure(solvers['Munkres'], cost_matrix)
+            times['Munkres'].append(duration)
+            assert np.isclose(cost, munkres_cost), 'Assignment costs differ'
+    linear_time = np.mean(times['LinearAssignment']) * 1e3
+    if len(times['Munkres']) == 0:
+        print('%8d %18s %18.2f %10s' % (size, '-', linear_time, '-'))
+        continue
+    munkres_time = np.mean(times['Munkres']) * 1e3
+    print('%8d %18.2f %18.2f %9.1fx' % (
+        size, munkres_time, linear_time, munkres_time / linear_time))
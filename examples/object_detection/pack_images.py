@@ -0,0 +1,35 @@
+import argparse
+
+from paz.datasets import VOC
+from paz.backend.image import write_image_store
+
+description = 'Packs decoded VOC images into a memory-mapped image store'
+parser = argparse.ArgumentParser(description=description)
+parser.add_argument('-dp', '--data_path', default='VOCdevkit/',
+                    help='Path to VOCdevkit directory')
+parser.add_argument('-sp', '--store_path', default='VOC_images',
+                    help='Path of the written image store')
+parser.add_argument('-n', '--names', nargs='+',
+                    default=['VOC2007', 'VOC2012', 'VOC2007'],
+                    help='Dataset names')
+parser.add_argument('-s', '--splits', nargs='+',
+                    default=['trainval', 'trainval', 'test'],
+                    help='Dataset splits, one per dataset name')
+parser.add_argument('-is', '--image_size', default=None, type=int,
+                    help='If given, images are resized to this size')
+parser.add_argument('-w', '--workers', default=0, type=int,
+                    help='Number of workers parsing the annotations')
+args = parser.parse_args()
+
+image_paths = []
+for name, split in zip(args.names, args.splits):
+    data_manager = VOC(args.data_path, split, name=name,
+                       num_workers=args.workers)
+    data = data_manager.load_data()
+    image_paths.extend([sample['image'] for sample in data])
+
+size = None
+if args.image_size is not None:
+    size = (args.image_size, args.image_size)
+image_store = write_image_store(args.store_path, image_paths, size=size)
+print('Packed {} images into {}'.format(len(image_store), args.store_path))
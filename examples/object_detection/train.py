@@ -47,6 +47,8 @@ parser.add_argument('-mp', '--multiprocessing', default=False, type=bool,
                     help='Select True for multiprocessing')
 parser.add_argument('-w', '--workers', default=1, type=int,
                     help='Number of workers used for optimization')
+parser.add_argument('-is', '--image_store', default=None, type=str,
+                    help='Image store written with pack_images.py')
 args = parser.parse_args()
 
 optimizer = SGD(args.learning_rate, args.momentum)
@@ -81,7 +83,8 @@ model.compile(optimizer, loss.compute_loss, metrics)
 augmentators = []
 for split in [TRAIN, VAL]:
     augmentator = AugmentDetection(model.prior_boxes, split,
-                                   num_classes=num_classes)
+                                   num_classes=num_classes,
+                                   image_store=args.image_store)
     augmentators.append(augmentator)
 
 # setting sequencers
@@ -2,3 +2,4 @@ from .loader import Loader
 from .sequence import GeneratingSequence, ProcessingSequence
 from .messages import Box2D, Pose6D
 from .processor import Processor, SequentialProcessor
+from .columnar import ColumnarDataset
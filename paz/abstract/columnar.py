@@ -0,0 +1,205 @@
+import os
+import json
+
+import numpy as np
+
+
+class ColumnarDataset(object):
+    """Dataset of samples stored as columns instead of a list of
+    dictionaries. Every key of the samples is stored in a single
+    contiguous array: strings as UTF-8 bytes, arrays concatenated along
+    their first axis and scalars as one value per sample. Arrays of
+    variable length are indexed with per-sample offsets. Samples are
+    built lazily as dictionaries when indexed, therefore a
+    ``ColumnarDataset`` can be given as ``data`` to ``ProcessingSequence``.
+
+    # Arguments
+        columns: Dictionary with keys as sample keys and arrays as values.
+        offsets: Dictionary with keys as sample keys and as values arrays
+            of shape ``(num_samples + 1)`` with the start of each sample,
+            or ``None`` for scalar columns.
+        column_types: Dictionary with keys as sample keys and as values
+            ``'string'``, ``'array'`` or ``'scalar'``.
+        num_samples: Int. Number of samples.
+
+    # Properties
+        keys: List of sample keys.
+        directory: String or ``None``. Directory from which the columns
+            were memory-mapped.
+
+    # Methods
+        from_samples()
+        load()
+        save()
+        to_list()
+
+    # Notes
+        Datasets loaded with ``mmap=True`` are pickled as their directory,
+        therefore worker processes memory-map the same files instead of
+        receiving a copy of all samples. Arrays of memory-mapped samples
+        are read-only views.
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self, columns, offsets, column_types, num_samples):
+        self.columns = columns
+        self.offsets = offsets
+        self.column_types = column_types
+        self.num_samples = num_samples
+        self.directory = None
+        self._mmap = False
+
+    @property
+    def keys(self):
+        return list(self.columns.keys())
+
+    @classmethod
+    def from_samples(cls, samples):
+        """Builds a columnar dataset from a list of dictionaries.
+
+        # Arguments
+            samples: List of dictionaries. All dictionaries must have the
+                same keys and their values must be strings, scalars or
+                arrays whose first axis can be concatenated.
+
+        # Returns
+            ``ColumnarDataset``.
+        """
+        keys = list(samples[0].keys()) if len(samples) > 0 else []
+        for sample in samples:
+            if set(sample.keys()) != set(keys):
+                raise ValueError('All samples must have the same keys')
+        columns, offsets, column_types = {}, {}, {}
+        for key in keys:
+            values = [sample[key] for sample in samples]
+            column_types[key], columns[key], offsets[key] = _to_column(values)
+        return cls(columns, offsets, column_types, len(samples))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Loads a columnar dataset written with ``save``.
+
+        # Arguments
+            directory: String. Path to dataset directory.
+            mmap: Boolean. If ``True`` columns are memory-mapped.
+
+        # Returns
+            ``ColumnarDataset``.
+        """
+        with open(os.path.join(directory, 'columns.json'), 'r') as filedata:
+            metadata = json.load(filedata)
+        if metadata['version'] != cls.FORMAT_VERSION:
+            raise ValueError('Invalid columnar dataset version')
+        mmap_mode = 'r' if mmap else None
+        columns, offsets, column_types = {}, {}, {}
+        for key in metadata['keys']:
+            column_type, key_arg = metadata['columns'][key]
+            filepath = os.path.join(directory, '%d.npy' % key_arg)
+            # plain array views of the memory map are faster to slice
+            columns[key] = np.asarray(np.load(filepath, mmap_mode=mmap_mode))
+            offsets[key] = None
+            if column_type != 'scalar':
+                filepath = os.path.join(directory, '%d_offsets.npy' % key_arg)
+                offsets[key] = np.load(filepath)
+            column_types[key] = column_type
+        dataset = cls(columns, offsets, column_types, metadata['num_samples'])
+        dataset.directory = directory
+        dataset._mmap = mmap
+        return dataset
+
+    def save(self, directory):
+        """Writes all columns as ``.npy`` files into ``directory``.
+
+        # Arguments
+            directory: String. Path to dataset directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        metadata_columns = {}
+        for key_arg, key in enumerate(self.keys):
+            filepath = os.path.join(directory, '%d.npy' % key_arg)
+            np.save(filepath, self.columns[key])
+            if self.offsets[key] is not None:
+                filepath = os.path.join(directory, '%d_offsets.npy' % key_arg)
+                np.save(filepath, self.offsets[key])
+            metadata_columns[key] = [self.column_types[key], key_arg]
+        metadata = {'version': self.FORMAT_VERSION, 'keys': self.keys,
+                    'num_samples': self.num_samples,
+                    'columns': metadata_columns}
+        with open(os.path.join(directory, 'columns.json'), 'w') as filedata:
+            json.dump(metadata, filedata)
+
+    def to_list(self):
+        """Builds all samples.
+
+        # Returns
+            List of dictionaries.
+        """
+        return [self._get_sample(arg) for arg in range(self.num_samples)]
+
+    def _get_value(self, key, sample_arg):
+        column, column_type = self.columns[key], self.column_types[key]
+        if column_type == 'scalar':
+            return column[sample_arg].item()
+        start = self.offsets[key][sample_arg]
+        end = self.offsets[key][sample_arg + 1]
+        if column_type == 'string':
+            return column[start:end].tobytes().decode('utf-8')
+        return column[start:end]
+
+    def _get_sample(self, sample_arg):
+        return {key: self._get_value(key, sample_arg) for key in self.keys}
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            sample_args = range(*index.indices(self.num_samples))
+            return [self._get_sample(arg) for arg in sample_args]
+        if index < 0:
+            index = index + self.num_samples
+        if not (0 <= index < self.num_samples):
+            raise IndexError('Sample index out of range')
+        return self._get_sample(index)
+
+    def __iter__(self):
+        for sample_arg in range(self.num_samples):
+            yield self._get_sample(sample_arg)
+
+    def __add__(self, dataset):
+        if set(self.keys) != set(dataset.keys):
+            raise ValueError('Datasets must have the same keys')
+        columns, offsets = {}, {}
+        for key in self.keys:
+            columns[key] = np.concatenate(
+                [self.columns[key], dataset.columns[key]], axis=0)
+            offsets[key] = None
+            if self.offsets[key] is not None:
+                offsets[key] = np.concatenate([
+                    self.offsets[key][:-1],
+                    dataset.offsets[key] + self.offsets[key][-1]])
+        return ColumnarDataset(columns, offsets, self.column_types,
+                               self.num_samples + dataset.num_samples)
+
+    def __getstate__(self):
+        if self._mmap:
+            return {'directory': self.directory}
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        if list(state.keys()) == ['directory']:
+            state = ColumnarDataset.load(state['directory']).__dict__
+        self.__dict__.update(state)
+
+
+def _to_column(values):
+    if all(isinstance(value, str) for value in values):
+        values = [value.encode('utf-8') for value in values]
+        offsets = np.cumsum([0] + [len(value) for value in values])
+        column = np.frombuffer(b''.join(values), dtype=np.uint8)
+        return 'string', column, offsets.astype(np.int64)
+    if all(np.ndim(value) == 0 for value in values):
+        return 'scalar', np.asarray(values), None
+    values = [np.asarray(value) for value in values]
+    offsets = np.cumsum([0] + [len(value) for value in values])
+    return 'array', np.concatenate(values, axis=0), offsets.astype(np.int64)
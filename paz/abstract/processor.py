@@ -1,3 +1,7 @@
+# instance of ``paz.utils.Profiler`` recording processor calls or ``None``
+PROFILER = None
+
+
 class Processor(object):
     """Abstract class for creating a processor unit.
 
@@ -51,7 +55,9 @@ class Processor(object):
         raise NotImplementedError
 
     def __call__(self, *args, **kwargs):
-        return self.call(*args, **kwargs)
+        if PROFILER is None:
+            return self.call(*args, **kwargs)
+        return PROFILER.profile(self, self.call, *args, **kwargs)
 
 
 class SequentialProcessor(object):
@@ -68,6 +74,8 @@ class SequentialProcessor(object):
         pop()
         insert()
         get_processor()
+        compile()
+        summary()
 
     # Example
     ```python
@@ -81,6 +89,7 @@ class SequentialProcessor(object):
     """
     def __init__(self, processors=None, name=None):
         self.processors = []
+        self._plan = None
         if processors is not None:
             [self.add(processor) for processor in processors]
         self.name = name
@@ -101,9 +110,17 @@ class SequentialProcessor(object):
         # Arguments
             processor: An instantiated child class of ``Processor``.
         """
+        self._plan = None
         self.processors.append(processor)
 
     def __call__(self, *args, **kwargs):
+        if PROFILER is not None:
+            return PROFILER.profile(self, self._call, *args, **kwargs)
+        return self._call(*args, **kwargs)
+
+    def _call(self, *args, **kwargs):
+        if self._plan is not None:
+            return self._plan(*args, **kwargs)
         # first call can take list or dictionary values.
         args = self.processors[0](*args, **kwargs)
         # further calls can be a tuple or single values.
@@ -120,6 +137,7 @@ class SequentialProcessor(object):
         # Arguments
             name: String indicating the process name
         """
+        self._plan = None
         for processor in self.processors:
             if processor.name == name:
                 self.processors.remove(processor)
@@ -130,6 +148,7 @@ class SequentialProcessor(object):
         # Arguments
             index: Int.
         """
+        self._plan = None
         return self.processors.pop(index)
 
     def insert(self, index, processor):
@@ -139,6 +158,7 @@ class SequentialProcessor(object):
             index: Int.
             processor: An instantiated child class of of ``Processor``.
         """
+        self._plan = None
         return self.processors.insert(index, processor)
 
     def get_processor(self, name):
@@ -150,3 +170,172 @@ class SequentialProcessor(object):
         for processor in self.processors:
             if processor.name == name:
                 return processor
+
+    def compile(self):
+        """Flattens all nested ``SequentialProcessor`` and ``ControlMap``
+        processors into a single plan of processor calls with precomputed
+        argument routing. The plan gives the same outputs as the nested
+        pipeline and it is used in all following calls.
+        Adding, inserting, removing or popping a processor of this pipeline
+        discards the plan. Changes done to nested pipelines after compiling
+        require calling ``compile`` again.
+
+        # Returns
+            The compiled ``SequentialProcessor``.
+        """
+        self._plan = ProcessorPlan(self.processors)
+        return self
+
+    def summary(self, print_fn=print):
+        """Prints the flattened plan of processor calls.
+
+        # Arguments
+            print_fn: Function used to print each line.
+        """
+        plan = self._plan
+        if plan is None:
+            plan = ProcessorPlan(self.processors)
+        plan.summary(print_fn)
+
+
+class ProcessorPlan(object):
+    """Flat plan of processor calls built from nested ``SequentialProcessor``
+    and ``ControlMap`` processors.
+    Each step either calls a processor with the current arguments, enters a
+    ``ControlMap`` by selecting its ``intro_indices`` or exits it by merging
+    its outputs with the remaining arguments. Merging orders are computed
+    once per number of inputs and outputs and reused afterwards. Merging
+    and selecting arguments between two consecutive ``ControlMap`` with the
+    same sorted indices is skipped since it does not change the arguments.
+
+    # Arguments
+        processors: List of processors.
+
+    # Properties
+        steps: List of tuples containing the step type, the processor and
+            the nesting depth of the step.
+
+    # Methods
+        summary()
+    """
+    CALL, ENTER, EXIT = 'call', 'enter', 'exit'
+
+    def __init__(self, processors):
+        self.steps = []
+        for processor in processors:
+            self._flatten(processor, 0)
+        self._fuse_steps()
+
+    def _is_sequential(self, processor):
+        return (isinstance(processor, SequentialProcessor) and
+                type(processor).__call__ is SequentialProcessor.__call__)
+
+    def _is_control_map(self, processor):
+        from ..processors.standard import ControlMap
+        return (isinstance(processor, ControlMap) and
+                type(processor).call is ControlMap.call and
+                type(processor).__call__ is Processor.__call__)
+
+    def _flatten(self, processor, depth):
+        if self._is_sequential(processor):
+            for child_processor in processor.processors:
+                self._flatten(child_processor, depth)
+        elif self._is_control_map(processor):
+            self.steps.append([self.ENTER, processor, depth, False])
+            self._flatten(processor.processor, depth + 1)
+            self.steps.append([self.EXIT, processor, depth, {}])
+        else:
+            self.steps.append([self.CALL, processor, depth, None])
+
+    def _has_same_sorted_indices(self, control_map, next_control_map):
+        indices = control_map.outro_indices
+        is_sorted = (indices == sorted(set(indices))) and (min(indices) >= 0)
+        return (is_sorted and (control_map.intro_indices == indices) and
+                (next_control_map.intro_indices == indices))
+
+    def _fuse_steps(self):
+        for step_arg in range(len(self.steps) - 1):
+            step_type, processor = self.steps[step_arg][:2]
+            next_type, next_processor = self.steps[step_arg + 1][:2]
+            if ((step_type == self.EXIT) and (next_type == self.ENTER) and
+                    (processor.keep is None) and
+                    (next_processor.keep is None) and
+                    (len(processor.outro_indices) > 0) and
+                    self._has_same_sorted_indices(processor, next_processor)):
+                self.steps[step_arg + 1][3] = True
+
+    def _compute_merge_order(self, control_map, num_inputs, num_outputs):
+        inputs = list(range(num_inputs))
+        outputs = list(range(num_inputs, num_inputs + num_outputs))
+        remaining_args = control_map._remove(
+            inputs, control_map.intro_indices)
+        merge_order = control_map._insert(
+            remaining_args, outputs, control_map.outro_indices)
+        if control_map.keep is not None:
+            keep_intro = list(control_map.keep.keys())
+            keep_outro = list(control_map.keep.values())
+            keep_args = control_map._select(inputs, keep_intro)
+            merge_order = control_map._insert(
+                merge_order, keep_args, keep_outro)
+        return merge_order
+
+    def __call__(self, *args, **kwargs):
+        outputs, frames, num_steps, step_arg = args, [], len(self.steps), 0
+        while step_arg < num_steps:
+            step_type, processor, depth, step_data = self.steps[step_arg]
+            step_arg = step_arg + 1
+            if step_type == self.CALL:
+                outputs = processor(*args, **kwargs)
+                if isinstance(outputs, tuple):
+                    args = outputs
+                else:
+                    args = (outputs, )
+            elif step_type == self.ENTER:
+                if kwargs:
+                    raise TypeError('%s got unexpected keyword arguments' %
+                                    processor.name)
+                frames.append(args)
+                args = tuple([args[arg] for arg in processor.intro_indices])
+            else:
+                inputs = frames.pop()
+                outro_indices = processor.outro_indices
+                is_fused = (step_arg < num_steps and
+                            self.steps[step_arg][0] == self.ENTER and
+                            self.steps[step_arg][3] and
+                            len(args) == len(outro_indices))
+                if is_fused:
+                    # outputs are selected again by the next step
+                    frames.append(inputs)
+                    step_arg = step_arg + 1
+                    continue
+                key = (len(inputs), len(args))
+                if key not in step_data:
+                    step_data[key] = self._compute_merge_order(
+                        processor, *key)
+                values = inputs + args
+                args = tuple([values[arg] for arg in step_data[key]])
+                outputs = args
+            kwargs = {}
+        return outputs
+
+    def summary(self, print_fn=print):
+        """Prints the steps of the plan.
+
+        # Arguments
+            print_fn: Function used to print each line.
+        """
+        for step_type, processor, depth, step_data in self.steps:
+            name = getattr(processor, 'name', None)
+            if name is None:
+                name = getattr(processor, '__name__',
+                               processor.__class__.__name__)
+            line = '    ' * depth + name
+            if step_type == self.ENTER:
+                line = line + ' intro_indices=%s' % processor.intro_indices
+                if step_data:
+                    line = line + ' (fused)'
+            elif step_type == self.EXIT:
+                line = line + ' outro_indices=%s' % processor.outro_indices
+                if processor.keep is not None:
+                    line = line + ' keep=%s' % processor.keep
+            print_fn('%-6s%s' % (step_type, line))
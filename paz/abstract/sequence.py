@@ -1,27 +1,134 @@
+import random
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
 from tensorflow.keras.utils import Sequence
 import numpy as np
 from .processor import SequentialProcessor
 
 
+# state of each worker process of ``SequenceExtra`` worker pools
+_WORKER_STATE = {}
+
+
+def seed_sample(seed, epoch, sample_index):
+    """Seeds the ``numpy`` and ``random`` global generators with a seed
+    derived from the sequence ``seed``, the ``epoch`` and the sample index.
+    Samples are therefore augmented identically independently of the
+    process or the order in which they are processed.
+
+    # Arguments
+        seed: Int. Seed of the sequence.
+        epoch: Int. Current epoch.
+        sample_index: Int. Index of the sample in the epoch.
+    """
+    sample_seed = np.random.SeedSequence([seed, epoch, sample_index])
+    sample_seed = int(sample_seed.generate_state(1)[0])
+    np.random.seed(sample_seed)
+    random.seed(sample_seed)
+
+
+def _attach_buffers(buffer_specs):
+    memories, buffers = [], {}
+    for topic, name_to_spec in buffer_specs.items():
+        buffers[topic] = {}
+        for name, (memory_name, shape, dtype) in name_to_spec.items():
+            memory = shared_memory.SharedMemory(name=memory_name)
+            memories.append(memory)
+            buffers[topic][name] = np.ndarray(shape, dtype, memory.buf)
+    return memories, buffers
+
+
+def _initialize_worker(pipeline, buffer_specs):
+    # forked workers inherit the random state of the parent process
+    np.random.seed(None)
+    random.seed(None)
+    memories, buffers = _attach_buffers(buffer_specs)
+    _WORKER_STATE['pipeline'] = pipeline
+    _WORKER_STATE['memories'] = memories
+    _WORKER_STATE['buffers'] = buffers
+
+
+def _process_samples(task):
+    seed, epoch, first_sample_index, sample_args, samples = task
+    pipeline, buffers = _WORKER_STATE['pipeline'], _WORKER_STATE['buffers']
+    for sample_arg, unprocessed_sample in zip(sample_args, samples):
+        if seed is not None:
+            seed_sample(seed, epoch, first_sample_index + sample_arg)
+        if unprocessed_sample is None:
+            sample = pipeline()
+        else:
+            sample = pipeline(unprocessed_sample.copy())
+        for topic in ['inputs', 'labels']:
+            for name, data in sample[topic].items():
+                buffers[topic][name][sample_arg] = data
+    return len(sample_args)
+
+
 class SequenceExtra(Sequence):
-    def __init__(self, pipeline, batch_size, as_list=False):
+    def __init__(self, pipeline, batch_size, as_list=False,
+                 num_workers=0, seed=None, num_buffers=None):
         if not isinstance(pipeline, SequentialProcessor):
             raise ValueError('``processor`` must be a ``SequentialProcessor``')
+        if num_workers < 0:
+            raise ValueError('``num_workers`` must be a non-negative integer')
         self.output_wrapper = pipeline.processors[-1]
         self.pipeline = pipeline
         self.inputs_name_to_shape = self.output_wrapper.inputs_name_to_shape
         self.labels_name_to_shape = self.output_wrapper.labels_name_to_shape
         self.ordered_input_names = self.output_wrapper.ordered_input_names
         self.ordered_label_names = self.output_wrapper.ordered_label_names
+        self.inputs_name_to_dtype = getattr(
+            self.output_wrapper, 'inputs_name_to_dtype', {})
+        self.labels_name_to_dtype = getattr(
+            self.output_wrapper, 'labels_name_to_dtype', {})
         self.batch_size = batch_size
         self.as_list = as_list
+        self.num_workers = num_workers
+        self.seed = seed
+        self.num_buffers = num_buffers
+        self.epoch = 0
+        self._ring = []
+        self._ring_arg = 0
+        self._ring_lock = threading.Lock()
+        self._pool = None
+        self._memories = []
+        self._buffers = None
+        self._pool_lock = threading.Lock()
 
-    def make_empty_batches(self, name_to_shape):
+    def make_empty_batches(self, name_to_shape, name_to_dtype=None):
+        name_to_dtype = {} if name_to_dtype is None else name_to_dtype
         batch = {}
         for name, shape in name_to_shape.items():
-            batch[name] = np.zeros((self.batch_size, *shape))
+            dtype = name_to_dtype.get(name, np.float32)
+            batch[name] = np.zeros((self.batch_size, *shape), dtype)
         return batch
 
+    def _make_empty_inputs_and_labels(self):
+        inputs = self.make_empty_batches(
+            self.inputs_name_to_shape, self.inputs_name_to_dtype)
+        labels = self.make_empty_batches(
+            self.labels_name_to_shape, self.labels_name_to_dtype)
+        return inputs, labels
+
+    def _get_empty_batches(self):
+        if self.num_buffers is None:
+            return self._make_empty_inputs_and_labels()
+        with self._ring_lock:
+            if len(self._ring) < self.num_buffers:
+                self._ring.append(self._make_empty_inputs_and_labels())
+            batches = self._ring[self._ring_arg]
+            self._ring_arg = (self._ring_arg + 1) % self.num_buffers
+        return batches
+
+    def _clear_unused_samples(self, num_samples, inputs, labels):
+        if (self.num_buffers is None) or (num_samples == self.batch_size):
+            return
+        for batch in [inputs, labels]:
+            for array in batch.values():
+                array[num_samples:] = 0
+
     def _to_list(self, batch, names):
         return [batch[name] for name in names]
 
@@ -29,6 +136,11 @@ class SequenceExtra(Sequence):
         for name, data in sample.items():
             batch[name][sample_arg] = data
 
+    def _seed_sample(self, batch_index, sample_arg):
+        if self.seed is not None:
+            sample_index = (self.batch_size * batch_index) + sample_arg
+            seed_sample(self.seed, self.epoch, sample_index)
+
     def _get_unprocessed_batch(self, data, batch_index):
         batch_arg_A = self.batch_size * (batch_index)
         batch_arg_B = self.batch_size * (batch_index + 1)
@@ -36,8 +148,7 @@ class SequenceExtra(Sequence):
         return unprocessed_batch
 
     def __getitem__(self, batch_index):
-        inputs = self.make_empty_batches(self.inputs_name_to_shape)
-        labels = self.make_empty_batches(self.labels_name_to_shape)
+        inputs, labels = self._get_empty_batches()
         inputs, labels = self.process_batch(inputs, labels, batch_index)
         if self.as_list:
             inputs = self._to_list(inputs, self.ordered_input_names)
@@ -47,6 +158,88 @@ class SequenceExtra(Sequence):
     def process_batch(self, inputs, labels, batch_index=None):
         raise NotImplementedError
 
+    def on_epoch_end(self):
+        self.epoch = self.epoch + 1
+
+    def _allocate_buffers(self, batch):
+        name_to_spec, buffers = {}, {}
+        for name, array in batch.items():
+            memory = shared_memory.SharedMemory(
+                create=True, size=max(array.nbytes, 1))
+            self._memories.append(memory)
+            buffers[name] = np.ndarray(array.shape, array.dtype, memory.buf)
+            name_to_spec[name] = (memory.name, array.shape, array.dtype)
+        return name_to_spec, buffers
+
+    def _start_pool(self, inputs, labels):
+        inputs_spec, inputs_buffers = self._allocate_buffers(inputs)
+        labels_spec, labels_buffers = self._allocate_buffers(labels)
+        self._buffers = {'inputs': inputs_buffers, 'labels': labels_buffers}
+        buffer_specs = {'inputs': inputs_spec, 'labels': labels_spec}
+        worker_args = (self.pipeline, buffer_specs)
+        self._pool = multiprocessing.Pool(
+            self.num_workers, _initialize_worker, worker_args)
+
+    def _process_in_workers(self, inputs, labels, batch_index, samples):
+        """Processes the samples of a batch in the worker pool. Each worker
+        writes its samples directly into batch buffers in shared memory.
+
+        # Arguments
+            inputs: Dictionary with the empty input batches.
+            labels: Dictionary with the empty label batches.
+            batch_index: Int. Index of the batch.
+            samples: List of unprocessed samples. ``None`` elements are
+                generated by calling the pipeline without arguments.
+
+        # Returns
+            Dictionaries with the input and label batches.
+        """
+        num_samples = len(samples)
+        sample_chunks = np.array_split(np.arange(num_samples), min(
+            self.num_workers, max(num_samples, 1)))
+        first_sample_index = self.batch_size * batch_index
+        tasks = []
+        for sample_args in sample_chunks:
+            sample_args = sample_args.tolist()
+            chunk = [samples[sample_arg] for sample_arg in sample_args]
+            tasks.append((self.seed, self.epoch, first_sample_index,
+                          sample_args, chunk))
+        with self._pool_lock:
+            if self._pool is None:
+                self._start_pool(inputs, labels)
+            self._pool.map(_process_samples, tasks)
+            for topic, batch in [('inputs', inputs), ('labels', labels)]:
+                for name, buffer in self._buffers[topic].items():
+                    batch[name][:num_samples] = buffer[:num_samples]
+        return inputs, labels
+
+    def close(self):
+        """Terminates the worker pool and releases the shared memory."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._buffers = None
+        for memory in self._memories:
+            memory.close()
+            memory.unlink()
+        self._memories = []
+
+    def __del__(self):
+        if getattr(self, '_memories', None) is not None:
+            self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update({'_pool': None, '_memories': [], '_buffers': None,
+                      '_pool_lock': None, '_ring': [], '_ring_lock': None})
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+        self._ring_lock = threading.Lock()
+
 
 class ProcessingSequence(SequenceExtra):
     """Sequence generator used for processing samples given in ``data``.
@@ -54,26 +247,46 @@ class ProcessingSequence(SequenceExtra):
     # Arguments
         processor: Function, used for processing elements of ``data``.
         batch_size: Int.
-        data: List. Each element of the list is processed by ``processor``.
+        data: List or ``ColumnarDataset``. Each element of the list is
+            processed by ``processor``.
         as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
             lists. If false ``inputs`` and ``labels`` are dispatched as
             dictionaries.
+        num_workers: Int. If larger than zero, samples are processed in a
+            pool of ``num_workers`` processes, each one holding its own copy
+            of ``processor``. Call ``close`` to terminate the pool.
+        seed: Int or ``None``. If given, the random generators are seeded
+            before processing each sample with a seed derived from ``seed``,
+            the epoch and the sample index. Batches are then identical for
+            any ``num_workers``.
+        num_buffers: Int or ``None``. If given, batches are written into a
+            ring of ``num_buffers`` preallocated buffers instead of new
+            arrays. A returned batch is overwritten ``num_buffers`` steps
+            later; therefore ``num_buffers`` must be larger than the number
+            of batches held at once e.g. the ``max_queue_size`` of Keras.
     """
-    def __init__(self, processor, batch_size, data, as_list=False):
+    def __init__(self, processor, batch_size, data, as_list=False,
+                 num_workers=0, seed=None, num_buffers=None):
         self.data = data
         super(ProcessingSequence, self).__init__(
-            processor, batch_size, as_list)
+            processor, batch_size, as_list, num_workers, seed, num_buffers)
 
     def __len__(self):
         return int(np.ceil(len(self.data) / float(self.batch_size)))
 
     def process_batch(self, inputs, labels, batch_index):
         unprocessed_batch = self._get_unprocessed_batch(self.data, batch_index)
-
-        for sample_arg, unprocessed_sample in enumerate(unprocessed_batch):
-            sample = self.pipeline(unprocessed_sample.copy())
-            self._place_sample(sample['inputs'], sample_arg, inputs)
-            self._place_sample(sample['labels'], sample_arg, labels)
+        if self.num_workers > 0:
+            inputs, labels = self._process_in_workers(
+                inputs, labels, batch_index, list(unprocessed_batch))
+        else:
+            for sample_arg, unprocessed_sample in enumerate(
+                    unprocessed_batch):
+                self._seed_sample(batch_index, sample_arg)
+                sample = self.pipeline(unprocessed_sample.copy())
+                self._place_sample(sample['inputs'], sample_arg, inputs)
+                self._place_sample(sample['labels'], sample_arg, labels)
+        self._clear_unused_samples(len(unprocessed_batch), inputs, labels)
         return inputs, labels
 
 
@@ -87,17 +300,35 @@ class GeneratingSequence(SequenceExtra):
         as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
             lists. If false ``inputs`` and ``labels`` are dispatched as
             dictionaries.
+        num_workers: Int. If larger than zero, samples are generated in a
+            pool of ``num_workers`` processes, each one holding its own copy
+            of ``processor``. Call ``close`` to terminate the pool.
+        seed: Int or ``None``. If given, the random generators are seeded
+            before generating each sample with a seed derived from ``seed``,
+            the epoch and the sample index.
+        num_buffers: Int or ``None``. If given, batches are written into a
+            ring of ``num_buffers`` preallocated buffers instead of new
+            arrays. A returned batch is overwritten ``num_buffers`` steps
+            later; therefore ``num_buffers`` must be larger than the number
+            of batches held at once e.g. the ``max_queue_size`` of Keras.
     """
-    def __init__(self, processor, batch_size, num_steps, as_list=False):
+    def __init__(self, processor, batch_size, num_steps, as_list=False,
+                 num_workers=0, seed=None, num_buffers=None):
         self.num_steps = num_steps
         super(GeneratingSequence, self).__init__(
-            processor, batch_size, as_list)
+            processor, batch_size, as_list, num_workers, seed, num_buffers)
 
     def __len__(self):
         return self.num_steps
 
     def process_batch(self, inputs, labels, batch_index):
+        if self.num_workers > 0:
+            samples = [None] * self.batch_size
+            return self._process_in_workers(
+                inputs, labels, batch_index, samples)
+
         for sample_arg in range(self.batch_size):
+            self._seed_sample(batch_index, sample_arg)
             sample = self.pipeline()
             self._place_sample(sample['inputs'], sample_arg, inputs)
             self._place_sample(sample['labels'], sample_arg, labels)
@@ -177,7 +177,89 @@ def match_beta(boxes, prior_boxes, positive_iou=0.5, negative_iou=0.0):
     return matched_boxes
 
 
-def match(boxes, prior_boxes, iou_threshold=0.5):
+def compute_prior_ious(boxes, prior_boxes):
+    """Calculates the intersection over union between `boxes` and all
+    `prior_boxes`. Gives the same values as `compute_ious` while operating
+    on each coordinate separately, avoiding `(num_boxes, num_priors, 2)`
+    intermediate arrays. Both arrays are in corner coordinates.
+
+    # Arguments
+        boxes: Numpy array with shape `(num_boxes, 4)`.
+        prior_boxes: Numpy array with shape `(num_prior_boxes, 4)`.
+
+    # Returns
+        Numpy array of shape `(num_boxes, num_prior_boxes)`.
+    """
+    x_min_A, y_min_A = boxes[:, 0:1], boxes[:, 1:2]
+    x_max_A, y_max_A = boxes[:, 2:3], boxes[:, 3:4]
+    x_min_B, y_min_B = prior_boxes[:, 0], prior_boxes[:, 1]
+    x_max_B, y_max_B = prior_boxes[:, 2], prior_boxes[:, 3]
+    inner_w = np.minimum(x_max_A, x_max_B)
+    inner_w -= np.maximum(x_min_A, x_min_B)
+    intersection_area = np.maximum(inner_w, 0.0, out=inner_w)
+    inner_h = np.minimum(y_max_A, y_max_B)
+    inner_h -= np.maximum(y_min_A, y_min_B)
+    intersection_area *= np.maximum(inner_h, 0.0, out=inner_h)
+    areas_A = (x_max_A - x_min_A) * (y_max_A - y_min_A)
+    areas_B = (x_max_B - x_min_B) * (y_max_B - y_min_B)
+    union_area = areas_A + areas_B
+    union_area -= intersection_area
+    np.maximum(union_area, 1e-8, out=union_area)
+    intersection_area /= union_area
+    return np.clip(intersection_area, 0.0, 1.0, out=intersection_area)
+
+
+def _force_best_prior_matches(per_prior_which_box_arg,
+                              per_prior_which_box_iou,
+                              per_box_which_prior_arg, box_args):
+    # each box keeps its best prior box. If boxes share their best prior
+    # box, the last box is assigned as in a sequential loop.
+    best_prior_args = per_box_which_prior_arg[::-1]
+    best_prior_args, unique_args = np.unique(
+        best_prior_args, return_index=True)
+    per_prior_which_box_iou[best_prior_args] = 2
+    per_prior_which_box_arg[best_prior_args] = box_args[::-1][unique_args]
+
+
+def compute_match_args(boxes, prior_boxes, chunk_size=None):
+    """Computes for each prior box the ground truth box with the highest
+    intersection over union. Each ground truth box is additionally assigned
+    to its best prior box, whose intersection over union is set to 2.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4)` in corner form.
+        prior_boxes: Numpy array of shape `(num_prior_boxes, 4)` in corner
+            form.
+        chunk_size: Int or `None`. If given, intersections over union are
+            computed for at most `chunk_size` boxes at once.
+
+    # Returns
+        Numpy arrays of shape `(num_prior_boxes)` with the matched box
+            arguments and their intersection over union.
+    """
+    if chunk_size is None:
+        chunk_size = max(len(boxes), 1)
+    per_prior_which_box_iou = np.full(len(prior_boxes), -1.0, boxes.dtype)
+    per_prior_which_box_arg = np.zeros(len(prior_boxes), dtype=int)
+    per_box_which_prior_arg = np.zeros(len(boxes), dtype=int)
+    for chunk_arg in range(0, len(boxes), chunk_size):
+        chunk_boxes = boxes[chunk_arg:chunk_arg + chunk_size]
+        ious = compute_prior_ious(chunk_boxes, prior_boxes)
+        per_box_which_prior_arg[chunk_arg:chunk_arg + chunk_size] = np.argmax(
+            ious, axis=1)
+        # a running maximum over rows is faster than a strided argmax over
+        # axis 0. Strict comparison keeps the first maximum as np.argmax.
+        for box_arg, box_ious in enumerate(ious, chunk_arg):
+            is_better = box_ious > per_prior_which_box_iou
+            np.copyto(per_prior_which_box_iou, box_ious, where=is_better)
+            per_prior_which_box_arg[is_better] = box_arg
+    box_args = np.arange(len(boxes))
+    _force_best_prior_matches(per_prior_which_box_arg, per_prior_which_box_iou,
+                              per_box_which_prior_arg, box_args)
+    return per_prior_which_box_arg, per_prior_which_box_iou
+
+
+def match(boxes, prior_boxes, iou_threshold=0.5, dtype=None, chunk_size=None):
     """Matches each prior box with a ground truth box (box from `boxes`).
     It then selects which matched box will be considered positive e.g. iou > .5
     and returns for each prior box a ground truth box that is either positive
@@ -192,6 +274,10 @@ def match(boxes, prior_boxes, iou_threshold=0.5):
             where the four coordinates are in center form coordinates.
         iou_threshold: Float between [0, 1]. Intersection over union
             used to determine which box is considered a positive box.
+        dtype: Numpy data type used for computing intersections over union
+            e.g. `np.float32`. If `None` the type of `boxes` is used.
+        chunk_size: Int or `None`. If given, intersections over union are
+            computed for at most `chunk_size` ground truth boxes at once.
 
     # Returns
         numpy array of shape `(num_prior_boxes, 4 + 1)`.
@@ -199,22 +285,64 @@ def match(boxes, prior_boxes, iou_threshold=0.5):
             form box coordinates and the last coordinates is the class
             argument.
     """
-    ious = compute_ious(boxes, to_corner_form(np.float32(prior_boxes)))
-    per_prior_which_box_iou = np.max(ious, axis=0)
-    per_prior_which_box_arg = np.argmax(ious, 0)
-
-    #  overwriting per_prior_which_box_arg if they are the best prior box
-    per_box_which_prior_arg = np.argmax(ious, 1)
-    per_prior_which_box_iou[per_box_which_prior_arg] = 2
-    for box_arg in range(len(per_box_which_prior_arg)):
-        best_prior_box_arg = per_box_which_prior_arg[box_arg]
-        per_prior_which_box_arg[best_prior_box_arg] = box_arg
-
+    prior_boxes = to_corner_form(np.float32(prior_boxes))
+    coordinates = boxes[:, :4]
+    if dtype is not None:
+        coordinates = coordinates.astype(dtype)
+        prior_boxes = prior_boxes.astype(dtype)
+    per_prior_which_box_arg, per_prior_which_box_iou = compute_match_args(
+        coordinates, prior_boxes, chunk_size)
     matches = boxes[per_prior_which_box_arg]
     matches[per_prior_which_box_iou < iou_threshold, 4] = 0
     return matches
 
 
+def match_batch(batch_boxes, prior_boxes, iou_threshold=0.5,
+                dtype=None, chunk_size=None):
+    """Matches the prior boxes with the ground truth boxes of every sample
+    in a batch. Each sample gives the same matches as `match` with the
+    same `dtype`. Prior boxes
+    are converted once for the whole batch and intersections over union
+    are computed per sample, since padding all samples into a single
+    `(batch_size, num_boxes, num_priors)` array is memory bound.
+
+    # Arguments
+        batch_boxes: List of numpy arrays of shape `(num_boxes, 4 + 1)`.
+            The number of ground truth boxes can change between samples.
+        prior_boxes: Numpy array of shape `(num_prior_boxes, 4)`.
+            where the four coordinates are in center form coordinates.
+        iou_threshold: Float between [0, 1]. Intersection over union
+            used to determine which box is considered a positive box.
+        dtype: Numpy data type used for computing intersections over union
+            e.g. `np.float32`. If `None` the type of `boxes` is used.
+            Matches of a lower precision type can differ from `match` for
+            intersections over union close to `iou_threshold`.
+        chunk_size: Int or `None`. If given, intersections over union are
+            computed for at most `chunk_size` ground truth boxes at once.
+
+    # Returns
+        Numpy array of shape `(batch_size, num_prior_boxes, 4 + 1)`.
+            Samples without ground truth boxes are matched to zero boxes
+            of class 0.
+    """
+    prior_boxes = to_corner_form(np.float32(prior_boxes))
+    if dtype is not None:
+        prior_boxes = prior_boxes.astype(dtype)
+    matches = np.zeros((len(batch_boxes), len(prior_boxes), 5))
+    for sample_arg, boxes in enumerate(batch_boxes):
+        if len(boxes) == 0:
+            continue
+        coordinates = boxes[:, :4]
+        if dtype is not None:
+            coordinates = coordinates.astype(dtype)
+        per_prior_which_box_arg, per_prior_which_box_iou = compute_match_args(
+            coordinates, prior_boxes, chunk_size)
+        sample_matches = matches[sample_arg]
+        sample_matches[:] = boxes[per_prior_which_box_arg]
+        sample_matches[per_prior_which_box_iou < iou_threshold, 4] = 0
+    return matches
+
+
 def compute_iou(box, boxes):
     """Calculates the intersection over union between 'box' and all 'boxes'.
     Both `box` and `boxes` are in corner coordinates.
@@ -393,6 +521,253 @@ def _nms_per_class(nms_boxes, class_labels, class_arg, decoded_boxes,
     return nms_boxes, class_labels
 
 
+def nms_per_class_batched(box_data, nms_thresh=.45, epsilon=0.01, top_k=200):
+    """Applies non maximum suppression per class for all classes at once.
+    This function returns the same boxes and class labels as
+    ``nms_per_class`` but instead of running one suppression loop per class
+    it gathers the ``top_k`` candidates of every class in a single padded
+    array and suppresses all classes together with a greedy mask pass.
+
+    # Arguments
+        box_data: Array of shape `(num_nms_boxes, 4 + num_classes)`
+            containing the box coordinates as well as the predicted
+            scores of all the classes for all non suppressed boxes.
+        nms_thresh: Float, Non-maximum suppression threshold.
+        epsilon: Float, Filter scores with a lower confidence
+            value before performing non-maximum supression.
+        top_k: Int, Maximum number of boxes per class outputted by nms.
+
+    # Returns
+        Tuple: Containing an array non suppressed boxes of shape
+            `(num_nms_boxes, 4 + num_classes)` and an array
+            of corresponding class labels of shape `(num_nms_boxes, )`.
+    """
+    selected_args, class_labels = nms_per_class_args(
+        box_data, nms_thresh, epsilon, top_k)
+    nms_boxes = box_data[selected_args].astype(float)
+    return nms_boxes, class_labels
+
+
+def nms_per_class_args(box_data, nms_thresh=.45, epsilon=0.01, top_k=200):
+    """Applies non maximum suppression per class for all classes at once
+    and returns the row indices of the non suppressed boxes. The rows are
+    given in the same order as the boxes returned by ``nms_per_class``,
+    allowing to gather other per box predictions of the kept boxes.
+
+    # Arguments
+        box_data: Array of shape `(num_boxes, 4 + num_classes)`
+            containing the box coordinates as well as the predicted
+            scores of all the classes.
+        nms_thresh: Float, Non-maximum suppression threshold.
+        epsilon: Float, Filter scores with a lower confidence
+            value before performing non-maximum supression.
+        top_k: Int, Maximum number of boxes per class outputted by nms.
+
+    # Returns
+        Tuple: Containing an array of row indices of ``box_data`` of shape
+            `(num_nms_boxes, )` and an array of corresponding class labels
+            of shape `(num_nms_boxes, )`.
+    """
+    class_predictions = box_data[:, 4:]
+    candidate_args, valid_mask = select_nms_candidates(
+        class_predictions, epsilon, top_k)
+    boxes = box_data[:, :4][candidate_args]
+    keep_mask = apply_batched_non_max_suppression(
+        boxes, valid_mask, nms_thresh)
+    class_labels, candidate_positions = np.nonzero(keep_mask)
+    selected_args = candidate_args[class_labels, candidate_positions]
+    return selected_args, class_labels.astype(int)
+
+
+def nms_per_class_batch(batch_box_data, nms_thresh=.45,
+                        epsilon=0.01, top_k=200):
+    """Applies non maximum suppression per class to a batch of images.
+    The candidates of every class of every image are suppressed together
+    in a single greedy mask pass.
+
+    # Arguments
+        batch_box_data: Array of shape
+            `(batch_size, num_prior_boxes, 4 + num_classes)` or list of
+            arrays of shape `(num_prior_boxes, 4 + num_classes)`.
+        nms_thresh: Float, Non-maximum suppression threshold.
+        epsilon: Float, Filter scores with a lower confidence
+            value before performing non-maximum supression.
+        top_k: Int, Maximum number of boxes per class outputted by nms.
+
+    # Returns
+        List of tuples with the same content as the output of
+            ``nms_per_class`` for each image.
+    """
+    if len(batch_box_data) == 0:
+        return []
+    candidates = []
+    for box_data in batch_box_data:
+        candidates.append(select_nms_candidates(
+            box_data[:, 4:], epsilon, top_k))
+    num_candidates = max([args.shape[1] for args, _ in candidates])
+    boxes, valid_mask = [], []
+    for box_data, (candidate_args, image_valid_mask) in zip(
+            batch_box_data, candidates):
+        pad_size = ((0, 0), (0, num_candidates - candidate_args.shape[1]))
+        candidate_args = np.pad(candidate_args, pad_size)
+        boxes.append(box_data[:, :4][candidate_args])
+        valid_mask.append(np.pad(image_valid_mask, pad_size))
+    boxes = np.concatenate(boxes, axis=0)
+    valid_mask = np.concatenate(valid_mask, axis=0)
+    keep_mask = apply_batched_non_max_suppression(
+        boxes, valid_mask, nms_thresh)
+
+    outputs, class_offset = [], 0
+    for box_data, (candidate_args, _) in zip(batch_box_data, candidates):
+        num_classes = candidate_args.shape[0]
+        image_keep_mask = keep_mask[class_offset:class_offset + num_classes]
+        image_keep_mask = image_keep_mask[:, :candidate_args.shape[1]]
+        class_labels, candidate_positions = np.nonzero(image_keep_mask)
+        selected_args = candidate_args[class_labels, candidate_positions]
+        nms_boxes = box_data[selected_args].astype(float)
+        outputs.append((nms_boxes, class_labels.astype(int)))
+        class_offset = class_offset + num_classes
+    return outputs
+
+
+def select_nms_candidates(class_predictions, epsilon, top_k=200):
+    """Selects for every class the indices of the ``top_k`` boxes with
+    a score larger or equal than ``epsilon`` sorted by descending score.
+    Classes with less than ``top_k`` candidates are padded with invalid
+    entries.
+
+    # Arguments
+        class_predictions: Array of shape
+            `(num_nms_boxes, num_classes)` containing the predicted
+            scores of all the classes for all the non suppressed boxes.
+        epsilon: Float, threshold value for score filtering.
+        top_k: Int, Maximum number of candidates per class.
+
+    # Returns
+        Tuple: Containing an array of box indices of shape
+            `(num_classes, num_candidates)` and a boolean array of the
+            same shape indicating which candidates are valid.
+    """
+    num_classes = class_predictions.shape[1]
+    valid_scores_mask = class_predictions >= epsilon
+    class_candidates = []
+    for class_arg in range(num_classes):
+        box_args = np.flatnonzero(valid_scores_mask[:, class_arg])
+        scores = class_predictions[box_args, class_arg]
+        # same ordering as in ``apply_non_max_suppression``
+        sorted_args = np.argsort(scores)[-top_k:][::-1]
+        class_candidates.append(box_args[sorted_args])
+    num_candidates = max([len(args) for args in class_candidates] + [0])
+    candidate_args = np.zeros((num_classes, num_candidates), dtype=int)
+    valid_mask = np.zeros((num_classes, num_candidates), dtype=bool)
+    for class_arg, box_args in enumerate(class_candidates):
+        candidate_args[class_arg, :len(box_args)] = box_args
+        valid_mask[class_arg, :len(box_args)] = True
+    return candidate_args, valid_mask
+
+
+def apply_batched_non_max_suppression(boxes, valid_mask, iou_thresh=.45):
+    """Apply greedy non maximum suppression to groups of boxes at once.
+    Boxes of different groups never suppress each other.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_groups, num_boxes, 4)` where
+            the boxes of every group are sorted by descending score and
+            each column corresponds to x_min, y_min, x_max, y_max.
+        valid_mask: Boolean array of shape `(num_groups, num_boxes)`
+            indicating which boxes are valid candidates.
+        iou_thresh: float, intersection over union threshold for removing
+            boxes.
+
+    # Returns
+        Boolean array of shape `(num_groups, num_boxes)` indicating
+            which boxes are kept.
+    """
+    keep_mask = valid_mask.copy()
+    x_min, y_min = boxes[:, :, 0], boxes[:, :, 1]
+    x_max, y_max = boxes[:, :, 2], boxes[:, :, 3]
+    areas = (x_max - x_min) * (y_max - y_min)
+    for box_arg in range(boxes.shape[1] - 1):
+        kept_groups = keep_mask[:, box_arg]
+        if not np.any(kept_groups):
+            continue
+        best_x_min = x_min[kept_groups, box_arg:box_arg + 1]
+        best_y_min = y_min[kept_groups, box_arg:box_arg + 1]
+        best_x_max = x_max[kept_groups, box_arg:box_arg + 1]
+        best_y_max = y_max[kept_groups, box_arg:box_arg + 1]
+        remaining_x_min = x_min[kept_groups, box_arg + 1:]
+        remaining_y_min = y_min[kept_groups, box_arg + 1:]
+        remaining_x_max = x_max[kept_groups, box_arg + 1:]
+        remaining_y_max = y_max[kept_groups, box_arg + 1:]
+
+        inner_x_min = np.maximum(remaining_x_min, best_x_min)
+        inner_y_min = np.maximum(remaining_y_min, best_y_min)
+        inner_x_max = np.minimum(remaining_x_max, best_x_max)
+        inner_y_max = np.minimum(remaining_y_max, best_y_max)
+
+        inner_box_widths = inner_x_max - inner_x_min
+        inner_box_heights = inner_y_max - inner_y_min
+
+        inner_box_widths = np.maximum(inner_box_widths, 0.0)
+        inner_box_heights = np.maximum(inner_box_heights, 0.0)
+
+        intersections = inner_box_widths * inner_box_heights
+        remaining_box_areas = areas[kept_groups, box_arg + 1:]
+        best_area = areas[kept_groups, box_arg:box_arg + 1]
+        unions = remaining_box_areas + best_area - intersections
+        intersec_over_union = intersections / unions
+        intersec_over_union_mask = intersec_over_union <= iou_thresh
+        keep_mask[kept_groups, box_arg + 1:] &= intersec_over_union_mask
+    return keep_mask
+
+
+def decode_and_suppress(predictions, prior_boxes,
+                        variances=[0.1, 0.1, 0.2, 0.2], score_thresh=0.5,
+                        nms_thresh=.45, epsilon=0.01, top_k=200,
+                        class_arg=None, image_scales=None):
+    """Filters, decodes and applies non maximum suppression per class to
+    the raw predictions of a single-shot detector in a single pass.
+    Only the prior boxes having at least one class score larger or equal
+    than ``score_thresh`` are decoded. This gives the same boxes as
+    decoding all predictions, removing ``class_arg``, applying
+    ``nms_per_class``, ``merge_nms_box_with_class`` and ``filter_boxes``.
+
+    # Arguments
+        predictions: Array of shape `(num_prior_boxes, 4 + num_classes)`.
+        prior_boxes: Array of shape `(num_prior_boxes, 4)`.
+        variances: List of four floats. Variances of prior boxes.
+        score_thresh: Float, minimum score of the returned boxes.
+        nms_thresh: Float, Non-maximum suppression threshold.
+        epsilon: Float, Filter scores with a lower confidence
+            value before performing non-maximum supression.
+        top_k: Int, Maximum number of boxes per class outputted by nms.
+        class_arg: Int or ``None``, index of the class to be removed.
+        image_scales: Array of shape `()` with the scale of the boxes
+            or ``None``.
+
+    # Returns
+        Tuple: Containing an array of box coordinates of shape
+            `(num_nms_boxes, 4)`, an array of scores of shape
+            `(num_nms_boxes, )` and an array of class labels of shape
+            `(num_nms_boxes, )`. Class labels are given without
+            ``class_arg``.
+    """
+    score_thresh = max(score_thresh, epsilon)
+    valid_mask = predictions[:, 4:] >= score_thresh
+    if class_arg is not None:
+        valid_mask[:, class_arg] = False
+    box_args = np.flatnonzero(np.any(valid_mask, axis=1))
+    box_data = decode(predictions[box_args], prior_boxes[box_args], variances)
+    if class_arg is not None:
+        box_data = np.delete(box_data, 4 + class_arg, axis=1)
+    if image_scales is not None:
+        box_data = scale_box(box_data, image_scales)
+    box_data, class_labels = nms_per_class_batched(
+        box_data, nms_thresh, score_thresh, top_k)
+    scores = box_data[np.arange(len(box_data)), 4 + class_labels]
+    return box_data[:, :4], scores, class_labels
+
+
 def pre_filter_nms(class_arg, class_predictions, epsilon):
     """Applies score filtering.
     This function takes all the predicted scores of a given class and
@@ -504,11 +879,50 @@ def to_one_hot(class_indices, num_classes):
         Numpy array with shape `(num_samples, num_classes)`.
     """
     one_hot_vectors = np.zeros((len(class_indices), num_classes))
+    class_indices = np.asarray(class_indices)
+    if class_indices.ndim == 1 and class_indices.dtype.kind in 'iu':
+        one_hot_vectors[np.arange(len(class_indices)), class_indices] = 1.0
+        return one_hot_vectors
     for vector_arg, class_args in enumerate(class_indices):
         one_hot_vectors[vector_arg, class_args] = 1.0
     return one_hot_vectors
 
 
+def to_sparse_boxes(boxes, max_num_positives=1000):
+    """Keeps only the positive boxes i.e. boxes with a class argument
+    different than zero, together with their prior box argument.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_prior_boxes, 4 + 1)` with the
+            encoded boxes and their class argument.
+        max_num_positives: Int. Number of rows of the returned array i.e.
+            maximum number of prior boxes matched to a ground truth box.
+            A single ground truth box is usually matched to several prior
+            boxes e.g. a few medium sized boxes match hundreds of SSD300
+            prior boxes.
+
+    # Returns
+        Numpy array of shape `(max_num_positives, 1 + 4 + 1)` with the prior
+            box argument, the four encoded coordinates and the class
+            argument of each positive box. Unused rows have a prior box
+            argument of -1.
+
+    # Raises
+        ValueError: If there are more positive boxes than
+            ``max_num_positives``. Discarded positives would otherwise be
+            trained as background.
+    """
+    positive_args = np.flatnonzero(boxes[:, 4] > 0)
+    if len(positive_args) > max_num_positives:
+        raise ValueError('Found %d positive boxes but ``max_num_positives`` '
+                         'is %d' % (len(positive_args), max_num_positives))
+    sparse_boxes = np.zeros((max_num_positives, 6), dtype=boxes.dtype)
+    sparse_boxes[:, 0] = -1
+    sparse_boxes[:len(positive_args), 0] = positive_args
+    sparse_boxes[:len(positive_args), 1:] = boxes[positive_args, :5]
+    return sparse_boxes
+
+
 def make_box_square(box):
     """Makes box coordinates square with sides equal to the longest
         original side.
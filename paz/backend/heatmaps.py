@@ -1,5 +1,7 @@
 import numpy as np
 
+from .image import resize_image
+
 
 def get_keypoints_heatmap(heatmaps, num_keypoints, indices=None, axis=1):
     """Extract the heatmaps that only contains the keypoints.
@@ -78,6 +80,160 @@ def get_top_k_keypoints_numpy(heatmaps, k):
     return np.squeeze(values), indices
 
 
+def max_filter_heatmaps(heatmaps, pool_size=3):
+    """Computes the maximum over a `pool_size x pool_size` window around
+    every pixel of the heatmaps. Gives the same values as a max-pooling
+    with stride one and 'same' padding, where pixels outside the heatmaps
+    are ignored. The filter is applied separately along rows and columns.
+
+    # Arguments
+        heatmaps: Numpy array of shape (..., H, W).
+        pool_size: Int. Size of the window.
+
+    # Returns
+        Numpy array of shape (..., H, W).
+    """
+    pad_before = (pool_size - 1) // 2
+    pad_after = pool_size - 1 - pad_before
+    H, W = heatmaps.shape[-2:]
+    padding = [(0, 0)] * (heatmaps.ndim - 2)
+    padded = np.pad(heatmaps, padding + [(pad_before, pad_after), (0, 0)],
+                    constant_values=-np.inf)
+    row_maximums = padded[..., 0:H, :].copy()
+    for shift in range(1, pool_size):
+        np.maximum(row_maximums, padded[..., shift:shift + H, :],
+                   out=row_maximums)
+    padded = np.pad(row_maximums, padding + [(0, 0), (pad_before, pad_after)],
+                    constant_values=-np.inf)
+    maximums = padded[..., 0:W].copy()
+    for shift in range(1, pool_size):
+        np.maximum(maximums, padded[..., shift:shift + W], out=maximums)
+    return maximums
+
+
+def suppress_non_maximum_heatmaps(heatmaps, pool_size=3):
+    """Sets to zero all values that are not the maximum of their window.
+
+    # Arguments
+        heatmaps: Numpy array of shape (..., H, W).
+        pool_size: Int. Size of the window.
+
+    # Returns
+        Numpy array of shape (..., H, W).
+    """
+    maximum_values = max_filter_heatmaps(heatmaps, pool_size)
+    return np.where(heatmaps == maximum_values, heatmaps, 0.0)
+
+
+def _select_lowest_tied_indices(heatmaps, indices, values):
+    # argpartition takes any of the values equal to the k-th value. These
+    # are replaced in place by the ones with the lowest indices.
+    kth_values = np.min(values, axis=-1, keepdims=True)
+    num_selected_ties = np.sum(values == kth_values, axis=-1)
+    num_ties = np.sum(heatmaps == kth_values, axis=-1)
+    for arg in zip(*np.nonzero(num_ties > num_selected_ties)):
+        kth_value = kth_values[arg][0]
+        larger_args = indices[arg][values[arg] > kth_value]
+        tied_args = np.flatnonzero(heatmaps[arg] == kth_value)
+        tied_args = tied_args[:num_selected_ties[arg]]
+        indices[arg] = np.concatenate([larger_args, tied_args])
+
+
+def select_top_k_keypoints(heatmaps, k):
+    """Selects the k largest values of every heatmap at once. Values are
+    sorted in descending order and equal values by their index, as in
+    `tf.math.top_k`.
+
+    # Arguments
+        heatmaps: Numpy array of shape (num_images, num_keypoints, H * W).
+        k: Int. Maximum number of instances to return.
+
+    # Returns
+        values: Numpy array of shape (num_images, num_keypoints, k).
+        indices: Numpy array of shape (num_images, num_keypoints, k).
+    """
+    num_values = heatmaps.shape[-1]
+    if k < num_values:
+        indices = np.argpartition(-heatmaps, k - 1, axis=-1)[..., :k]
+        values = np.take_along_axis(heatmaps, indices, axis=-1)
+        _select_lowest_tied_indices(heatmaps, indices, values)
+        # sorting by index keeps equal values in index order
+        indices = np.sort(indices, axis=-1)
+    else:
+        indices = np.broadcast_to(np.arange(num_values), heatmaps.shape)
+    values = np.take_along_axis(heatmaps, indices, axis=-1)
+    order = np.argsort(-values, axis=-1, kind='stable')
+    indices = np.take_along_axis(indices, order, axis=-1)
+    values = np.take_along_axis(values, order, axis=-1)
+    return values, indices
+
+
+def shift_to_larger_neighbours(heatmaps, keypoint_args, x, y, offset=0.25):
+    """Shifts many keypoints at once towards their larger neighbours.
+    Gives the same values as applying `compare_vertical_neighbours` and
+    then `compare_horizontal_neighbours` to every keypoint.
+
+    # Arguments
+        heatmaps: Numpy array of shape (num_keypoints, H, W).
+        keypoint_args: Numpy array of shape (num_points). Heatmap argument
+            of each point.
+        x: Numpy array of shape (num_points). Coordinates along `H`.
+        y: Numpy array of shape (num_points). Coordinates along `W`.
+        offset: Float.
+
+    # Returns
+        Numpy arrays with the shifted `x` and `y` coordinates.
+    """
+    int_x, int_y = np.trunc(x).astype(int), np.trunc(y).astype(int)
+    lower_y = np.minimum(int_y + 1, heatmaps.shape[2] - 1)
+    upper_y = np.maximum(int_y - 1, 0)
+    is_lower_larger = (heatmaps[keypoint_args, int_x, lower_y] >
+                       heatmaps[keypoint_args, int_x, upper_y])
+    y = np.where(is_lower_larger, y + offset, y - offset)
+
+    int_y = np.trunc(y).astype(int)
+    left_x = np.maximum(int_x - 1, 0)
+    right_x = np.minimum(int_x + 1, heatmaps.shape[1] - 1)
+    is_right_larger = (heatmaps[keypoint_args, right_x, int_y] >
+                       heatmaps[keypoint_args, left_x, int_y])
+    x = np.where(is_right_larger, x + offset, x - offset)
+    return x, y
+
+
+def resize_heatmaps(heatmaps, size, max_channels=1):
+    """Resize every heatmap of a batch of heatmaps into a single output
+    array. Chunks of ``max_channels`` heatmaps are moved to the channels
+    axis and resized with one multi-channel resize.
+
+    # Arguments
+        heatmaps: Numpy array of shape (batch_size, num_heatmaps, H, W).
+        size: List of two ints (width, height) of the resized heatmaps.
+        max_channels: Int. Maximum number of heatmaps resized at once.
+            OpenCV does not resize images with more than 512 channels.
+            Multi-channel resizing helps when OpenCV runs with several
+            threads, otherwise resizing each heatmap is faster.
+
+    # Returns
+        Numpy array of shape (batch_size, num_heatmaps, height, width).
+
+    # Note
+        Multi-channel and single-channel resizing in OpenCV round
+        differently, hence results can differ by a few float epsilons.
+    """
+    batch_size, num_heatmaps, H, W = heatmaps.shape
+    width, height = size
+    channels = np.reshape(heatmaps, (-1, H, W))
+    resized = np.empty((len(channels), height, width), dtype=heatmaps.dtype)
+    for start_arg in range(0, len(channels), max_channels):
+        chunk = channels[start_arg:start_arg + max_channels]
+        chunk = np.ascontiguousarray(np.transpose(chunk, (1, 2, 0)))
+        resized_chunk = resize_image(chunk, (width, height))
+        resized_chunk = np.reshape(resized_chunk, (height, width, -1))
+        resized_chunk = np.transpose(resized_chunk, (2, 0, 1))
+        resized[start_arg:start_arg + max_channels] = resized_chunk
+    return np.reshape(resized, (batch_size, num_heatmaps, height, width))
+
+
 def get_valid_detections(detection, detection_thresh):
     """Accept the keypoints whose score is greater than the
        detection threshold.
@@ -1,3 +1,5 @@
 from .opencv_image import *
 from .image import *
-from .draw import *
\ No newline at end of file
+from .draw import *
+from .image_store import *
+from .background_pool import *
@@ -0,0 +1,188 @@
+import threading
+
+import numpy as np
+
+from .opencv_image import load_image, resize_image, CUBIC
+
+
+class BackgroundPool(object):
+    """Pool of decoded background images from which random crops are
+    sampled. Backgrounds are decoded once and upscaled once when they are
+    smaller than the requested crop, such that crops are views of the
+    pooled images.
+
+    # Arguments
+        background_paths: List of strings. Each element of the list is a
+            full-path to an image used for cropping a background.
+        pool_size: Int. Maximum number of backgrounds kept in memory.
+        memory_budget: Int or ``None``. Maximum number of bytes of the
+            backgrounds kept in memory.
+        preload: Boolean. If ``True`` the pool is filled when built.
+            Otherwise every sample decodes a new background until the pool
+            is full.
+        refresh_period: Int. Number of samples after which
+            ``refresh_fraction`` of the pool is replaced with new
+            backgrounds. If ``0`` the pool is never refreshed.
+        refresh_fraction: Float between [0, 1]. Fraction of the pool
+            replaced at every refresh.
+        buffer: Int. Number of pixels added to the crop shape when
+            upscaling small backgrounds.
+
+    # Notes
+        Sampled crops are read-only views of the pooled backgrounds.
+    """
+    def __init__(self, background_paths, pool_size=100, memory_budget=None,
+                 preload=False, refresh_period=0, refresh_fraction=0.1,
+                 buffer=200):
+        if len(background_paths) == 0:
+            raise ValueError('No paths given in ``background_paths``')
+        if not (0.0 <= refresh_fraction <= 1.0):
+            raise ValueError('``refresh_fraction`` must be in [0, 1]')
+        self.background_paths = background_paths
+        self.pool_size = min(pool_size, len(background_paths))
+        self.memory_budget = memory_budget
+        self.preload = preload
+        self.refresh_period = refresh_period
+        self.refresh_fraction = refresh_fraction
+        self.buffer = buffer
+        self._backgrounds = []
+        self._path_args = set()
+        self._removed_args = set()
+        self._num_bytes = 0
+        self._num_samples = 0
+        self._lock = threading.Lock()
+        if self.preload:
+            self.fill()
+
+    @property
+    def num_bytes(self):
+        return self._num_bytes
+
+    def __len__(self):
+        return len(self._backgrounds)
+
+    def is_full(self):
+        """Checks if the pool reached its size or its memory budget.
+
+        # Returns
+            Boolean.
+        """
+        if len(self._backgrounds) == 0:
+            return False
+        if len(self._backgrounds) >= self.pool_size:
+            return True
+        if self.memory_budget is None:
+            return False
+        return self._num_bytes >= self.memory_budget
+
+    def _sample_path_arg(self):
+        num_paths = len(self.background_paths)
+        # backgrounds removed by a refresh are only reused if needed
+        excluded_args = self._path_args.union(self._removed_args)
+        if len(excluded_args) >= num_paths:
+            excluded_args = self._path_args
+        if len(excluded_args) < (num_paths // 2):
+            path_arg = np.random.randint(0, num_paths)
+            while path_arg in excluded_args:
+                path_arg = np.random.randint(0, num_paths)
+            return path_arg
+        path_args = set(range(num_paths)).difference(excluded_args)
+        return np.random.choice(sorted(path_args))
+
+    def _add(self):
+        path_arg = self._sample_path_arg()
+        background = load_image(self.background_paths[path_arg])
+        background.flags.writeable = False
+        self._backgrounds.append((path_arg, background))
+        self._path_args.add(path_arg)
+        self._num_bytes = self._num_bytes + background.nbytes
+        if self.is_full():
+            self._removed_args = set()
+        return len(self._backgrounds) - 1
+
+    def fill(self):
+        """Decodes backgrounds until the pool is full."""
+        with self._lock:
+            self._fill()
+
+    def _fill(self):
+        while not self.is_full():
+            self._add()
+
+    def refresh(self, fraction=None):
+        """Removes a random fraction of the pooled backgrounds. Removed
+        backgrounds are replaced by new ones when the pool is refilled.
+        Removed backgrounds are only added again if there are not enough
+        other backgrounds to fill the pool.
+
+        # Arguments
+            fraction: Float between [0, 1] or ``None``. If ``None``
+                ``refresh_fraction`` is used.
+        """
+        with self._lock:
+            self._refresh(fraction)
+
+    def _refresh(self, fraction=None):
+        fraction = self.refresh_fraction if fraction is None else fraction
+        num_removed = int(round(fraction * len(self._backgrounds)))
+        removed_args = np.random.choice(
+            len(self._backgrounds), num_removed, replace=False)
+        for background_arg in sorted(removed_args, reverse=True):
+            path_arg, background = self._backgrounds.pop(background_arg)
+            self._path_args.remove(path_arg)
+            self._removed_args.add(path_arg)
+            self._num_bytes = self._num_bytes - background.nbytes
+        if self.preload:
+            self._fill()
+
+    def _upscale(self, background_arg, shape):
+        path_arg, background = self._backgrounds[background_arg]
+        H, W = background.shape[:2]
+        if (shape[0] >= H) or (shape[1] >= W):
+            size = (max(W, shape[1] + self.buffer),
+                    max(H, shape[0] + self.buffer))
+            self._num_bytes = self._num_bytes - background.nbytes
+            background = resize_image(background.copy(), size, CUBIC)
+            background.flags.writeable = False
+            self._num_bytes = self._num_bytes + background.nbytes
+            self._backgrounds[background_arg] = (path_arg, background)
+        return background
+
+    def sample(self, shape):
+        """Samples a random crop of a random pooled background.
+
+        # Arguments
+            shape: List of two ints ``(H, W)``. Shape of the crop.
+
+        # Returns
+            Numpy array of shape ``(H, W, 3)``.
+        """
+        with self._lock:
+            self._num_samples = self._num_samples + 1
+            if self.refresh_period > 0:
+                if (self._num_samples % self.refresh_period) == 0:
+                    self._refresh()
+            if not self.is_full():
+                background_arg = self._add()
+            else:
+                background_arg = np.random.randint(0, len(self._backgrounds))
+            background = self._upscale(background_arg, shape)
+        H, W = background.shape[:2]
+        x_min = np.random.randint(0, W - shape[1])
+        y_min = np.random.randint(0, H - shape[0])
+        return background[y_min:y_min + shape[0], x_min:x_min + shape[1]]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_backgrounds'] = []
+        state['_path_args'] = set()
+        state['_removed_args'] = set()
+        state['_num_bytes'] = 0
+        state.pop('_lock')
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if self.preload:
+            self.fill()
@@ -0,0 +1,120 @@
+import os
+import json
+import shutil
+
+import numpy as np
+
+from .opencv_image import load_image, resize_image, BILINEAR
+
+
+IMAGE_STORE_VERSION = 1
+
+
+def write_image_store(directory, image_paths, num_channels=3, size=None,
+                      method=BILINEAR):
+    """Decodes images once and packs them as ``uint8`` pixels into a single
+    shard file together with an index of their offsets and shapes. Files
+    are first written to a temporary directory, such that other processes
+    never read a partial store.
+
+    # Arguments
+        directory: String. Path of the image store to be written.
+        image_paths: List of strings. Paths of the images to be packed.
+            Repeated paths are packed once.
+        num_channels: Int. Number of channels of the loaded images.
+        size: List of two ints ``(width, height)`` or ``None``. If given,
+            images are resized before being packed. Resized images are only
+            valid for pipelines whose labels are given in normalized
+            coordinates e.g. normalized boxes.
+        method: Interpolation flag used to resize images.
+
+    # Returns
+        ``ImageStore``.
+    """
+    image_paths = list(dict.fromkeys(image_paths))
+    index = np.zeros((len(image_paths), 4), dtype=np.int64)
+    temporary_directory = directory + '.%s.tmp' % os.getpid()
+    os.makedirs(temporary_directory, exist_ok=True)
+    shard_path = os.path.join(temporary_directory, 'images.bin')
+    offset = 0
+    with open(shard_path, 'wb') as shard_file:
+        for image_arg, image_path in enumerate(image_paths):
+            image = load_image(image_path, num_channels)
+            if image is None:
+                raise ValueError('Invalid image', image_path)
+            if size is not None:
+                image = resize_image(image, tuple(size), method)
+            image = np.ascontiguousarray(image, dtype=np.uint8)
+            shard_file.write(image.tobytes())
+            H, W = image.shape[:2]
+            # single channel images are stored without channel axis
+            C = image.shape[2] if image.ndim == 3 else 0
+            index[image_arg] = offset, H, W, C
+            offset = offset + image.size
+    np.save(os.path.join(temporary_directory, 'index.npy'), index)
+    metadata = {'version': IMAGE_STORE_VERSION, 'paths': image_paths,
+                'num_channels': num_channels, 'size': size}
+    metadata_path = os.path.join(temporary_directory, 'images.json')
+    with open(metadata_path, 'w') as filedata:
+        json.dump(metadata, filedata)
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.rename(temporary_directory, directory)
+    return ImageStore(directory)
+
+
+class ImageStore(object):
+    """Memory-mapped store of decoded images written by
+    ``write_image_store``. Images are returned as read-only views of the
+    shard file without any decoding.
+
+    # Arguments
+        directory: String. Path of the image store.
+
+    # Properties
+        num_channels: Int. Number of channels of the stored images.
+        size: List of two ints or ``None``. Size of the stored images if
+            they were resized.
+
+    # Notes
+        Image stores are pickled as their directory, therefore worker
+        processes memory-map the same shard file.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._open()
+
+    def _open(self):
+        metadata_path = os.path.join(self.directory, 'images.json')
+        with open(metadata_path, 'r') as filedata:
+            metadata = json.load(filedata)
+        if metadata['version'] != IMAGE_STORE_VERSION:
+            raise ValueError('Invalid image store version')
+        self.num_channels = metadata['num_channels']
+        self.size = metadata['size']
+        self._path_to_arg = {path: arg for arg, path
+                             in enumerate(metadata['paths'])}
+        self._index = np.load(os.path.join(self.directory, 'index.npy'))
+        shard_path = os.path.join(self.directory, 'images.bin')
+        self._images = np.zeros(0, dtype=np.uint8)
+        if os.path.getsize(shard_path) > 0:
+            self._images = np.memmap(shard_path, np.uint8, 'r')
+
+    def __len__(self):
+        return len(self._path_to_arg)
+
+    def __contains__(self, image_path):
+        return image_path in self._path_to_arg
+
+    def __getitem__(self, image_path):
+        offset, H, W, C = self._index[self._path_to_arg[image_path]]
+        shape = (H, W, C) if C > 0 else (H, W)
+        image = self._images[offset:offset + (H * W * max(C, 1))]
+        return np.asarray(image).reshape(shape)
+
+    def __getstate__(self):
+        return {'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.directory = state['directory']
+        self._open()
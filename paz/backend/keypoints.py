@@ -544,7 +544,7 @@ def initialize_translation(joints2D, camera_intrinsics, ratio):
 
 def solve_least_squares(solver, compute_joints_distance,
                         initial_joints_translation, joints3D,
-                        poses2D, camera_intrinsics):
+                        poses2D, camera_intrinsics, **kwargs):
     """Solve the least squares
 
     # Arguments
@@ -554,13 +554,15 @@ def solve_least_squares(solver, compute_joints_distance,
         joints3D: 16 moving joints in 3D
         poses2d: 2D poses
         camera_intrinsics: camera intrinsic parameters
+        kwargs: keyword arguments of the solver e.g. ``jac`` or
+            ``jac_sparsity``.
 
     Returns
         optimal translation of root joint for each person
     """
     joints_translation = solver(
         compute_joints_distance, initial_joints_translation, verbose=0,
-        args=(joints3D, poses2D, camera_intrinsics))
+        args=(joints3D, poses2D, camera_intrinsics), **kwargs)
     joints_translation = np.reshape(joints_translation.x, (-1, 3))
     return joints_translation
 
@@ -577,33 +579,19 @@ def get_bones_length(poses2D, poses3D, start_joints,
         sum_bones2D: array of sum of length of all bones in the 2D skeleton
         sum_bones3D: array of sum of length of all bones in the 3D skeleton
     """
-    sum_bones2D = []
-    sum_bones3D = []
     poses3D = np.reshape(poses3D, (poses3D.shape[0], 16, -1))
     poses2D = np.reshape(poses2D, (poses2D.shape[0], 16, -1))
+    bones2D = poses2D[:, start_joints] - poses2D[:, end_joints]
+    bones3D = poses3D[:, start_joints] - poses3D[:, end_joints]
+    sum_bones2D = np.sum(np.linalg.norm(bones2D, axis=2), axis=1)
+    sum_bones3D = np.sum(np.linalg.norm(bones3D, axis=2), axis=1)
+    return sum_bones2D, sum_bones3D
 
-    for person in poses2D:
-        person_sum_2D = 0
-        for arg in range(len(start_joints)):
-            bone_length = np.linalg.norm(person[start_joints[arg]] -
-                                         person[end_joints[arg]])
-            person_sum_2D = person_sum_2D + bone_length
-        sum_bones2D.append(person_sum_2D)
 
-    for person in poses3D:
-        person_sum_3D = 0
-        for arg in range(len(start_joints)):
-            bone_length = np.linalg.norm(person[start_joints[arg]] -
-                                         person[end_joints[arg]])
-            person_sum_3D = person_sum_3D + bone_length
-        sum_bones3D.append(person_sum_3D)
-
-    return np.array(sum_bones2D), np.array(sum_bones3D)
-
-
-def compute_reprojection_error(initial_translation, keypoints3D,
-                               keypoints2D, camera_intrinsics):
-    """compute distance between each person joints
+def compute_reprojection_residuals(initial_translation, keypoints3D,
+                                   keypoints2D, camera_intrinsics):
+    """compute differences between the 2D keypoints and the projection of
+    the translated 3D keypoints
 
     # Arguments
         initial_translation: initial guess of position of joint
@@ -612,21 +600,83 @@ def compute_reprojection_error(initial_translation, keypoints3D,
         camera_inrinsics: camera intrinsic parameters
 
     # Returns
-        person_sum: sum of L2 distances between each joint per person
+        residuals: array of differences of each joint coordinate (N*32)
     """
     initial_translation = np.reshape(initial_translation, (-1, 3))
-    new_poses3D = np.zeros((keypoints3D.shape))
-    for person in range(len(initial_translation)):
-        new_poses3D[person] = (keypoints3D[person] +
-                               initial_translation[person])
+    new_poses3D = keypoints3D + initial_translation[:, np.newaxis, :]
     new_poses3D = new_poses3D.reshape((-1, 3))
     rotation = np.identity(3)
     translation = np.zeros((3,))
     project2D = project_to_image(rotation, translation, new_poses3D,
                                  camera_intrinsics)
-    joints_distance = np.linalg.norm(np.ravel(keypoints2D) -
-                                     np.ravel(project2D))
+    return np.ravel(keypoints2D) - np.ravel(project2D)
+
+
+def compute_reprojection_jacobian(initial_translation, keypoints3D,
+                                  keypoints2D, camera_intrinsics):
+    """compute the jacobian of ``compute_reprojection_residuals`` with
+    respect to the translation of each person
+
+    # Arguments
+        initial_translation: initial guess of position of joint
+        keypoints3D: 3D keypoints to be optimized (Nx16x3)
+        keypoints2D: 2D keypoints (Nx32)
+        camera_inrinsics: camera intrinsic parameters
+
+    # Returns
+        jacobian: block diagonal sparse matrix (N*32xN*3)
+    """
+    # scipy is only required by the solvers using this jacobian
+    from scipy.sparse import bsr_matrix
+    initial_translation = np.reshape(initial_translation, (-1, 3))
+    num_persons, num_joints = keypoints3D.shape[:2]
+    new_poses3D = keypoints3D + initial_translation[:, np.newaxis, :]
+    x, y, z = np.moveaxis(new_poses3D, 2, 0)
+    x_focal_length = camera_intrinsics[0, 0]
+    y_focal_length = camera_intrinsics[1, 1]
+    blocks = np.zeros((num_persons, num_joints, 2, 3))
+    blocks[:, :, 0, 0] = -x_focal_length / z
+    blocks[:, :, 0, 2] = x_focal_length * x / (z ** 2)
+    blocks[:, :, 1, 1] = -y_focal_length / z
+    blocks[:, :, 1, 2] = y_focal_length * y / (z ** 2)
+    blocks = np.reshape(blocks, (num_persons, num_joints * 2, 3))
+    person_args = np.arange(num_persons + 1)
+    shape = (num_persons * num_joints * 2, num_persons * 3)
+    return bsr_matrix((blocks, person_args[:-1], person_args), shape=shape)
+
+
+def compute_reprojection_sparsity(num_persons, num_joints=16):
+    """compute the sparsity structure of the jacobian of
+    ``compute_reprojection_residuals``. The residuals of each person only
+    depend on the translation of that person.
+
+    # Arguments
+        num_persons: Int. Number of persons
+        num_joints: Int. Number of joints per person
+
+    # Returns
+        sparsity: block diagonal array of zeros and ones (N*32xN*3)
+    """
+    block = np.ones((num_joints * 2, 3))
+    return np.kron(np.identity(num_persons), block)
+
+
+def compute_reprojection_error(initial_translation, keypoints3D,
+                               keypoints2D, camera_intrinsics):
+    """compute distance between each person joints
+
+    # Arguments
+        initial_translation: initial guess of position of joint
+        keypoints3D: 3D keypoints to be optimized (Nx16x3)
+        keypoints2D: 2D keypoints (Nx32)
+        camera_inrinsics: camera intrinsic parameters
 
+    # Returns
+        person_sum: sum of L2 distances between each joint per person
+    """
+    residuals = compute_reprojection_residuals(
+        initial_translation, keypoints3D, keypoints2D, camera_intrinsics)
+    joints_distance = np.linalg.norm(residuals)
     return np.sum(joints_distance)
 
 
@@ -706,18 +756,16 @@ def compute_optimized_pose3D(keypoints3D, joint_translation,
     # Returns
         optimized_poses3D: np array of optimized posed3D
     """
-    optimized_pose3D = []
-    projected_pose2D = []
-    for person in range(keypoints3D.shape[0]):
-        translated_pose = keypoints3D[person] + joint_translation[person]
-        rotation = np.identity(3)
-        translation = np.zeros((3,))
-        translated_pose = translated_pose.reshape((-1, 3))
-        points = project_to_image(rotation, translation, translated_pose,
-                                  camera_intrinsics)
-        optimized_pose3D.append(translated_pose)
-        projected_pose2D.append(np.reshape(points, [1, 64]))
-    return np.array(optimized_pose3D), np.array(projected_pose2D)
+    num_persons, num_keypoints = keypoints3D.shape[:2]
+    joint_translation = np.reshape(joint_translation, (num_persons, 1, 3))
+    optimized_pose3D = keypoints3D + joint_translation
+    rotation = np.identity(3)
+    translation = np.zeros((3,))
+    points = project_to_image(rotation, translation,
+                              optimized_pose3D.reshape((-1, 3)),
+                              camera_intrinsics)
+    projected_pose2D = np.reshape(points, (num_persons, 1, num_keypoints * 2))
+    return optimized_pose3D, projected_pose2D
 
 
 def human_pose3D_to_pose6D(poses3D):
@@ -725,7 +773,7 @@ def human_pose3D_to_pose6D(poses3D):
     Estiate human pose 6D of the root joint from 3D pose of human joints.
 
     # Arguments
-    poses3D: numpy array 
+    poses3D: numpy array
              3D pose of human joint
 
     # return
@@ -734,29 +782,49 @@ def human_pose3D_to_pose6D(poses3D):
     translation: list
                  translation of human root joint
     """
-    right_hip = poses3D[1]
-    left_hip = poses3D[6]
-    thorax = poses3D[13]
+    rotations, translations = human_poses3D_to_poses6D(poses3D[np.newaxis])
+    return rotations[0], translations[0].tolist()
+
+
+def human_poses3D_to_poses6D(poses3D):
+    """
+    Estiate human poses 6D of the root joints from 3D poses of many humans.
+
+    # Arguments
+    poses3D: numpy array of shape (num_persons, num_joints, 3)
+             3D poses of human joints
+
+    # return
+    rotation_matrices: numpy array of shape (num_persons, 3, 3)
+                       rotations of human root joints
+    translations: numpy array of shape (num_persons, 3)
+                  translations of human root joints in meters
+    """
+    right_hip = poses3D[:, 1]
+    left_hip = poses3D[:, 6]
+    thorax = poses3D[:, 13]
 
     # Calculate x, y, and z vectors
     x_vector = right_hip - left_hip
     projection_vector = thorax - left_hip
 
     # Calculate projection of projection_vector onto x_vector
-    scalar_projection = np.dot(x_vector, projection_vector)
-    scalar_projection = scalar_projection / np.linalg.norm(x_vector) ** 2
+    x_norm = np.linalg.norm(x_vector, axis=1, keepdims=True)
+    scalar_projection = np.sum(x_vector * projection_vector, axis=1,
+                               keepdims=True)
+    scalar_projection = scalar_projection / x_norm ** 2
     projected_point = left_hip + scalar_projection * x_vector
     z_vector = thorax - projected_point
 
     # Normalize vectors
-    x_unit_vector = x_vector / np.linalg.norm(x_vector)
-    z_unit_vector = z_vector / np.linalg.norm(z_vector)
+    x_unit_vector = x_vector / x_norm
+    z_unit_vector = z_vector / np.linalg.norm(z_vector, axis=1, keepdims=True)
     y_unit_vector = np.cross(z_unit_vector, x_unit_vector)
 
-    # Create rotation matrix
-    rotation_matrix = np.column_stack((x_unit_vector, y_unit_vector,
-                                       z_unit_vector))
+    # Create rotation matrices
+    rotation_matrices = np.stack((x_unit_vector, y_unit_vector,
+                                  z_unit_vector), axis=2)
 
     # Convert translation units and return
-    translation = (poses3D[0] / 1e3).tolist()  # Convert mm to meters
-    return rotation_matrix, translation
+    translations = poses3D[:, 0] / 1e3  # Convert mm to meters
+    return rotation_matrices, translations
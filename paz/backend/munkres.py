@@ -91,3 +91,97 @@ def find_smallest_uncovered(n, row_covered, col_covered, cost_matrix):
                         minval > cost_matrix[i][j]:
                     minval = cost_matrix[i][j]
     return minval
+
+
+def to_cost_array(cost_matrix):
+    """Converts a cost matrix into a float array. ``DISALLOWED`` elements
+    are given an infinite cost.
+
+    # Arguments
+        cost_matrix: List of lists or numpy array of shape `(H, W)`.
+
+    # Returns
+        Numpy array of shape `(H, W)`.
+    """
+    if isinstance(cost_matrix, np.ndarray) and cost_matrix.dtype != object:
+        return cost_matrix.astype(np.float64)
+    cost_array = [[np.inf if isinstance(value, DISALLOWED_OBJ) else value
+                   for value in row] for row in cost_matrix]
+    return np.array(cost_array, dtype=np.float64)
+
+
+def _find_shortest_augmenting_path(cost, u, v, row4col, start_row):
+    num_cols = cost.shape[1]
+    shortest_costs = np.full(num_cols, np.inf)
+    path = np.full(num_cols, -1, dtype=int)
+    visited_rows = np.zeros(len(cost), dtype=bool)
+    visited_cols = np.zeros(num_cols, dtype=bool)
+    min_value, row, sink = 0.0, start_row, -1
+    while sink == -1:
+        visited_rows[row] = True
+        reduced_costs = min_value + cost[row] - u[row] - v
+        is_shorter = ~visited_cols & (reduced_costs < shortest_costs)
+        path[is_shorter] = row
+        shortest_costs[is_shorter] = reduced_costs[is_shorter]
+        remaining_costs = np.where(visited_cols, np.inf, shortest_costs)
+        min_value = np.min(remaining_costs)
+        if min_value == np.inf:
+            raise UnsolvableMatrix("Matrix cannot be solved!")
+        # free columns are preferred among columns with equal cost
+        col_args = np.flatnonzero(remaining_costs == min_value)
+        free_col_args = col_args[row4col[col_args] == -1]
+        if len(free_col_args) > 0:
+            sink = free_col_args[0]
+        else:
+            row = row4col[col_args[0]]
+        visited_cols[col_args[0] if sink == -1 else sink] = True
+    return sink, path, shortest_costs, min_value, visited_rows, visited_cols
+
+
+def solve_assignment(cost_matrix):
+    """Solves the rectangular linear assignment problem with a shortest
+    augmenting path algorithm (Jonker-Volgenant). Each row augmentation is
+    vectorized over all columns.
+
+    # Arguments
+        cost_matrix: List of lists or numpy array of shape `(H, W)`.
+            Elements can be ``DISALLOWED`` to forbid an assignment.
+
+    # Returns
+        List of `min(H, W)` tuples `(row_arg, col_arg)` sorted by row with
+            the assignments of minimum total cost.
+
+    # References
+        - [On implementing 2D rectangular assignment algorithms](
+            https://ieeexplore.ieee.org/document/7738348)
+    """
+    cost = to_cost_array(cost_matrix)
+    if cost.size == 0:
+        return []
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    num_rows, num_cols = cost.shape
+    u, v = np.zeros(num_rows), np.zeros(num_cols)
+    col4row = np.full(num_rows, -1, dtype=int)
+    row4col = np.full(num_cols, -1, dtype=int)
+    for start_row in range(num_rows):
+        sink, path, shortest_costs, min_value, visited_rows, visited_cols = (
+            _find_shortest_augmenting_path(cost, u, v, row4col, start_row))
+        # updating dual variables
+        u[start_row] = u[start_row] + min_value
+        visited_rows[start_row] = False
+        u[visited_rows] += min_value - shortest_costs[col4row[visited_rows]]
+        v[visited_cols] -= min_value - shortest_costs[visited_cols]
+        # augmenting the assignments along the path
+        col_arg = sink
+        while True:
+            row_arg = path[col_arg]
+            row4col[col_arg] = row_arg
+            col4row[row_arg], col_arg = col_arg, col4row[row_arg]
+            if row_arg == start_row:
+                break
+    assignments = list(zip(range(num_rows), col4row.tolist()))
+    if transposed:
+        assignments = sorted([(row, col) for col, row in assignments])
+    return assignments
@@ -273,6 +273,79 @@ def predict(x, model, preprocess=None, postprocess=None):
     return y
 
 
+def _to_numpy(y):
+    if isinstance(y, (list, tuple)):
+        return [_to_numpy(output) for output in y]
+    if isinstance(y, tf.Tensor):
+        y = y.numpy()
+    return y
+
+
+def _split_samples(y, num_samples):
+    if isinstance(y, list):
+        outputs = [_split_samples(output, num_samples) for output in y]
+        return [list(sample_outputs) for sample_outputs in zip(*outputs)]
+    return [y[sample_arg:sample_arg + 1] for sample_arg in range(num_samples)]
+
+
+def pad_batch_dimension(x, batch_size):
+    """Pads the batch dimension of an array with zeros.
+
+    # Arguments
+        x: Array of shape ``(num_samples, ...)``.
+        batch_size: Int. Size of the padded batch dimension.
+
+    # Returns
+        Array of shape ``(batch_size, ...)``.
+    """
+    if len(x) > batch_size:
+        raise ValueError('Array has more samples than the batch size')
+    padding = np.zeros((batch_size - len(x), *x.shape[1:]), dtype=x.dtype)
+    return np.concatenate([x, padding], axis=0)
+
+
+def predict_batch(inputs, model, preprocess=None, postprocess=None,
+                  batch_size=None, pad_batch=False):
+    """Preprocess each input, predict all of them with a single model call
+    per batch and postprocess each output.
+    # Arguments
+        inputs: List of inputs to model.
+        model: Callable i.e. Keras model.
+        preprocess: Callable, used for preprocessing each input. It must
+            return an array with a leading batch dimension of one.
+        postprocess: Callable, used for postprocessing each output. Each
+            output keeps a leading batch dimension of one.
+        batch_size: Int or ``None``. Maximum number of inputs given to
+            the model in a single call. If ``None`` all inputs are given
+            at once.
+        pad_batch: Boolean. If ``True`` every batch is padded with zeros to
+            ``batch_size`` samples, such that the model always receives
+            the same input shape and compiled models are not retraced.
+
+    # Returns
+        List with the postprocessed output of each input.
+
+    # Note
+        If model outputs a tf.Tensor is converted automatically to numpy array.
+        Models with several outputs return a list of outputs per input.
+    """
+    if preprocess is not None:
+        inputs = [preprocess(x) for x in inputs]
+    if batch_size is None:
+        batch_size = max(len(inputs), 1)
+    outputs = []
+    for batch_arg in range(0, len(inputs), batch_size):
+        x = np.concatenate(inputs[batch_arg:batch_arg + batch_size], axis=0)
+        num_samples = len(x)
+        if pad_batch:
+            x = pad_batch_dimension(x, batch_size)
+        y = _to_numpy(model(x))
+        outputs.extend(_split_samples(y, num_samples))
+    if postprocess is not None:
+        outputs = [postprocess(y) for y in outputs]
+    return outputs
+
+
 def predict_with_nones(x, model, preprocess=None, postprocess=None):
     """Preprocess, predict and postprocess batched input.
     # Arguments
@@ -0,0 +1,126 @@
+import os
+import json
+import shutil
+import hashlib
+
+from ..abstract import ColumnarDataset
+
+
+CACHE_VERSION = 2
+
+
+def get_cache_directory(cache_directory=None):
+    """Returns the directory in which parsed annotations are cached.
+
+    # Arguments
+        cache_directory: String or ``None``. If ``None`` annotations are
+            cached in ``$KERAS_HOME/paz/annotations``.
+
+    # Returns
+        String. Path to cache directory.
+    """
+    if cache_directory is not None:
+        return cache_directory
+    cache_directory = os.environ.get(
+        'KERAS_HOME', os.path.join(os.path.expanduser('~'), '.keras'))
+    return os.path.join(cache_directory, 'paz', 'annotations')
+
+
+def compute_cache_key(source_paths, arguments):
+    """Computes a key identifying the parsed annotations of a dataset.
+    The key changes if any source file is modified, added or removed or
+    if any loader argument changes.
+
+    # Arguments
+        source_paths: List of strings. Paths of the annotation files or
+            directories parsed by the loader.
+        arguments: Dictionary with the loader arguments that change the
+            parsed annotations e.g. split or class names.
+
+    # Returns
+        String. Hexadecimal hash of the sources and arguments.
+    """
+    hash_function = hashlib.sha1()
+    hash_function.update(str(CACHE_VERSION).encode('utf-8'))
+    hash_function.update(
+        json.dumps(arguments, sort_keys=True, default=str).encode('utf-8'))
+    for source_path in source_paths:
+        source_stat = os.stat(source_path)
+        source = '%s:%d:%d;' % (os.path.abspath(source_path),
+                                source_stat.st_mtime_ns, source_stat.st_size)
+        hash_function.update(source.encode('utf-8'))
+    return hash_function.hexdigest()
+
+
+def write_annotations(directory, data):
+    """Writes a list of samples as a ``ColumnarDataset``.
+    Every key of the samples is written as a single array containing the
+    values of all samples concatenated along the first axis, together
+    with the offsets of every sample. Files are first written to a
+    temporary directory, such that other processes never read partial
+    files.
+
+    # Arguments
+        directory: String. Path of the cache directory to be written.
+        data: List of dictionaries or ``ColumnarDataset``. All dictionaries
+            must have the same keys and their values must be strings,
+            scalars or arrays whose first axis can be concatenated.
+    """
+    if not isinstance(data, ColumnarDataset):
+        data = ColumnarDataset.from_samples(data)
+    temporary_directory = directory + '.%s.tmp' % os.getpid()
+    data.save(temporary_directory)
+    try:
+        os.rename(temporary_directory, directory)
+    except OSError:
+        # another process wrote the same annotations first
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+
+def read_annotations(directory, mmap=True, columnar=False):
+    """Reads samples written with ``write_annotations``.
+
+    # Arguments
+        directory: String. Path of the cache directory.
+        mmap: Boolean. If ``True`` arrays are memory-mapped and the
+            values of every sample are read-only views of them.
+        columnar: Boolean. If ``True`` samples are returned as a
+            ``ColumnarDataset`` instead of a list of dictionaries.
+
+    # Returns
+        List of dictionaries or ``ColumnarDataset``.
+    """
+    data = ColumnarDataset.load(directory, mmap)
+    return data if columnar else data.to_list()
+
+
+def load_cached_annotations(load_data, name, source_paths, arguments,
+                            cache_directory=None, mmap=True,
+                            columnar=False):
+    """Loads parsed annotations from the cache or parses and caches them.
+    Annotations are returned as read from the cache in both cases, such
+    that cached and freshly parsed annotations have the same types.
+
+    # Arguments
+        load_data: Function without arguments returning the parsed
+            annotations as a list of dictionaries.
+        name: String. Dataset name used as prefix of the cache directory.
+        source_paths: List of strings. Paths of the annotation files or
+            directories parsed by ``load_data``.
+        arguments: Dictionary with the loader arguments that change the
+            parsed annotations.
+        cache_directory: String or ``None``. Directory of all caches.
+        mmap: Boolean. If ``True`` cached arrays are memory-mapped.
+        columnar: Boolean. If ``True`` annotations are returned as a
+            ``ColumnarDataset``.
+
+    # Returns
+        List of dictionaries or ``ColumnarDataset``.
+    """
+    key = compute_cache_key(source_paths, arguments)
+    cache_directory = get_cache_directory(cache_directory)
+    directory = os.path.join(cache_directory, '%s-%s' % (name, key[:16]))
+    if not os.path.exists(os.path.join(directory, 'columns.json')):
+        os.makedirs(cache_directory, exist_ok=True)
+        write_annotations(directory, load_data())
+    return read_annotations(directory, mmap, columnar)
@@ -4,6 +4,7 @@ import glob
 from paz.abstract import Loader
 
 from .utils import get_class_names
+from .cache import load_cached_annotations
 
 
 class CityScapes(Loader):
@@ -16,12 +17,17 @@ class CityScapes(Loader):
         split: String. Valid option contain 'train', 'val' or 'test'.
         class_names: String or list: If 'all' then it loads all default
             class names.
+        cache: Boolean. If ``True`` the found paths are cached and reused
+            until a city directory changes.
+        cache_directory: String or ``None``. Directory of the cached
+            paths. If ``None`` ``$KERAS_HOME/paz/annotations`` is used.
 
     # References
         -[The Cityscapes Dataset for Semantic Urban Scene Understanding](
         https://www.cityscapes-dataset.com/citation/)
     """
-    def __init__(self, image_path, label_path, split, class_names='all'):
+    def __init__(self, image_path, label_path, split, class_names='all',
+                 cache=False, cache_directory=None):
         if split not in ['train', 'val', 'test']:
             raise ValueError('Invalid split name:', split)
         self.image_path = os.path.join(image_path, split)
@@ -30,8 +36,24 @@ class CityScapes(Loader):
             class_names = get_class_names('CityScapes')
         super(CityScapes, self).__init__(
             None, split, class_names, 'CityScapes')
+        self.cache = cache
+        self.cache_directory = cache_directory
 
     def load_data(self):
+        if not self.cache:
+            return self._load_paths()
+        # files added or removed in a city change its directory mtime
+        source_paths = []
+        for path in [self.image_path, self.label_path]:
+            source_paths.append(path)
+            source_paths.extend(sorted(glob.glob(os.path.join(path, '*/'))))
+        arguments = {'image_path': self.image_path,
+                     'label_path': self.label_path}
+        return load_cached_annotations(
+            self._load_paths, self.name, source_paths, arguments,
+            self.cache_directory)
+
+    def _load_paths(self):
         image_path = os.path.join(self.image_path, '*/*.png')
         label_path = os.path.join(self.label_path, '*/*labelIds.png')
         image_paths = glob.glob(image_path)
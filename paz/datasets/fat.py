@@ -1,12 +1,14 @@
 import os
 from glob import glob
+from functools import partial
 import json
 
 import numpy as np
 from tensorflow.keras.utils import Progbar
 
-from ..abstract import Loader
-from .utils import get_class_names
+from ..abstract import Loader, ColumnarDataset
+from .utils import get_class_names, map_files
+from .cache import load_cached_annotations
 
 
 class FAT(Loader):
@@ -19,21 +21,57 @@ class FAT(Loader):
             e.g. `train`, `val` or `test`
         class_names: `all` or list. If list it should contain as elements
             strings indicating each class name.
+        cache: Boolean. If ``True`` parsed annotations are cached and
+            memory-mapped in subsequent loads.
+        cache_directory: String or ``None``. Directory of the cached
+            annotations. If ``None`` ``$KERAS_HOME/paz/annotations`` is used.
+        columnar: Boolean. If ``True`` ``load_data`` returns a
+            ``ColumnarDataset`` instead of a list of dictionaries.
+        num_workers: Int. Number of workers parsing the JSON files in
+            parallel. Samples are returned in the same order independently
+            of the number of workers.
+        use_processes: Boolean. If ``True`` workers are processes instead
+            of threads.
+        verbose: Boolean. If ``True`` the number of parsed files per second
+            is printed.
 
     # References
         - [Deep Object Pose
             Estimation (DOPE)](https://github.com/NVlabs/Deep_Object_Pose)
     """
     # TODO: Allow selection of class_names.
-    def __init__(self, path, split='train', class_names='all'):
+    def __init__(self, path, split='train', class_names='all', cache=False,
+                 cache_directory=None, columnar=False, num_workers=0,
+                 use_processes=False, verbose=False):
         if class_names == 'all':
             class_names = get_class_names('FAT')
         self.class_to_arg = dict(
             zip(class_names, list(range(len(class_names)))))
+        self.cache = cache
+        self.cache_directory = cache_directory
+        self.columnar = columnar
+        self.num_workers = num_workers
+        self.use_processes = use_processes
+        self.verbose = verbose
 
         super(FAT, self).__init__(path, split, class_names, 'FAT')
 
     def load_data(self):
+        image_paths, label_paths = self._load_paths()
+        if not self.cache:
+            data = self._load_boxes(image_paths, label_paths)
+            if self.columnar:
+                data = ColumnarDataset.from_samples(data)
+            return data
+        arguments = {'path': self.path, 'split': self.split,
+                     'class_names': self.class_names}
+        self.data = load_cached_annotations(
+            lambda: self._load_boxes(image_paths, label_paths), self.name,
+            image_paths + label_paths, arguments, self.cache_directory,
+            columnar=self.columnar)
+        return self.data
+
+    def _load_paths(self):
         scene_names = glob(self.path + 'mixed/*')
         image_paths, label_paths = [], []
         for scene_name in scene_names:
@@ -47,36 +85,28 @@ class FAT(Loader):
                 scene_label_paths = scene_label_paths + side_label_paths
             image_paths = image_paths + scene_image_paths
             label_paths = label_paths + scene_label_paths
+        return image_paths, label_paths
 
-        self.data = []
-        progress_bar = Progbar(len(image_paths))
-        for sample_arg, sample in enumerate(zip(image_paths, label_paths)):
-            image_path, label_path = sample
+    def _load_boxes(self, image_paths, label_paths):
+        for image_path, label_path in zip(image_paths, label_paths):
             if not self._valid_name_match(image_path, label_path):
                 raise ValueError('Invalid name match:', image_path, label_path)
-            boxes = self._extract_boxes(label_path)
+        self.data = []
+        progress_bar = Progbar(len(image_paths))
+        parse = partial(parse_JSON, class_to_arg=self.class_to_arg)
+        name = self.name if self.verbose else None
+        boxes_per_sample = map_files(parse, label_paths, self.num_workers,
+                                     self.use_processes, name=name)
+        samples = zip(boxes_per_sample, image_paths)
+        for sample_arg, (boxes, image_path) in enumerate(samples):
+            progress_bar.update(sample_arg + 1)
             if boxes is None:
                 continue
             self.data.append({'image': image_path, 'boxes': boxes})
-            progress_bar.update(sample_arg + 1)
         return self.data
 
     def _extract_boxes(self, json_filename):
-        json_data = json.load(open(json_filename, 'r'))
-        num_objects = len(json_data['objects'])
-        if num_objects == 0:
-            return None
-        box_data = np.zeros((num_objects, 5))
-        for object_arg, object_data in enumerate(json_data['objects']):
-            bounding_box = object_data['bounding_box']
-            y_min, x_min = bounding_box['top_left']
-            y_max, x_max = bounding_box['bottom_right']
-            x_min, y_min = x_min / 960., y_min / 540.
-            x_max, y_max = x_max / 960., y_max / 540.
-            box_data[object_arg, :4] = x_min, y_min, x_max, y_max
-            class_name = object_data['class'][:-4]
-            box_data[object_arg, -1] = self.class_to_arg[class_name]
-        return box_data
+        return parse_JSON(json_filename, self.class_to_arg)
 
     def _base_number(self, filename):
         order = os.path.basename(filename)
@@ -88,3 +118,32 @@ class FAT(Loader):
         image_name = os.path.basename(image_path)
         label_name = os.path.basename(label_path)
         return image_name[:-3] == label_name[:-4]
+
+
+def parse_JSON(filepath, class_to_arg):
+    """Parses the boxes of a single FAT JSON annotation file.
+
+    # Arguments
+        filepath: String. Path to JSON annotation file.
+        class_to_arg: Dictionary mapping class names to class arguments.
+
+    # Returns
+        Numpy array of shape ``[num_objects, 4 + 1]`` or ``None`` if the
+            file contains no objects.
+    """
+    with open(filepath, 'r') as filedata:
+        json_data = json.load(filedata)
+    num_objects = len(json_data['objects'])
+    if num_objects == 0:
+        return None
+    box_data = np.zeros((num_objects, 5))
+    for object_arg, object_data in enumerate(json_data['objects']):
+        bounding_box = object_data['bounding_box']
+        y_min, x_min = bounding_box['top_left']
+        y_max, x_max = bounding_box['bottom_right']
+        x_min, y_min = x_min / 960., y_min / 540.
+        x_max, y_max = x_max / 960., y_max / 540.
+        box_data[object_arg, :4] = x_min, y_min, x_max, y_max
+        class_name = object_data['class'][:-4]
+        box_data[object_arg, -1] = class_to_arg[class_name]
+    return box_data
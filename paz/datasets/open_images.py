@@ -3,7 +3,8 @@ import mmap
 
 import numpy as np
 
-from ..abstract import Loader
+from ..abstract import Loader, ColumnarDataset
+from .cache import load_cached_annotations
 
 
 CLASS_DESCRIPTIONS_FILE = 'class-descriptions-boxable.csv'
@@ -20,10 +21,19 @@ class OpenImages(Loader):
             e.g. `train`, `val` or `test`
         class_names: `all` or list. If list it should contain as elements
             the strings of the class names.
+        cache: Boolean. If ``True`` parsed annotations are cached and
+            memory-mapped in subsequent loads. Cached boxes are returned
+            as arrays of shape ``(num_boxes, 4 + 1)``.
+        cache_directory: String or ``None``. Directory of the cached
+            annotations. If ``None`` ``$KERAS_HOME/paz/annotations`` is used.
+        columnar: Boolean. If ``True`` ``load_data`` returns a
+            ``ColumnarDataset`` with all boxes in a single array instead
+            of a list of dictionaries.
 
     """
     # TODO Allow selection of subset of class names.
-    def __init__(self, path, split='train', class_names='all'):
+    def __init__(self, path, split='train', class_names='all', cache=False,
+                 cache_directory=None, columnar=False):
 
         if split == 'val':
             split = 'validation'
@@ -33,6 +43,9 @@ class OpenImages(Loader):
 
         super(OpenImages, self).__init__(
             path, split, class_names, 'OpenImages')
+        self.cache = cache
+        self.cache_directory = cache_directory
+        self.columnar = columnar
 
         self.machine_to_human_name = dict()
         self.machine_to_arg = dict()
@@ -77,7 +90,42 @@ class OpenImages(Loader):
         return lines
 
     def load_data(self):
+        if not self.cache:
+            data = self._load_annotations()
+            if self.columnar:
+                data = ColumnarDataset.from_samples(data)
+            return data
+        annotations_filepath = os.path.join(
+            self.path, BBOX_ANNOTATIONS_FILE.format(self.split))
+        classes_filepath = os.path.join(self.path, CLASS_DESCRIPTIONS_FILE)
+        arguments = {'path': self.path, 'split': self.split,
+                     'class_names': self.class_names}
+        data = load_cached_annotations(
+            self._load_annotations, self.name,
+            [annotations_filepath, classes_filepath], arguments,
+            self.cache_directory, columnar=self.columnar)
+        self._count_classes(data)
+        return data
+
+    def _count_classes(self, data):
+        arg_to_human_name = {}
+        for machine_name, class_arg in self.machine_to_arg.items():
+            arg_to_human_name[class_arg] = (
+                self.machine_to_human_name[machine_name])
+        if isinstance(data, ColumnarDataset):
+            class_args = np.asarray(data.columns['boxes'][:, 4])
+        else:
+            class_args = [sample['boxes'][:, 4] for sample in data]
+            class_args = np.concatenate(class_args + [np.zeros(0)])
+        class_args = class_args.astype(int)
+        class_counts = np.bincount(class_args, minlength=self.num_classes)
+        for class_name in self.class_distribution.keys():
+            self.class_distribution[class_name] = 0
+        for class_arg, class_count in enumerate(class_counts):
+            human_name = arg_to_human_name[class_arg]
+            self.class_distribution[human_name] = int(class_count)
 
+    def _load_annotations(self):
         data = dict()
         annotations_filepath = os.path.join(
             self.path, BBOX_ANNOTATIONS_FILE.format(self.split))
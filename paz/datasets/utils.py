@@ -1,3 +1,8 @@
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
 def get_class_names(dataset_name='VOC2007'):
     """Gets label names for the classes of the supported datasets.
 
@@ -117,3 +122,51 @@ def get_arg_to_class(class_names):
     """
 
     return dict(zip(list(range(len(class_names))), class_names))
+
+
+def map_files(parse, filepaths, num_workers=0, use_processes=False,
+              chunksize=16, name=None):
+    """Applies ``parse`` to every file using a pool of workers.
+    Results are yielded in the same order as ``filepaths`` independently
+    of the number of workers.
+
+    # Arguments
+        parse: Function taking a file path. If ``use_processes`` is
+            ``True`` it must be picklable e.g. a module function or a
+            ``functools.partial`` of it.
+        filepaths: List of strings. Paths of the files to be parsed.
+        num_workers: Int. Number of parallel workers. If ``0`` files are
+            parsed sequentially in the calling thread.
+        use_processes: Boolean. If ``True`` files are parsed in worker
+            processes instead of threads. Processes avoid the global
+            interpreter lock for CPU bound parsing, while threads are
+            enough to overlap the reads of files on network storage.
+        chunksize: Int. Number of files parsed by a worker per task.
+        name: String or ``None``. If given, the parse throughput is
+            printed with this name once all files are parsed.
+
+    # Returns
+        Generator of the outputs of ``parse``.
+    """
+    start = time.perf_counter()
+    if num_workers == 0:
+        for filepath in filepaths:
+            yield parse(filepath)
+    else:
+        Executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        chunks = [filepaths[arg:arg + chunksize]
+                  for arg in range(0, len(filepaths), chunksize)]
+        with Executor(num_workers) as executor:
+            parse_chunk = partial(_parse_chunk, parse)
+            for outputs in executor.map(parse_chunk, chunks):
+                for output in outputs:
+                    yield output
+    if name is not None:
+        duration = max(time.perf_counter() - start, 1e-9)
+        message = '{}: parsed {} files in {:.2f}s ({:.0f} files/s)'
+        print(message.format(name, len(filepaths), duration,
+                             len(filepaths) / duration))
+
+
+def _parse_chunk(parse, filepaths):
+    return [parse(filepath) for filepath in filepaths]
@@ -1,9 +1,11 @@
 import os
+from functools import partial
 from xml.etree import ElementTree
-from .utils import get_class_names
+from .utils import get_class_names, map_files
+from .cache import load_cached_annotations
 
 import numpy as np
-from ..abstract import Loader
+from ..abstract import Loader, ColumnarDataset
 
 
 class VOC(Loader):
@@ -21,6 +23,18 @@ class VOC(Loader):
             will be added to the returned data.
         evaluate: Boolean. If ``True`` returned data will be loaded without
             normalization for a direct evaluation.
+        cache: Boolean. If ``True`` parsed annotations are cached and
+            memory-mapped in subsequent loads.
+        cache_directory: String or ``None``. Directory of the cached
+            annotations. If ``None`` ``$KERAS_HOME/paz/annotations`` is used.
+        columnar: Boolean. If ``True`` ``load_data`` returns a
+            ``ColumnarDataset`` instead of a list of dictionaries.
+        num_workers: Int. Number of workers parsing the XML files in
+            parallel. If ``0`` files are parsed sequentially.
+        use_processes: Boolean. If ``True`` workers are processes instead
+            of threads.
+        verbose: Boolean. If ``True`` the number of parsed files per second
+            is printed.
 
     # Return
         data: List of dictionaries with keys corresponding to the image paths
@@ -31,12 +45,20 @@ class VOC(Loader):
     """
     # TODO check for split
     def __init__(self, path=None, split='train', class_names='all',
-                 name='VOC2007', with_difficult_samples=True, evaluate=False):
+                 name='VOC2007', with_difficult_samples=True, evaluate=False,
+                 cache=False, cache_directory=None, columnar=False,
+                 num_workers=0, use_processes=False, verbose=False):
 
         super(VOC, self).__init__(path, split, class_names, name)
 
         self.with_difficult_samples = with_difficult_samples
         self.evaluate = evaluate
+        self.cache = cache
+        self.cache_directory = cache_directory
+        self.columnar = columnar
+        self.num_workers = num_workers
+        self.use_processes = use_processes
+        self.verbose = verbose
         self._class_names = class_names
         if class_names == 'all':
             self._class_names = get_class_names('VOC')
@@ -63,7 +85,13 @@ class VOC(Loader):
                                 self._class_names,
                                 self.with_difficult_samples,
                                 self.path,
-                                self.evaluate)
+                                self.evaluate,
+                                self.cache,
+                                self.cache_directory,
+                                self.columnar,
+                                self.num_workers,
+                                self.use_processes,
+                                self.verbose)
         self.images_path = self.parser.images_path
         self.arg_to_class = self.parser.arg_to_class
         ground_truth_data = self.parser.load_data()
@@ -77,6 +105,19 @@ class VOCParser(object):
 
     # Arguments
         data_path: Data path to VOC2007 annotations
+        cache: Boolean. If ``True`` parsed annotations are cached and
+            memory-mapped in subsequent loads.
+        cache_directory: String or ``None``. Directory of the cached
+            annotations.
+        columnar: Boolean. If ``True`` ``load_data`` returns a
+            ``ColumnarDataset`` instead of a list of dictionaries.
+        num_workers: Int. Number of workers parsing the XML files in
+            parallel. Samples are returned in the order of the split file
+            independently of the number of workers.
+        use_processes: Boolean. If ``True`` workers are processes instead
+            of threads.
+        verbose: Boolean. If ``True`` the number of parsed files per second
+            is printed.
 
     # Return
         data: Dictionary which keys correspond to the image names
@@ -87,7 +128,9 @@ class VOCParser(object):
     def __init__(self, dataset_name='VOC2007', split='train',
                  class_names='all', with_difficult_samples=True,
                  dataset_path='../datasets/VOCdevkit/',
-                 evaluate=False):
+                 evaluate=False, cache=False, cache_directory=None,
+                 columnar=False, num_workers=0, use_processes=False,
+                 verbose=False):
 
         if dataset_name not in ['VOC2007', 'VOC2012']:
             raise Exception('Invalid dataset name.')
@@ -110,11 +153,41 @@ class VOCParser(object):
         self.arg_to_class = dict(zip(class_keys, self.class_names))
         self.class_to_arg = {value: key for key, value
                              in self.arg_to_class.items()}
+        self.cache_directory = cache_directory
+        self.columnar = columnar
+        self.num_workers = num_workers
+        self.use_processes = use_processes
+        self.verbose = verbose
         self.data = []
-        self._preprocess_XML()
+        if cache:
+            self.data = self._load_cached_XML()
+        else:
+            self._preprocess_XML()
+            if self.columnar:
+                self.data = ColumnarDataset.from_samples(self.data)
+
+    def _load_cached_XML(self):
+        filenames = self._load_filenames()
+        source_paths = [self._get_split_file()]
+        for filename in filenames:
+            source_paths.append(self.annotations_path + filename)
+        arguments = {'dataset_path': self.dataset_path, 'split': self.split,
+                     'class_names': self.class_names,
+                     'with_difficult_samples': self.with_difficult_samples,
+                     'evaluate': self.evaluate}
+
+        def parse_XML():
+            self._preprocess_XML()
+            return self.data
+        return load_cached_annotations(
+            parse_XML, self.dataset_name, source_paths, arguments,
+            self.cache_directory, columnar=self.columnar)
+
+    def _get_split_file(self):
+        return os.path.join(self.split_prefix, self.split) + '.txt'
 
     def _load_filenames(self):
-        split_file = os.path.join(self.split_prefix, self.split) + '.txt'
+        split_file = self._get_split_file()
         splitted_filenames = []
         for line in open(split_file):
             filename = line.strip() + '.xml'
@@ -123,49 +196,21 @@ class VOCParser(object):
 
     def _preprocess_XML(self):
         filenames = self._load_filenames()
-        for filename in filenames:
-            filename_path = self.annotations_path + filename
-            tree = ElementTree.parse(filename_path)
-            root = tree.getroot()
-            image_name = root.find('filename').text
-
-            box_data = []
-            difficulties = []
-
-            size_tree = root.find('size')
-            width = float(size_tree.find('width').text)
-            height = float(size_tree.find('height').text)
-            # check evaluate flag
-            if self.evaluate:
-                width = 1
-                height = 1
-            for object_tree in root.findall('object'):
-                difficulty = int(object_tree.find('difficult').text)
-
-                if difficulty == 1 and not (self.with_difficult_samples):
-                    continue
-
-                class_name = object_tree.find('name').text
-                if class_name in self.class_names:
-                    class_arg = self.class_to_arg[class_name]
-                    bounding_box = object_tree.find('bndbox')
-                    # VOC dataset format follows Matlab,
-                    # in which indexes start from 0
-                    xmin = (float(bounding_box.find('xmin').text) - 1.0) / width
-                    ymin = (float(bounding_box.find('ymin').text) - 1.0) / height
-                    xmax = (float(bounding_box.find('xmax').text) - 1.0) / width
-                    ymax = (float(bounding_box.find('ymax').text) - 1.0) / height
-
-                    box_data.append([xmin, ymin, xmax, ymax, class_arg])
-                    difficulties.append(difficulty)
-
+        filepaths = [self.annotations_path + name for name in filenames]
+        parse = partial(parse_XML, class_to_arg=self.class_to_arg,
+                        with_difficult_samples=self.with_difficult_samples,
+                        evaluate=self.evaluate)
+        name = None
+        if self.verbose:
+            name = '%s %s' % (self.dataset_name, self.split)
+        annotations = map_files(parse, filepaths, self.num_workers,
+                                self.use_processes, name=name)
+        for image_name, box_data, difficulties in annotations:
             if len(box_data) == 0:
                 continue
 
             # self.data[self.images_path + image_name] = label_data
             image_path = self.images_path + image_name
-            box_data = np.asarray(box_data)
-            difficulties = np.asarray(difficulties, dtype=bool)
             if self.evaluate:
                 self.data.append({'image': image_path,
                                   'boxes': box_data,
@@ -175,3 +220,55 @@ class VOCParser(object):
 
     def load_data(self):
         return self.data
+
+
+def parse_XML(filepath, class_to_arg, with_difficult_samples=True,
+              evaluate=False):
+    """Parses the boxes of a single VOC XML annotation file.
+
+    # Arguments
+        filepath: String. Path to XML annotation file.
+        class_to_arg: Dictionary mapping the class names to load to their
+            class arguments.
+        with_difficult_samples: Boolean. If ``True`` flagged difficult boxes
+            are also returned.
+        evaluate: Boolean. If ``True`` boxes are not normalized.
+
+    # Returns
+        image_name: String. Image file name.
+        box_data: Numpy array of shape ``[num_objects, 4 + 1]``.
+        difficulties: Boolean numpy array of shape ``[num_objects]``.
+    """
+    root = ElementTree.parse(filepath).getroot()
+    image_name = root.find('filename').text
+
+    box_data = []
+    difficulties = []
+
+    size_tree = root.find('size')
+    width = float(size_tree.find('width').text)
+    height = float(size_tree.find('height').text)
+    # check evaluate flag
+    if evaluate:
+        width = 1
+        height = 1
+    for object_tree in root.findall('object'):
+        difficulty = int(object_tree.find('difficult').text)
+
+        if difficulty == 1 and not (with_difficult_samples):
+            continue
+
+        class_name = object_tree.find('name').text
+        if class_name in class_to_arg:
+            class_arg = class_to_arg[class_name]
+            bounding_box = object_tree.find('bndbox')
+            # VOC dataset format follows Matlab,
+            # in which indexes start from 0
+            xmin = (float(bounding_box.find('xmin').text) - 1.0) / width
+            ymin = (float(bounding_box.find('ymin').text) - 1.0) / height
+            xmax = (float(bounding_box.find('xmax').text) - 1.0) / width
+            ymax = (float(bounding_box.find('ymax').text) - 1.0) / height
+
+            box_data.append([xmin, ymin, xmax, ymax, class_arg])
+            difficulties.append(difficulty)
+    return image_name, np.asarray(box_data), np.asarray(difficulties, bool)
@@ -9,8 +9,10 @@ import tensorflow.keras.backend as K
 
 from ..layers import Conv2DNormalization
 
+import os
+import json
+import hashlib
 import numpy as np
-from itertools import product
 
 
 def create_multibox_head(tensors, num_classes, num_priors, l2_loss=0.0005,
@@ -66,7 +68,76 @@ def create_multibox_head(tensors, num_classes, num_priors, l2_loss=0.0005,
     return outputs
 
 
-def create_prior_boxes(configuration_name='VOC'):
+PRIOR_BOXES = {}
+
+
+def create_prior_boxes(configuration_name='VOC', cache_to_disk=False):
+    """Creates the prior boxes of a single-shot detector configuration.
+    Prior boxes are computed once per configuration and reused in
+    subsequent calls.
+
+    # Arguments
+        configuration_name: String. Name of the prior box configuration
+            e.g. ``VOC``, ``FAT``, ``COCO`` or ``YCBVideo``.
+        cache_to_disk: Boolean. If ``True`` prior boxes are stored as a
+            ``.npy`` file inside the Keras cache directory and loaded
+            from it when available.
+
+    # Returns
+        Numpy array of shape ``(num_prior_boxes, 4)`` with prior boxes in
+            center form coordinates.
+    """
+    if configuration_name not in PRIOR_BOXES:
+        if cache_to_disk:
+            prior_boxes = load_prior_boxes(configuration_name)
+        else:
+            prior_boxes = compute_prior_boxes(configuration_name)
+        PRIOR_BOXES[configuration_name] = prior_boxes
+    return PRIOR_BOXES[configuration_name].copy()
+
+
+def load_prior_boxes(configuration_name='VOC'):
+    """Loads prior boxes from the Keras cache directory. If they are not
+    found they are computed and saved. Cache files are named after a hash
+    of the configuration, such that changed configurations are recomputed.
+
+    # Arguments
+        configuration_name: String. Name of the prior box configuration.
+
+    # Returns
+        Numpy array of shape ``(num_prior_boxes, 4)``.
+    """
+    cache_directory = os.environ.get(
+        'KERAS_HOME', os.path.join(os.path.expanduser('~'), '.keras'))
+    cache_directory = os.path.join(cache_directory, 'paz', 'prior_boxes')
+    configuration = get_prior_box_configuration(configuration_name)
+    configuration = json.dumps(configuration, sort_keys=True, default=str)
+    key = hashlib.sha1(configuration.encode('utf-8')).hexdigest()
+    filename = '%s-%s.npy' % (configuration_name, key[:16])
+    filepath = os.path.join(cache_directory, filename)
+    if os.path.exists(filepath):
+        return np.load(filepath)
+    prior_boxes = compute_prior_boxes(configuration_name)
+    os.makedirs(cache_directory, exist_ok=True)
+    # writing to a temporary file avoids partial reads from other workers
+    temporary_filepath = filepath + '.%s.tmp' % os.getpid()
+    with open(temporary_filepath, 'wb') as filedata:
+        np.save(filedata, prior_boxes)
+    os.replace(temporary_filepath, filepath)
+    return prior_boxes
+
+
+def compute_prior_boxes(configuration_name='VOC'):
+    """Computes the prior boxes of a single-shot detector configuration.
+    Boxes are ordered by feature map, then by cell row, cell column and
+    finally by box size within each cell.
+
+    # Arguments
+        configuration_name: String. Name of the prior box configuration.
+
+    # Returns
+        Numpy array of shape ``(num_prior_boxes, 4)``.
+    """
     configuration = get_prior_box_configuration(configuration_name)
     image_size = configuration['image_size']
     feature_map_sizes = configuration['feature_map_sizes']
@@ -74,27 +145,32 @@ def create_prior_boxes(configuration_name='VOC'):
     max_sizes = configuration['max_sizes']
     steps = configuration['steps']
     model_aspect_ratios = configuration['aspect_ratios']
-    mean = []
+    prior_boxes = []
     for feature_map_arg, feature_map_size in enumerate(feature_map_sizes):
         step = steps[feature_map_arg]
         min_size = min_sizes[feature_map_arg]
         max_size = max_sizes[feature_map_arg]
         aspect_ratios = model_aspect_ratios[feature_map_arg]
-        for y, x in product(range(feature_map_size), repeat=2):
-            f_k = image_size / step
-            center_x = (x + 0.5) / f_k
-            center_y = (y + 0.5) / f_k
-            s_k = min_size / image_size
-            mean = mean + [center_x, center_y, s_k, s_k]
-            s_k_prime = np.sqrt(s_k * (max_size / image_size))
-            mean = mean + [center_x, center_y, s_k_prime, s_k_prime]
-            for aspect_ratio in aspect_ratios:
-                mean = mean + [center_x, center_y, s_k * np.sqrt(aspect_ratio),
-                               s_k / np.sqrt(aspect_ratio)]
-                mean = mean + [center_x, center_y, s_k / np.sqrt(aspect_ratio),
-                               s_k * np.sqrt(aspect_ratio)]
-
-    output = np.asarray(mean).reshape((-1, 4))
+        f_k = image_size / step
+        centers = (np.arange(feature_map_size) + 0.5) / f_k
+        center_y, center_x = np.meshgrid(centers, centers, indexing='ij')
+        centers = np.stack([center_x.ravel(), center_y.ravel()], axis=1)
+
+        s_k = min_size / image_size
+        s_k_prime = np.sqrt(s_k * (max_size / image_size))
+        sizes = [[s_k, s_k], [s_k_prime, s_k_prime]]
+        for aspect_ratio in aspect_ratios:
+            sizes.append([s_k * np.sqrt(aspect_ratio),
+                          s_k / np.sqrt(aspect_ratio)])
+            sizes.append([s_k / np.sqrt(aspect_ratio),
+                          s_k * np.sqrt(aspect_ratio)])
+        sizes = np.asarray(sizes)
+
+        num_cells, num_sizes = len(centers), len(sizes)
+        centers = np.repeat(centers, num_sizes, axis=0)
+        sizes = np.tile(sizes, (num_cells, 1))
+        prior_boxes.append(np.concatenate([centers, sizes], axis=1))
+    output = np.concatenate(prior_boxes, axis=0)
     # output = np.clip(output, 0, 1)
     return output
 
@@ -1,4 +1,5 @@
 from .losses import MultiBoxLoss
+from .losses import CompactMultiBoxLoss
 from .losses import KeypointNetLoss
 from .losses import DiceLoss
 from .losses import FocalLoss
@@ -1,4 +1,5 @@
 from .multi_box_loss import MultiBoxLoss
+from .multi_box_loss import CompactMultiBoxLoss
 from .keypointnet_loss import KeypointNetLoss
 from .segmentation import DiceLoss
 from .segmentation import FocalLoss
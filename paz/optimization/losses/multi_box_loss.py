@@ -32,6 +32,9 @@ class MultiBoxLoss(object):
         cross_entropy_loss = - K.sum(y_true * K.log(y_pred), axis=-1)
         return cross_entropy_loss
 
+    def _compute_class_loss(self, y_true, y_pred):
+        return self._cross_entropy(y_true[:, :, 4:], y_pred[:, :, 4:])
+
     def _calculate_masks(self, y_true):
         negative_mask = y_true[:, :, 4]
         positive_mask = 1.0 - negative_mask
@@ -89,7 +92,7 @@ class MultiBoxLoss(object):
             Tensor with positive classification loss per sample in batch.
         """
         batch_size = tf.cast(tf.shape(y_pred)[0], tf.float32)
-        class_loss = self._cross_entropy(y_true[:, :, 4:], y_pred[:, :, 4:])
+        class_loss = self._compute_class_loss(y_true, y_pred)
         positive_mask, negative_mask = self._calculate_masks(y_true)
         positive_class_losses = class_loss * positive_mask
         positive_class_loss = K.sum(positive_class_losses, axis=-1)
@@ -111,7 +114,7 @@ class MultiBoxLoss(object):
             Tensor with negative classification loss per sample in batch.
         """
         batch_size = tf.cast(tf.shape(y_pred)[0], tf.float32)
-        class_loss = self._cross_entropy(y_true[:, :, 4:], y_pred[:, :, 4:])
+        class_loss = self._compute_class_loss(y_true, y_pred)
         positive_mask, negative_mask = self._calculate_masks(y_true)
         num_positives_per_sample = K.cast(K.sum(positive_mask, -1), 'int32')
         num_hard_negatives = self.neg_pos_ratio * num_positives_per_sample
@@ -125,3 +128,73 @@ class MultiBoxLoss(object):
         num_positives = K.sum(K.cast(positive_mask, 'float32'))
         num_positives = tf.maximum(1.0, num_positives)
         return (negative_class_loss * batch_size) / num_positives
+
+
+class CompactMultiBoxLoss(MultiBoxLoss):
+    """Multi-box loss for box targets given with class arguments instead of
+    one-hot vectors. Targets are built with ``PreprocessBoxes`` using the
+    encodings ``'class_index'`` i.e. a tensor of shape
+    ``[batch_size, num_boxes, 4 + 1]``, or ``'sparse'`` i.e. a tensor of
+    shape ``[batch_size, max_num_positives, 1 + 4 + 1]`` containing the
+    prior box argument, encoded coordinates and class argument of positive
+    boxes only. Losses are equal to the ones of ``MultiBoxLoss`` with one-hot
+    targets as long as no positive box is discarded, therefore
+    ``ToSparseBoxes`` raises an error instead of discarding positives.
+
+    # Arguments
+        neg_pos_ratio: Int. Number of negatives used per positive box.
+        alpha: Float. Weight parameter for localization loss.
+        max_num_negatives: Int. Maximum number of negatives per batch.
+        sparse: Boolean. If ``True`` targets are given in the sparse format.
+
+    # References
+        - [SSD: Single Shot MultiBox
+            Detector](https://arxiv.org/abs/1512.02325)
+    """
+    def __init__(self, neg_pos_ratio=3, alpha=1.0, max_num_negatives=300,
+                 sparse=False):
+        super(CompactMultiBoxLoss, self).__init__(
+            neg_pos_ratio, alpha, max_num_negatives)
+        self.sparse = sparse
+
+    def _to_dense(self, y_true, y_pred):
+        """Scatters sparse targets into a tensor of shape
+        ``[batch_size, num_boxes, 4 + 1]``.
+        """
+        y_true = tf.cast(y_true, tf.float32)
+        if not self.sparse:
+            return y_true
+        prior_args = tf.cast(y_true[:, :, 0], tf.int32)
+        batch_args = tf.broadcast_to(
+            tf.range(tf.shape(prior_args)[0])[:, None], tf.shape(prior_args))
+        indices = tf.stack([batch_args, prior_args], axis=-1)
+        is_valid = prior_args >= 0
+        indices = tf.boolean_mask(indices, is_valid)
+        updates = tf.boolean_mask(y_true[:, :, 1:], is_valid)
+        shape = tf.stack([tf.shape(y_pred)[0], tf.shape(y_pred)[1], 5])
+        return tf.scatter_nd(indices, updates, shape)
+
+    def _compute_class_loss(self, y_true, y_pred):
+        class_args = tf.cast(y_true[:, :, 4:5], tf.int32)
+        y_pred = tf.gather(y_pred[:, :, 4:], class_args, batch_dims=2)
+        y_pred = K.maximum(K.minimum(y_pred[:, :, 0], 1 - 1e-15), 1e-15)
+        return - K.log(y_pred)
+
+    def _calculate_masks(self, y_true):
+        positive_mask = tf.cast(y_true[:, :, 4] > 0, tf.float32)
+        negative_mask = 1.0 - positive_mask
+        return positive_mask, negative_mask
+
+    def localization(self, y_true, y_pred):
+        y_true = self._to_dense(y_true, y_pred)
+        return super(CompactMultiBoxLoss, self).localization(y_true, y_pred)
+
+    def positive_classification(self, y_true, y_pred):
+        y_true = self._to_dense(y_true, y_pred)
+        return super(CompactMultiBoxLoss, self).positive_classification(
+            y_true, y_pred)
+
+    def negative_classification(self, y_true, y_pred):
+        y_true = self._to_dense(y_true, y_pred)
+        return super(CompactMultiBoxLoss, self).negative_classification(
+            y_true, y_pred)
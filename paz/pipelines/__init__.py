@@ -16,6 +16,7 @@ from .detection import SSD300VOC
 from .detection import SSD300FAT
 from .detection import DetectHaarCascade
 from .detection import HaarCascadeFrontalFace
+from .detection import PredictCroppedBoxes2D
 from .detection import DetectMiniXceptionFER
 from .detection import DetectKeypoints2D
 from .detection import DetectFaceKeypointNet2D32
@@ -78,5 +79,6 @@ from .masks import PredictRGBMask
 from .masks import Pix2Points
 
 from .heatmaps import GetHeatmapsAndTags
+from .heatmaps import GetMultiScaleHeatmapsAndTags
 
 from .angles import IKNetHandJointAngles
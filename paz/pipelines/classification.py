@@ -3,6 +3,7 @@ from .. import processors as pr
 from . import PreprocessImage
 from ..models.classification import MiniXception, VVAD_LRS3_LSTM, CNN2Plus1D
 from ..datasets import get_class_names
+from ..backend.standard import predict_batch
 from .keypoints import MinimalHandPoseEstimation
 
 
@@ -45,10 +46,34 @@ class MiniXceptionFER(SequentialProcessor):
         preprocess.insert(0, pr.ConvertColorSpace(pr.RGB2GRAY))
         preprocess.add(pr.ExpandDims(0))
         preprocess.add(pr.ExpandDims(-1))
+        self.preprocess = preprocess
+        self.postprocess = SequentialProcessor()
+        self.postprocess.add(pr.CopyDomain([0], [1]))
+        self.postprocess.add(
+            pr.ControlMap(pr.ToClassName(self.class_names), [0], [0]))
+        self.postprocess.add(pr.WrapOutput(['class_name', 'scores']))
         self.add(pr.Predict(self.classifier, preprocess))
-        self.add(pr.CopyDomain([0], [1]))
-        self.add(pr.ControlMap(pr.ToClassName(self.class_names), [0], [0]))
-        self.add(pr.WrapOutput(['class_name', 'scores']))
+        for processor in self.postprocess.processors:
+            self.add(processor)
+
+    def predict_batch(self, images, batch_size=None, pad_batch=False):
+        """Classifies a list of RGB faces using a single model call per
+        batch of faces.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+            pad_batch: Boolean. If ``True`` batches are padded to
+                ``batch_size`` images.
+
+        # Returns
+            List of dictionaries with ``keys``: ``class_name`` and
+            ``scores``.
+        """
+        outputs = predict_batch(images, self.classifier, self.preprocess,
+                                batch_size=batch_size, pad_batch=pad_batch)
+        return [self.postprocess(output) for output in outputs]
 
 
 class ClassifyHandClosure(SequentialProcessor):
@@ -111,13 +136,42 @@ class ClassifyVVAD(SequentialProcessor):
 
         preprocess = PreprocessImage(input_size[1:3], (0.0, 0.0, 0.0))
         preprocess.add(pr.BufferImages(input_size, stride=stride))
+        self.preprocess = preprocess
         self.add(pr.PredictWithNones(self.classifier, preprocess))
 
+        self.postprocess = SequentialProcessor()
         weighted_mean = average_type == 'weighted'
-        self.add(pr.ControlMap(pr.AveragePredictions(averaging_window_size, weighted_mean), [0], [0]))
-
-        self.add(pr.ControlMap(pr.NoneConverter(), [0], [0]))
-        self.add(pr.CopyDomain([0], [1]))
-        self.add(pr.ControlMap(pr.FloatToBoolean(), [0], [0]))
-        self.add(pr.ControlMap(pr.BooleanToTextMessage(true_message=self.class_names[0], false_message=self.class_names[1]), [0], [0]))
-        self.add(pr.WrapOutput(['class_name', 'scores']))
+        self.postprocess.add(pr.ControlMap(pr.AveragePredictions(averaging_window_size, weighted_mean), [0], [0]))
+
+        self.postprocess.add(pr.ControlMap(pr.NoneConverter(), [0], [0]))
+        self.postprocess.add(pr.CopyDomain([0], [1]))
+        self.postprocess.add(pr.ControlMap(pr.FloatToBoolean(), [0], [0]))
+        self.postprocess.add(pr.ControlMap(pr.BooleanToTextMessage(true_message=self.class_names[0], false_message=self.class_names[1]), [0], [0]))
+        self.postprocess.add(pr.WrapOutput(['class_name', 'scores']))
+        for processor in self.postprocess.processors:
+            self.add(processor)
+
+    def predict_batch(self, images, batch_size=None, pad_batch=False):
+        """Buffers each image in order and classifies all full buffers
+        using a single model call per batch of video clips.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of clips given to
+                the model at once. If ``None`` all clips are given at once.
+            pad_batch: Boolean. If ``True`` batches are padded to
+                ``batch_size`` clips.
+
+        # Returns
+            List of dictionaries with ``keys``: ``class_name`` and
+            ``scores``.
+        """
+        clips = [self.preprocess(image) for image in images]
+        clip_args = [arg for arg, clip in enumerate(clips) if clip is not None]
+        clip_outputs = predict_batch([clips[arg] for arg in clip_args],
+                                     self.classifier, batch_size=batch_size,
+                                     pad_batch=pad_batch)
+        outputs = [None] * len(images)
+        for clip_arg, clip_output in zip(clip_args, clip_outputs):
+            outputs[clip_arg] = clip_output
+        return [self.postprocess(output) for output in outputs]
@@ -12,7 +12,8 @@ from .image import AugmentImage, PreprocessImage
 from .classification import MiniXceptionFER, ClassifyVVAD, Architecture_Options, Average_Options
 from .keypoints import FaceKeypointNet2D32, DetectMinimalHand
 from .keypoints import MinimalHandPoseEstimation
-from ..backend.boxes import change_box_coordinates
+from ..backend.boxes import change_box_coordinates, add_class_and_score
+from ..backend.standard import predict_batch
 
 
 class AugmentBoxes(SequentialProcessor):
@@ -40,12 +41,28 @@ class PreprocessBoxes(SequentialProcessor):
         IOU: Float. Intersection over union used to match boxes.
         variances: List of two floats indicating variances to be encoded
             for encoding bounding boxes.
+        encoding: String. Format of the box targets. ``'one_hot'`` gives
+            ``[num_boxes, 4 + num_classes]`` targets with one-hot vectors,
+            ``'class_index'`` gives ``[num_boxes, 4 + 1]`` targets with the
+            class argument and ``'sparse'`` gives ``[max_num_positives, 6]``
+            targets with only the positive boxes (see
+            ``paz.processors.ToSparseBoxes``). The last two formats are
+            used with ``paz.optimization.losses.CompactMultiBoxLoss``.
+        max_num_positives: Int. Maximum number of prior boxes matched to a
+            ground truth box per sample when using the ``'sparse'``
+            encoding. Samples with more positives raise a ``ValueError``.
     """
-    def __init__(self, num_classes, prior_boxes, IOU, variances):
+    def __init__(self, num_classes, prior_boxes, IOU, variances,
+                 encoding='one_hot', max_num_positives=1000):
         super(PreprocessBoxes, self).__init__()
+        if encoding not in ['one_hot', 'class_index', 'sparse']:
+            raise ValueError('Invalid box encoding: %s' % encoding)
         self.add(pr.MatchBoxes(prior_boxes, IOU),)
         self.add(pr.EncodeBoxes(prior_boxes, variances))
-        self.add(pr.BoxClassToOneHotVector(num_classes))
+        if encoding == 'one_hot':
+            self.add(pr.BoxClassToOneHotVector(num_classes))
+        if encoding == 'sparse':
+            self.add(pr.ToSparseBoxes(max_num_positives))
 
 
 class AugmentDetection(SequentialProcessor):
@@ -63,10 +80,18 @@ class AugmentDetection(SequentialProcessor):
         IOU: Float. Intersection over union used to match boxes.
         variances: List of two floats indicating variances to be encoded
             for encoding bounding boxes.
+        encoding: String. Format of the box targets, one of ``'one_hot'``,
+            ``'class_index'`` or ``'sparse'``. See ``PreprocessBoxes``.
+        max_num_positives: Int. Maximum number of prior boxes matched to a
+            ground truth box per sample when using the ``'sparse'``
+            encoding. Samples with more positives raise a ``ValueError``.
+        image_store: ``ImageStore``, string or ``None``. Store of decoded
+            images read by ``LoadImage`` instead of decoding image files.
     """
     def __init__(self, prior_boxes, split=pr.TRAIN, num_classes=21, size=300,
                  mean=pr.BGR_IMAGENET_MEAN, IOU=.5,
-                 variances=[0.1, 0.1, 0.2, 0.2]):
+                 variances=[0.1, 0.1, 0.2, 0.2], encoding='one_hot',
+                 max_num_positives=1000, image_store=None):
         super(AugmentDetection, self).__init__()
         # image processors
         self.augment_image = AugmentImage()
@@ -76,12 +101,17 @@ class AugmentDetection(SequentialProcessor):
 
         # box processors
         self.augment_boxes = AugmentBoxes()
-        args = (num_classes, prior_boxes, IOU, variances)
+        args = (num_classes, prior_boxes, IOU, variances,
+                encoding, max_num_positives)
         self.preprocess_boxes = PreprocessBoxes(*args)
+        boxes_shape = {'one_hot': [len(prior_boxes), 4 + num_classes],
+                       'class_index': [len(prior_boxes), 4 + 1],
+                       'sparse': [max_num_positives, 1 + 4 + 1]}[encoding]
 
         # pipeline
         self.add(pr.UnpackDictionary(['image', 'boxes']))
-        self.add(pr.ControlMap(pr.LoadImage(), [0], [0]))
+        load_image = pr.LoadImage(image_store=image_store)
+        self.add(pr.ControlMap(load_image, [0], [0]))
         if split == pr.TRAIN:
             self.add(pr.ControlMap(self.augment_image, [0], [0]))
             self.add(pr.ControlMap(self.augment_boxes, [0, 1], [0, 1]))
@@ -89,7 +119,7 @@ class AugmentDetection(SequentialProcessor):
         self.add(pr.ControlMap(self.preprocess_boxes, [1], [1]))
         self.add(pr.SequenceWrapper(
             {0: {'image': [size, size, 3]}},
-            {1: {'boxes': [len(prior_boxes), 4 + num_classes]}}))
+            {1: {'boxes': boxes_shape}}))
 
 
 class PostprocessBoxes2D(SequentialProcessor):
@@ -149,6 +179,31 @@ class DetectSingleShot(Processor):
             image = self.draw_boxes2D(image, boxes2D)
         return self.wrap(image, boxes2D)
 
+    def predict_batch(self, images, batch_size=None, pad_batch=False):
+        """Detects objects in a list of images using a single model call
+        per batch of images.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+            pad_batch: Boolean. If ``True`` batches are padded to
+                ``batch_size`` images.
+
+        # Returns
+            List of dictionaries with ``keys``: ``image`` and ``boxes2D``.
+        """
+        batch_boxes2D = predict_batch(
+            images, self.model, self.predict.preprocess,
+            self.predict.postprocess, batch_size, pad_batch)
+        outputs = []
+        for image, boxes2D in zip(images, batch_boxes2D):
+            boxes2D = self.denormalize(image, boxes2D)
+            if self.draw:
+                image = self.draw_boxes2D(image, boxes2D)
+            outputs.append(self.wrap(image, boxes2D))
+        return outputs
+
 
 class SSDPreprocess(SequentialProcessor):
     """Preprocessing pipeline for SSD.
@@ -183,13 +238,19 @@ class SSDPostprocess(SequentialProcessor):
     def __init__(self, model, class_names, score_thresh, nms_thresh,
                  variances=[0.1, 0.1, 0.2, 0.2], class_arg=0, box_method=0):
         super(SSDPostprocess, self).__init__()
-        self.add(pr.Squeeze(axis=None))
-        self.add(pr.DecodeBoxes(model.prior_boxes, variances))
-        self.add(pr.RemoveClass(class_names, class_arg, renormalize=False))
-        self.add(pr.NonMaximumSuppressionPerClass(nms_thresh))
-        self.add(pr.MergeNMSBoxWithClass())
-        self.add(pr.FilterBoxes(class_names, score_thresh))
-        self.add(pr.ToBoxes2D(class_names, box_method))
+        if box_method == 0:
+            # decodes only boxes above ``score_thresh`` in a single step
+            self.add(pr.DecodeAndSuppressBoxes2D(
+                model.prior_boxes, class_names, score_thresh,
+                nms_thresh, variances, class_arg))
+        else:
+            self.add(pr.Squeeze(axis=None))
+            self.add(pr.DecodeBoxes(model.prior_boxes, variances))
+            self.add(pr.RemoveClass(class_names, class_arg, renormalize=False))
+            self.add(pr.NonMaximumSuppressionPerClass(nms_thresh))
+            self.add(pr.MergeNMSBoxWithClass())
+            self.add(pr.FilterBoxes(class_names, score_thresh))
+            self.add(pr.ToBoxes2D(class_names, box_method))
 
 
 class DetectSingleShotEfficientDet(Processor):
@@ -236,6 +297,38 @@ class DetectSingleShotEfficientDet(Processor):
             image = self.draw_boxes2D(image, boxes2D)
         return self.wrap(image, boxes2D)
 
+    def predict_batch(self, images, batch_size=None, pad_batch=False):
+        """Detects objects in a list of images using a single model call
+        per batch of images.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+            pad_batch: Boolean. If ``True`` batches are padded to
+                ``batch_size`` images.
+
+        # Returns
+            List of dictionaries with ``keys``: ``image`` and ``boxes2D``.
+        """
+        preprocessed_images, batch_image_scales = [], []
+        for image in images:
+            preprocessed_image, image_scales = self.preprocess(image)
+            preprocessed_images.append(preprocessed_image)
+            batch_image_scales.append(image_scales)
+        batch_outputs = predict_batch(
+            preprocessed_images, self.model, batch_size=batch_size,
+            pad_batch=pad_batch)
+        outputs = []
+        for image, output, image_scales in zip(
+                images, batch_outputs, batch_image_scales):
+            output = change_box_coordinates(output)
+            boxes2D = self.postprocess(output, image_scales)
+            if self.draw:
+                image = self.draw_boxes2D(image, boxes2D)
+            outputs.append(self.wrap(image, boxes2D))
+        return outputs
+
 
 class EfficientDetPreprocess(SequentialProcessor):
     """Preprocessing pipeline for EfficientDet.
@@ -272,24 +365,13 @@ class EfficientDetPostprocess(Processor):
                  variances=[1.0, 1.0, 1.0, 1.0], class_arg=None):
         super(EfficientDetPostprocess, self).__init__()
         model.prior_boxes = model.prior_boxes * model.input_shape[1]
-        self.postprocess = pr.SequentialProcessor([
-            pr.Squeeze(axis=None),
-            pr.DecodeBoxes(model.prior_boxes, variances),
-            pr.RemoveClass(class_names, class_arg)])
-        self.scale = pr.ScaleBox()
-        self.nms_per_class = pr.NonMaximumSuppressionPerClass(nms_thresh)
-        self.merge_box_and_class = pr.MergeNMSBoxWithClass()
-        self.filter_boxes = pr.FilterBoxes(class_names, score_thresh)
-        self.to_boxes2D = pr.ToBoxes2D(class_names)
+        self.decode_and_suppress = pr.DecodeAndSuppressBoxes2D(
+            model.prior_boxes, class_names, score_thresh,
+            nms_thresh, variances, class_arg)
         self.round_boxes = pr.RoundBoxes2D()
 
     def call(self, output, image_scale):
-        box_data = self.postprocess(output)
-        box_data = self.scale(box_data, image_scale)
-        box_data, class_labels = self.nms_per_class(box_data)
-        box_data = self.merge_box_and_class(box_data, class_labels)
-        box_data = self.filter_boxes(box_data)
-        boxes2D = self.to_boxes2D(box_data)
+        boxes2D = self.decode_and_suppress(output, image_scale)
         boxes2D = self.round_boxes(boxes2D)
         return boxes2D
 
@@ -491,6 +573,51 @@ EMOTION_COLORS = [[255, 0, 0], [45, 90, 45], [255, 0, 255], [255, 255, 0],
                   [0, 0, 255], [0, 255, 255], [0, 255, 0]]
 
 
+class PredictCroppedBoxes2D(Processor):
+    """Squares, clips and crops boxes from an image and predicts all crops
+    together. If ``estimate`` has a ``predict_batch`` method the crops are
+    resized, stacked and given to the model in a single call per batch,
+    otherwise ``estimate`` is called for every crop.
+
+    # Arguments
+        estimate: Pipeline called on every cropped image.
+        offsets: List of two elements. Each element must be between [0, 1].
+        batch_size: Int or ``None``. Maximum number of crops given to the
+            model at once. If ``None`` all crops are given at once.
+        pad_batch: Boolean. If ``True`` batches are padded to ``batch_size``
+            crops such that the model always receives the same input shape.
+
+    # Returns
+        List of ``Boxes2D`` and list with the output of ``estimate`` for
+        each box.
+    """
+    def __init__(self, estimate, offsets=[0, 0], batch_size=None,
+                 pad_batch=False):
+        super(PredictCroppedBoxes2D, self).__init__()
+        if pad_batch and batch_size is None:
+            raise ValueError('``batch_size`` is required to pad batches')
+        self.estimate = estimate
+        self.batch_size = batch_size
+        self.pad_batch = pad_batch
+        self.square = SequentialProcessor()
+        self.square.add(pr.SquareBoxes2D())
+        self.square.add(pr.OffsetBoxes2D(offsets))
+        self.clip = pr.ClipBoxes2D()
+        self.crop = pr.CropBoxes2D()
+
+    def call(self, image, boxes2D):
+        boxes2D = self.square(boxes2D)
+        boxes2D = self.clip(image, boxes2D)
+        cropped_images = self.crop(image, boxes2D)
+        if hasattr(self.estimate, 'predict_batch'):
+            predictions = self.estimate.predict_batch(
+                cropped_images, self.batch_size, self.pad_batch)
+        else:
+            predictions = [self.estimate(cropped_image)
+                           for cropped_image in cropped_images]
+        return boxes2D, predictions
+
+
 class DetectMiniXceptionFER(Processor):
     """Emotion classification and detection pipeline.
 
@@ -516,21 +643,19 @@ class DetectMiniXceptionFER(Processor):
        - [Real-time Convolutional Neural Networks for Emotion and
             Gender Classification](https://arxiv.org/abs/1710.07557)
     """
-    def __init__(self, offsets=[0, 0], colors=EMOTION_COLORS):
+    def __init__(self, offsets=[0, 0], colors=EMOTION_COLORS,
+                 batch_size=None, pad_batch=False):
         super(DetectMiniXceptionFER, self).__init__()
         self.offsets = offsets
         self.colors = colors
 
         # detection
         self.detect = HaarCascadeFrontalFace()
-        self.square = SequentialProcessor()
-        self.square.add(pr.SquareBoxes2D())
-        self.square.add(pr.OffsetBoxes2D(offsets))
-        self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
 
         # classification
         self.classify = MiniXceptionFER()
+        self.predict_crops = PredictCroppedBoxes2D(
+            self.classify, offsets, batch_size, pad_batch)
 
         # drawing and wrapping
         self.class_names = self.classify.class_names
@@ -539,11 +664,8 @@ class DetectMiniXceptionFER(Processor):
 
     def call(self, image):
         boxes2D = self.detect(image.copy())['boxes2D']
-        boxes2D = self.square(boxes2D)
-        boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
-        for cropped_image, box2D in zip(cropped_images, boxes2D):
-            predictions = self.classify(cropped_image)
+        boxes2D, batch_predictions = self.predict_crops(image, boxes2D)
+        for predictions, box2D in zip(batch_predictions, boxes2D):
             box2D.class_name = predictions['class_name']
             box2D.score = np.amax(predictions['scores'])
         image = self.draw(image, boxes2D)
@@ -551,7 +673,8 @@ class DetectMiniXceptionFER(Processor):
 
 
 class DetectKeypoints2D(Processor):
-    def __init__(self, detect, estimate_keypoints, offsets=[0, 0], radius=3):
+    def __init__(self, detect, estimate_keypoints, offsets=[0, 0], radius=3,
+                 batch_size=None, pad_batch=False):
         """General detection and keypoint estimator pipeline.
 
         # Arguments
@@ -563,16 +686,17 @@ class DetectKeypoints2D(Processor):
                 a numpy array of keypoints.
             offsets: List of two elements. Each element must be between [0, 1].
             radius: Int indicating the radius of the keypoints to be drawn.
+            batch_size: Int or ``None``. Maximum number of crops given to
+                the keypoint estimator at once.
+            pad_batch: Boolean. If ``True`` batches are padded to
+                ``batch_size`` crops.
         """
         super(DetectKeypoints2D, self).__init__()
         self.detect = detect
         self.estimate_keypoints = estimate_keypoints
         self.num_keypoints = estimate_keypoints.num_keypoints
-        self.square = SequentialProcessor()
-        self.square.add(pr.SquareBoxes2D())
-        self.square.add(pr.OffsetBoxes2D(offsets))
-        self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
+        self.predict_crops = PredictCroppedBoxes2D(
+            estimate_keypoints, offsets, batch_size, pad_batch)
         self.change_coordinates = pr.ChangeKeypointsCoordinateSystem()
         self.draw = pr.DrawKeypoints2D(self.num_keypoints, radius, False)
         self.draw_boxes = pr.DrawBoxes2D(detect.class_names, detect.colors)
@@ -580,12 +704,10 @@ class DetectKeypoints2D(Processor):
 
     def call(self, image):
         boxes2D = self.detect(image)['boxes2D']
-        boxes2D = self.square(boxes2D)
-        boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
+        boxes2D, predictions = self.predict_crops(image, boxes2D)
         keypoints2D = []
-        for cropped_image, box2D in zip(cropped_images, boxes2D):
-            keypoints = self.estimate_keypoints(cropped_image)['keypoints']
+        for prediction, box2D in zip(predictions, boxes2D):
+            keypoints = prediction['keypoints']
             keypoints = self.change_coordinates(keypoints, box2D)
             keypoints2D.append(keypoints)
             image = self.draw(image, keypoints)
@@ -616,11 +738,13 @@ class DetectFaceKeypointNet2D32(DetectKeypoints2D):
         inferences and a list of ``paz.abstract.messages.Boxes2D``.
 
     """
-    def __init__(self, offsets=[0, 0], radius=3):
+    def __init__(self, offsets=[0, 0], radius=3, batch_size=None,
+                 pad_batch=False):
         detect = HaarCascadeFrontalFace(draw=False)
         estimate_keypoints = FaceKeypointNet2D32(draw=False)
         super(DetectFaceKeypointNet2D32, self).__init__(
-            detect, estimate_keypoints, offsets, radius)
+            detect, estimate_keypoints, offsets, radius, batch_size,
+            pad_batch)
 
 
 class SSD512HandDetection(DetectSingleShot):
@@ -925,7 +1049,8 @@ class DetectVVAD(Processor):
             disable averaging
     """
     def __init__(self, architecture='CNN2Plus1D_Light', stride=10, averaging_window_size=6,
-                 average_type='weighted', offsets=[0, 0], colors=[[0, 255, 0], [255, 0, 0]]):
+                 average_type='weighted', offsets=[0, 0], colors=[[0, 255, 0], [255, 0, 0]],
+                 batch_size=None, pad_batch=False):
         super(DetectVVAD, self).__init__()
         self.offsets = offsets
         self.colors = colors
@@ -933,28 +1058,23 @@ class DetectVVAD(Processor):
         # detection
         self.copy = pr.Copy()
         self.detect = HaarCascadeFrontalFace()
-        self.square = SequentialProcessor()
-        self.square.add(pr.SquareBoxes2D())
-        self.square.add(pr.OffsetBoxes2D(offsets))
-        self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
 
         # classification
         self.classify = ClassifyVVAD(stride=stride, averaging_window_size=averaging_window_size, average_type=str(average_type),
                                      architecture=architecture)
+        self.predict_crops = PredictCroppedBoxes2D(
+            self.classify, offsets, batch_size, pad_batch)
 
         # drawing and wrapping
         self.class_names = self.classify.class_names
-        self.add_class_and_score = pr.AddClassAndScoreToBoxes(self.classify)
         self.draw = pr.DrawBoxes2D(self.class_names, self.colors, True)
         self.wrap = pr.WrapOutput(['image', 'boxes2D'])
 
     def call(self, image):
         image_copy = self.copy(image)
         boxes2D = self.detect(image_copy)['boxes2D']
-        boxes2D = self.square(boxes2D)
-        boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
-        boxes2D = self.add_class_and_score(cropped_images, boxes2D)
+        boxes2D, batch_predictions = self.predict_crops(image, boxes2D)
+        for predictions, box2D in zip(batch_predictions, boxes2D):
+            add_class_and_score(predictions, box2D)
         image = self.draw(image, boxes2D)
         return self.wrap(image, boxes2D)
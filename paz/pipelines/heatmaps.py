@@ -1,5 +1,6 @@
 import numpy as np
 from paz import processors as pr
+from ..backend.heatmaps import resize_heatmaps
 
 
 class GetHeatmapsAndTags(pr.Processor):
@@ -10,6 +11,8 @@ class GetHeatmapsAndTags(pr.Processor):
             Flipped list of keypoint order.
         data_with_center: Boolean. True is the model is trained using the
             center.
+        batch_flip: Boolean. If ``True`` the image and its flipped version
+            are predicted together in a single forward pass.
         image: Numpy array. Input image of shape (H, W)
 
     # Returns
@@ -17,9 +20,11 @@ class GetHeatmapsAndTags(pr.Processor):
         Tags: Numpy array of shape (1, num_keypoints, H, W)
     """
     def __init__(self, model, flipped_keypoint_order, with_flip,
-                 data_with_center, scale_output=True, axes=[0, 3, 1, 2]):
+                 data_with_center, scale_output=True, axes=[0, 3, 1, 2],
+                 batch_flip=True):
         super(GetHeatmapsAndTags, self).__init__()
         self.with_flip = with_flip
+        self.batch_flip = batch_flip
         self.predict = pr.SequentialProcessor(
             [pr.Predict(model), pr.TransposeOutput(axes), pr.ScaleOutput(2)])
         self.get_heatmaps = pr.GetHeatmaps(flipped_keypoint_order)
@@ -30,16 +35,106 @@ class GetHeatmapsAndTags(pr.Processor):
         if scale_output:
             self.postprocess.add(pr.ScaleOutput(2, full_scaling=True))
 
+    def _predict_with_flip(self, image):
+        flipped_image = np.flip(image, [2])
+        if not self.batch_flip:
+            return self.predict(image), self.predict(flipped_image)
+        outputs = self.predict(np.concatenate([image, flipped_image], 0))
+        flipped_outputs = [output[1:] for output in outputs]
+        outputs = [output[:1] for output in outputs]
+        return outputs, flipped_outputs
+
     def call(self, image):
-        outputs = self.predict(image)
+        if self.with_flip:
+            outputs, flipped_outputs = self._predict_with_flip(image)
+        else:
+            outputs = self.predict(image)
         heatmaps = self.get_heatmaps(outputs, with_flip=False)
         tags = self.get_tags(outputs, with_flip=False)
         if self.with_flip:
-            outputs = self.predict(np.flip(image, [2]))
-            heatmaps_flip = self.get_heatmaps(outputs, self.with_flip)
-            tags_flip = self.get_tags(outputs, self.with_flip)
+            heatmaps_flip = self.get_heatmaps(flipped_outputs, self.with_flip)
+            tags_flip = self.get_tags(flipped_outputs, self.with_flip)
             heatmaps = [heatmaps, heatmaps_flip]
             tags = [tags, tags_flip]
         heatmaps = self.postprocess(heatmaps)
         tags = self.postprocess(tags)
         return heatmaps, tags
+
+
+class GetMultiScaleHeatmapsAndTags(pr.Processor):
+    """Get Heatmaps and Tags of the same image given at several scales.
+    All images of the same shape, together with their flipped versions,
+    are predicted in a single forward pass. Heatmaps and tags of all
+    scales are resized to the output size of the first image.
+
+    # Arguments
+        model: Model weights trained on HigherHRNet model.
+        flipped_keypoint_order: List of length 17 (number of keypoints).
+            Flipped list of keypoint order.
+        with_flip: Boolean. If ``True`` flipped images are also predicted.
+        data_with_center: Boolean. True is the model is trained using the
+            center.
+        axes: List of ints. Transpose axes of the model outputs.
+        images: List of numpy arrays of shape (1, H, W, 3). Outputs of
+            ``PreprocessImageHigherHRNet`` for each scale, the first one
+            being the base scale.
+
+    # Returns
+        heatmaps: List of numpy arrays of shape (1, num_keypoints, H, W).
+            One per scale, followed by its flipped version if
+            ``with_flip`` is ``True``.
+        Tags: List of numpy arrays of shape (1, num_keypoints, H, W).
+    """
+    def __init__(self, model, flipped_keypoint_order, with_flip,
+                 data_with_center, axes=[0, 3, 1, 2]):
+        super(GetMultiScaleHeatmapsAndTags, self).__init__()
+        self.with_flip = with_flip
+        self.predict = pr.SequentialProcessor(
+            [pr.Predict(model), pr.TransposeOutput(axes), pr.ScaleOutput(2)])
+        self.get_heatmaps = pr.GetHeatmaps(flipped_keypoint_order)
+        self.get_tags = pr.GetTags(flipped_keypoint_order)
+        self.data_with_center = data_with_center
+        self.remove_center = pr.RemoveLastElement()
+
+    def _group_by_shape(self, images):
+        shape_to_args = {}
+        for image_arg, image in enumerate(images):
+            shape_to_args.setdefault(image.shape, []).append(image_arg)
+        return list(shape_to_args.values())
+
+    def _predict_groups(self, images):
+        outputs = [None] * len(images)
+        flipped_outputs = [None] * len(images)
+        for image_args in self._group_by_shape(images):
+            batch = [images[image_arg] for image_arg in image_args]
+            if self.with_flip:
+                batch = batch + [np.flip(image, [2]) for image in batch]
+            batch_outputs = self.predict(np.concatenate(batch, 0))
+            for sample_arg, image_arg in enumerate(image_args):
+                outputs[image_arg] = [output[sample_arg:sample_arg + 1]
+                                      for output in batch_outputs]
+                if self.with_flip:
+                    flip_arg = len(image_args) + sample_arg
+                    flipped_outputs[image_arg] = [
+                        output[flip_arg:flip_arg + 1]
+                        for output in batch_outputs]
+        return outputs, flipped_outputs
+
+    def call(self, images):
+        outputs, flipped_outputs = self._predict_groups(images)
+        heatmaps, tags = [], []
+        for image_arg in range(len(images)):
+            heatmaps.append(self.get_heatmaps(outputs[image_arg], False))
+            tags.append(self.get_tags(outputs[image_arg], False))
+            if self.with_flip:
+                flipped_output = flipped_outputs[image_arg]
+                heatmaps.append(self.get_heatmaps(flipped_output, True))
+                tags.append(self.get_tags(flipped_output, True))
+        if self.data_with_center:
+            heatmaps = self.remove_center(heatmaps)
+            tags = self.remove_center(tags)
+        H, W = heatmaps[0].shape[-2:]
+        size = (2 * W, 2 * H)
+        heatmaps = [resize_heatmaps(heatmap, size) for heatmap in heatmaps]
+        tags = [resize_heatmaps(tag, size) for tag in tags]
+        return heatmaps, tags
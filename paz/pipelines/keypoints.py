@@ -4,16 +4,18 @@ from tensorflow.keras.utils import get_file
 
 from .renderer import RenderTwoViews
 from .image import PreprocessImageHigherHRNet
-from .heatmaps import GetHeatmapsAndTags
+from .heatmaps import GetHeatmapsAndTags, GetMultiScaleHeatmapsAndTags
 
 from .. import processors as pr
-from ..abstract import SequentialProcessor, Processor
+from ..abstract import SequentialProcessor, Processor, Pose6D
 from ..models import KeypointNet2D, HigherHRNet, DetNet, SimpleBaseline
 from .angles import IKNetHandJointAngles
 
 from ..backend.image import get_affine_transform, lincolor
-from ..backend.keypoints import human_pose3D_to_pose6D
+from ..backend.keypoints import human_poses3D_to_poses6D
+from ..backend.image import rotation_matrix_to_rotation_vector
 from ..backend.keypoints import flip_keypoints_left_right, uv_to_vu
+from ..backend.standard import predict_batch
 from ..datasets import JOINT_CONFIG, FLIP_CONFIG
 
 from ..datasets.human36m import data_mean2D, data_stdev2D, args_to_mean
@@ -109,6 +111,31 @@ class EstimateKeypoints2D(Processor):
             image = self.draw(image, keypoints)
         return self.wrap(image, keypoints)
 
+    def predict_batch(self, images, batch_size=None, pad_batch=False):
+        """Estimates keypoints of a list of images using a single model call
+        per batch of images.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+            pad_batch: Boolean. If ``True`` batches are padded to
+                ``batch_size`` images.
+
+        # Returns
+            List of dictionaries with ``keys``: ``image`` and ``keypoints``.
+        """
+        batch_keypoints = predict_batch(
+            images, self.model, self.preprocess, self.predict.postprocess,
+            batch_size, pad_batch)
+        outputs = []
+        for image, keypoints in zip(images, batch_keypoints):
+            keypoints = self.denormalize(keypoints, image)
+            if self.draw:
+                image = self.draw(image, keypoints)
+            outputs.append(self.wrap(image, keypoints))
+        return outputs
+
 
 class FaceKeypointNet2D32(EstimateKeypoints2D):
     """KeypointNet2D model trained with Kaggle Facial Detection challenge.
@@ -166,8 +193,9 @@ class GetKeypoints(Processor):
                  tag_thresh=1):
         super(GetKeypoints, self).__init__()
         self.group_keypoints = pr.SequentialProcessor(
-            [pr.TopKDetections(max_num_instance), pr.GroupKeypointsByTag(
-                keypoint_order, tag_thresh, detection_thresh)])
+            [pr.TopKDetections(max_num_instance, use_numpy=True),
+             pr.GroupKeypointsByTag(keypoint_order, tag_thresh,
+                                    detection_thresh)])
         self.adjust_keypoints = pr.AdjustKeypointsLocations()
         self.get_scores = pr.GetScores()
         self.refine_keypoints = pr.RefineKeypointsLocations()
@@ -226,6 +254,12 @@ class HigherHRNetHumanPose2D(Processor):
         dataset: String. Name of the dataset used for training the model.
         data_with_center: Boolean. True is the model is trained using the
             center.
+        with_flip: Boolean. If ``True`` flipped images are also predicted.
+        draw: Boolean. If ``True`` the skeleton is drawn.
+        scales: List of floats. Scales of the input size at which the image
+            is predicted. The first scale is used as the base scale.
+        batch_flip: Boolean. If ``True`` the image and its flipped version
+            are predicted together in a single forward pass.
 
     # Returns
         dictonary with the following keys:
@@ -234,25 +268,48 @@ class HigherHRNetHumanPose2D(Processor):
             score: score of detection
     """
     def __init__(self, dataset='COCO', data_with_center=False,
-                 max_num_people=30, with_flip=True, draw=True):
+                 max_num_people=30, with_flip=True, draw=True, scales=[1],
+                 batch_flip=True):
         super(HigherHRNetHumanPose2D, self).__init__()
         keypoint_order = JOINT_CONFIG[dataset]
         flipped_keypoint_order = FLIP_CONFIG[dataset]
         self.with_flip = with_flip
         self.draw = draw
+        self.scales = scales
         self.model = HigherHRNet(weights=dataset)
         self.transform_image = PreprocessImageHigherHRNet()
+        if len(scales) > 1:
+            self.transform_images = [PreprocessImageHigherHRNet(
+                input_size=int(512 * scale)) for scale in scales]
+            get_heatmaps_and_tags = GetMultiScaleHeatmapsAndTags(
+                self.model, flipped_keypoint_order, with_flip,
+                data_with_center)
+        else:
+            get_heatmaps_and_tags = GetHeatmapsAndTags(
+                self.model, flipped_keypoint_order, with_flip,
+                data_with_center, batch_flip=batch_flip)
         self.get_heatmaps_and_tags = pr.SequentialProcessor(
-            [GetHeatmapsAndTags(self.model, flipped_keypoint_order,
-             with_flip, data_with_center), pr.AggregateResults(with_flip)])
+            [get_heatmaps_and_tags, pr.AggregateResults(with_flip)])
         self.get_keypoints = GetKeypoints(max_num_people, keypoint_order)
         self.transform_keypoints = TransformKeypoints(inverse=True)
         self.draw_skeleton = pr.DrawHumanSkeleton(dataset, check_scores=True)
         self.extract_keypoints_locations = pr.ExtractKeypointsLocations()
         self.wrap = pr.WrapOutput(['image', 'keypoints', 'scores'])
 
+    def _transform_images(self, image):
+        resized_images, centers, scales = [], [], []
+        for transform_image in self.transform_images:
+            resized_image, center, scale = transform_image(image)
+            resized_images.append(resized_image)
+            centers.append(center)
+            scales.append(scale)
+        return resized_images, centers[0], scales[0]
+
     def call(self, image):
-        resized_image, center, scale = self.transform_image(image)
+        if len(self.scales) > 1:
+            resized_image, center, scale = self._transform_images(image)
+        else:
+            resized_image, center, scale = self.transform_image(image)
         heatmaps, tags = self.get_heatmaps_and_tags(resized_image)
         keypoints, scores = self.get_keypoints(heatmaps, tags)
         shape = [heatmaps.shape[3], heatmaps.shape[2]]
@@ -426,27 +483,39 @@ class EstimateHumanPose(pr.Processor):
         estimate_keypoints_3D: 3D simple baseline model
         args_to_mean: keypoints indices
         h36m_to_coco_joints2D: h36m joints indices
+        jacobian: String or None. Jacobian mode of ``OptimizeHumanPose3D``.
+            ``sparse`` or ``analytic`` scale better to many persons.
 
     # Returns
-        keypoints2D, keypoints3D
+        keypoints2D, keypoints3D, pose6D of the first person and ``Pose6D``
+        messages of all persons
     """
     def __init__(self, solver, camera_intrinsics,
                  args_to_joints3D=args_to_joints3D, filter=True, draw=True,
-                 draw_pose=True):
+                 draw_pose=True, jacobian=None):
         super(EstimateHumanPose, self).__init__()
         self.pose3D = []
         self.pose6D = []
+        self.poses6D = []
         self.draw = draw
         self.filter = filter
         self.draw_pose = draw_pose
         self.estimate_keypoints_2D = HigherHRNetHumanPose2D(draw=draw)
         self.estimate_keypoints_3D = EstimateHumanPose3D()
         self.optimize = pr.OptimizeHumanPose3D(
-            args_to_joints3D, solver, camera_intrinsics)
+            args_to_joints3D, solver, camera_intrinsics, jacobian)
         self.draw_text = pr.DrawText(scale=0.5, thickness=1)
         self.draw_pose6D = pr.DrawHumanPose6D(camera_intrinsics)
         self.wrap = pr.WrapOutput(['image', 'keypoints2D', 'keypoints3D',
-                                   'pose6D'])
+                                   'pose6D', 'poses6D'])
+
+    def _to_poses6D(self, rotations, translations):
+        poses6D = []
+        for rotation, translation in zip(rotations, translations):
+            rotation_vector, _ = rotation_matrix_to_rotation_vector(rotation)
+            poses6D.append(Pose6D.from_rotation_vector(
+                np.ravel(rotation_vector), translation, 'person'))
+        return poses6D
 
     def call(self, image):
         inferences2D = self.estimate_keypoints_2D(image)
@@ -458,10 +527,13 @@ class EstimateHumanPose(pr.Processor):
             keypoints3D = np.reshape(keypoints3D, (-1, 32, 3))
             optimized_output = self.optimize(keypoints3D, keypoints2D)
             joints2D, joints3D, self.pose3D, projection2D = optimized_output
-            self.pose6D = human_pose3D_to_pose6D(self.pose3D[0])
+            rotations, translations = human_poses3D_to_poses6D(self.pose3D)
+            self.poses6D = self._to_poses6D(rotations, translations)
+            self.pose6D = rotations[0], translations[0].tolist()
             if self.draw_pose:
                 rotation, translation = self.pose6D
                 image = self.draw_pose6D(image, rotation, translation)
                 translation = ["%.2f" % item for item in translation]
                 image = self.draw_text(image, str(translation), (30, 30))
-        return self.wrap(image, keypoints2D, self.pose3D, self.pose6D)
+        return self.wrap(image, keypoints2D, self.pose3D, self.pose6D,
+                         self.poses6D)
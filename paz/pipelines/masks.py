@@ -2,6 +2,7 @@ from ..abstract import SequentialProcessor, Processor
 from .. import processors as pr
 from ..backend.image import resize_image, BILINEAR
 from ..backend.keypoints import normalize_keypoints2D
+from ..backend.standard import predict_batch
 
 
 class PredictRGBMask(SequentialProcessor):
@@ -12,14 +13,36 @@ class PredictRGBMask(SequentialProcessor):
     """
     def __init__(self, model, epsilon=0.15):
         super(PredictRGBMask, self).__init__()
-        self.add(pr.ResizeImage(model.input_shape[1:3]))
-        self.add(pr.NormalizeImage())
-        self.add(pr.ExpandDims(0))
+        self.model = model
+        self.preprocess = SequentialProcessor([
+            pr.ResizeImage(model.input_shape[1:3]),
+            pr.NormalizeImage(),
+            pr.ExpandDims(0)])
+        self.postprocess = SequentialProcessor([
+            pr.Squeeze(0),
+            pr.ReplaceLowerThanThreshold(epsilon),
+            pr.DenormalizeImage(),
+            pr.CastImage('uint8')])
+        for processor in self.preprocess.processors:
+            self.add(processor)
         self.add(pr.Predict(model))
-        self.add(pr.Squeeze(0))
-        self.add(pr.ReplaceLowerThanThreshold(epsilon))
-        self.add(pr.DenormalizeImage())
-        self.add(pr.CastImage('uint8'))
+        for processor in self.postprocess.processors:
+            self.add(processor)
+
+    def predict_batch(self, images, batch_size=None):
+        """Predicts the RGB masks of a list of images using a single model
+        call per batch of images.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+
+        # Returns
+            List of RGB masks.
+        """
+        return predict_batch(images, self.model, self.preprocess,
+                             self.postprocess, batch_size)
 
 
 class RGBMaskToObjectPoints3D(SequentialProcessor):
@@ -69,6 +92,26 @@ class Pix2Points(Processor):
 
     def call(self, image):
         RGB_mask = self.predict_RGBMask(image)
+        return self._mask_to_points(image, RGB_mask)
+
+    def predict_batch(self, images, batch_size=None):
+        """Predicts RGB masks, points2D and points3D of a list of images
+        using a single model call per batch of images.
+
+        # Arguments
+            images: List of RGB images.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+
+        # Returns
+            List of dictionaries with ``keys``: ``points2D``, ``points3D``
+            and ``RGB_mask``.
+        """
+        RGB_masks = self.predict_RGBMask.predict_batch(images, batch_size)
+        return [self._mask_to_points(image, RGB_mask)
+                for image, RGB_mask in zip(images, RGB_masks)]
+
+    def _mask_to_points(self, image, RGB_mask):
         if self.resize:
             H, W, num_channels = image.shape
             RGB_mask = resize_image(RGB_mask, (W, H), self.method)
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from tensorflow.keras.utils import get_file
 
@@ -8,6 +10,7 @@ from ..backend.image.draw import draw_points2D, points3D_to_RGB
 from ..backend.standard import append_lists
 from ..backend.keypoints import (
     translate_points2D_origin, denormalize_keypoints2D)
+from ..backend.boxes import nms_per_class_args, merge_nms_box_with_class
 
 from .masks import Pix2Points
 from .detection import HaarCascadeFrontalFace
@@ -147,6 +150,23 @@ class HeadPoseKeypointNet2D32(EstimatePoseKeypoints):
             KEYPOINTS3D, {None: [900, 1200, 800]}, radius, thickness)
 
 
+def _build_thread_pool(num_threads):
+    """Builds a pool of threads for solving several PnP problems at once.
+    OpenCV releases the GIL while solving, therefore threads run in parallel.
+
+    # Arguments
+        num_threads: Int. Number of threads.
+
+    # Returns
+        ``ThreadPoolExecutor`` or ``None`` if ``num_threads`` is zero.
+    """
+    if num_threads < 0:
+        raise ValueError('``num_threads`` must be a non-negative integer')
+    if num_threads == 0:
+        return None
+    return ThreadPoolExecutor(num_threads)
+
+
 class SingleInstancePIX2POSE6D(Processor):
     """Predicts a single pose6D from an image. Optionally if a box2D message is
         given it translates the predicted points2D to new origin located at
@@ -178,17 +198,45 @@ class SingleInstancePIX2POSE6D(Processor):
 
     def call(self, image, box2D=None):
         inferences = self.pix2points(image)
+        return self._solve(image, inferences, box2D)
+
+    def predict_batch(self, images, boxes2D=None, batch_size=None,
+                      executor=None):
+        """Predicts the pose6D of a list of images using a single model call
+        per batch of images.
+
+        # Arguments
+            images: List of RGB images.
+            boxes2D: List of ``Box2D`` messages or ``None``.
+            batch_size: Int or ``None``. Maximum number of images given to
+                the model at once. If ``None`` all images are given at once.
+            executor: ``concurrent.futures.Executor`` or ``None``. If given
+                the PnP problems of all images are solved in its workers.
+
+        # Returns
+            List of dictionaries with inferred points2D, points3D, pose6D
+            and image.
+        """
+        if boxes2D is None:
+            boxes2D = [None] * len(images)
+        batch_inferences = self.pix2points.predict_batch(images, batch_size)
+        map_function = map if executor is None else executor.map
+        return list(map_function(
+            self._solve, images, batch_inferences, boxes2D))
+
+    def _solve(self, image, inferences, box2D=None):
         points2D = inferences['points2D']
         points3D = inferences['points3D']
         points2D = denormalize_keypoints2D(points2D, *image.shape[:2])
+        class_name = self.class_name
         if box2D is not None:
             points2D = translate_points2D_origin(points2D, box2D.coordinates)
-            self.class_name = box2D.class_name
+            class_name = box2D.class_name
         pose6D = None
         if len(points3D) > self.solvePnP.MIN_REQUIRED_POINTS:
             success, R, T = self.solvePnP(points3D, points2D)
             if success:
-                pose6D = Pose6D.from_rotation_vector(R, T, self.class_name)
+                pose6D = Pose6D.from_rotation_vector(R, T, class_name)
         if (self.draw and (box2D is None) and (pose6D is not None)):
             colors = points3D_to_RGB(points3D, self.object_sizes)
             image = draw_points2D(image, points2D, colors)
@@ -207,13 +255,20 @@ class MultiInstancePIX2POSE6D(Processor):
         offsets: List of length two containing floats e.g. (x_scale, y_scale)
         camera: PAZ Camera with intrinsic matrix.
         draw: Boolean. If True drawing functions are applied to output image.
+        batch_size: Int or ``None``. Maximum number of crops given to the
+            model at once. If ``None`` all crops are given at once.
+        num_threads: Int. If larger than zero the PnP problems of all
+            instances are solved in a pool of ``num_threads`` threads.
 
     # Returns
         Dictionary with inferred boxes2D, poses6D and image.
     """
-    def __init__(self, estimate_pose, offsets, camera=None, draw=True):
+    def __init__(self, estimate_pose, offsets, camera=None, draw=True,
+                 batch_size=None, num_threads=0):
         super(MultiInstancePIX2POSE6D, self).__init__()
         self.draw = draw
+        self.batch_size = batch_size
+        self.executor = _build_thread_pool(num_threads)
         self.estimate_pose = estimate_pose
         self.object_sizes = self.estimate_pose.object_sizes
         self.camera = self.estimate_pose.camera if camera is None else camera
@@ -234,9 +289,14 @@ class MultiInstancePIX2POSE6D(Processor):
         boxes2D = self.postprocess_boxes(boxes2D)
         boxes2D = self.clip(image, boxes2D)
         cropped_images = self.crop(image, boxes2D)
+        if hasattr(self.estimate_pose, 'predict_batch'):
+            batch_inferences = self.estimate_pose.predict_batch(
+                cropped_images, boxes2D, self.batch_size, self.executor)
+        else:
+            batch_inferences = [self.estimate_pose(crop, box2D) for
+                                crop, box2D in zip(cropped_images, boxes2D)]
         poses6D, points2D, points3D = [], [], []
-        for crop, box2D in zip(cropped_images, boxes2D):
-            inferences = self.estimate_pose(crop, box2D)
+        for inferences in batch_inferences:
             self.append_values(inferences, [poses6D, points2D, points3D])
         if self.draw:
             image = self.draw_boxes2D(image, boxes2D)
@@ -244,6 +304,16 @@ class MultiInstancePIX2POSE6D(Processor):
             image = self.draw_poses6D(image, poses6D)
         return self.wrap(image, boxes2D, poses6D)
 
+    def close(self):
+        """Shuts down the pool of threads solving the PnP problems."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __del__(self):
+        if getattr(self, 'executor', None) is not None:
+            self.close()
+
 
 class SinglePowerDrillPIX2POSE6D(SingleInstancePIX2POSE6D):
     """Predicts the pose6D of the YCB 035_power_drill object from an image.
@@ -283,15 +353,20 @@ class MultiPowerDrillPIX2POSE6D(MultiInstancePIX2POSE6D):
         epsilon: Float. Values below this value would be replaced by 0.
         resize: Boolean. If True RGB mask is resized before computing PnP.
         draw: Boolean. If True drawing functions are applied to output image.
+        batch_size: Int or ``None``. Maximum number of crops given to the
+            model at once. If ``None`` all crops are given at once.
+        num_threads: Int. If larger than zero the PnP problems of all
+            instances are solved in a pool of ``num_threads`` threads.
 
     # Returns
         Dictionary with inferred boxes2D, poses6D and image.
     """
-    def __init__(self, camera, offsets, epsilon=0.15, resize=False, draw=True):
+    def __init__(self, camera, offsets, epsilon=0.15, resize=False, draw=True,
+                 batch_size=None, num_threads=0):
         estimate_pose = SinglePowerDrillPIX2POSE6D(
             camera, epsilon, resize, draw=False)
         super(MultiPowerDrillPIX2POSE6D, self).__init__(
-            estimate_pose, offsets, camera, draw)
+            estimate_pose, offsets, camera, draw, batch_size, num_threads)
 
 
 class PIX2POSEPowerDrill(Processor):
@@ -304,19 +379,28 @@ class PIX2POSEPowerDrill(Processor):
         offsets: List of length two containing floats e.g. (x_scale, y_scale)
         epsilon: Float. Values below this value would be replaced by 0.
         draw: Boolean. If ``True`` prediction are drawn in the returned image.
+        batch_size: Int or ``None``. Maximum number of crops given to the
+            model at once. If ``None`` all crops are given at once.
+        num_threads: Int. If larger than zero the PnP problems of all
+            instances are solved in a pool of ``num_threads`` threads.
 
     # Returns
         Dictionary with inferred boxes2D, poses6D and image.
     """
     def __init__(self, camera, score_thresh=0.50, nms_thresh=0.45,
-                 offsets=[0.5, 0.5], epsilon=0.15, resize=False, draw=True):
+                 offsets=[0.5, 0.5], epsilon=0.15, resize=False, draw=True,
+                 batch_size=None, num_threads=0):
         self.detect = SSD300FAT(score_thresh, nms_thresh, draw=False)
         self.estimate_pose = MultiPowerDrillPIX2POSE6D(
-            camera, offsets, epsilon, resize, draw)
+            camera, offsets, epsilon, resize, draw, batch_size, num_threads)
 
     def call(self, image):
         return self.estimate_pose(image, self.detect(image)['boxes2D'])
 
+    def close(self):
+        """Shuts down the pool of threads solving the PnP problems."""
+        self.estimate_pose.close()
+
 
 class MultiInstanceMultiClassPIX2POSE6D(Processor):
     """Predicts poses6D of multiple instances of multiple objects from an image
@@ -333,19 +417,27 @@ class MultiInstanceMultiClassPIX2POSE6D(Processor):
         epsilon: Float. Values below this value would be replaced by 0.
         resize: Boolean. If True RGB mask is resized before computing PnP.
         draw: Boolean. If True drawing functions are applied to output image.
+        batch_size: Int or ``None``. Maximum number of crops of the same
+            class given to its model at once. If ``None`` all crops of the
+            same class are given at once.
+        num_threads: Int. If larger than zero the PnP problems of all
+            instances are solved in a pool of ``num_threads`` threads.
 
     # Returns
         Dictionary with inferred boxes2D, poses6D and image.
     """
     def __init__(self, detect, name_to_model, name_to_size, camera, offsets,
-                 epsilon=0.15, resize=False, draw=True):
+                 epsilon=0.15, resize=False, draw=True, batch_size=None,
+                 num_threads=0):
         super(MultiInstanceMultiClassPIX2POSE6D, self).__init__()
         if set(name_to_model.keys()) != set(name_to_size.keys()):
             raise ValueError('models and sizes must have same class names')
         self.detect = detect
+        self.batch_size = batch_size
+        self.executor = _build_thread_pool(num_threads)
         self.name_to_pix2points = self._build_pix2points(
             name_to_model, name_to_size, epsilon, resize)
-        valid_names = list(self.name_to_model.keys())
+        valid_names = list(name_to_model.keys())
         self.postprocess_boxes = PostprocessBoxes2D(offsets, valid_names)
         self.draw_boxes2D = pr.DrawBoxes2D(valid_names)
         self.draw_RGBmask = self._build_draw_RGBmask(name_to_size)
@@ -380,6 +472,34 @@ class MultiInstanceMultiClassPIX2POSE6D(Processor):
 
     def estimate_pose(self, image, box2D):
         inferences = self.name_to_pix2points[box2D.class_name](image)
+        return self._solve(image, box2D, inferences)
+
+    def estimate_poses(self, images, boxes2D):
+        """Estimates the poses of all crops predicting the crops of each
+        class with a single model call per batch.
+
+        # Arguments
+            images: List of cropped RGB images.
+            boxes2D: List of ``Box2D`` messages of each cropped image.
+
+        # Returns
+            List with points2D, points3D and pose6D of each crop.
+        """
+        name_to_args = {}
+        for arg, box2D in enumerate(boxes2D):
+            name_to_args.setdefault(box2D.class_name, []).append(arg)
+        batch_inferences = [None] * len(images)
+        for name, args in name_to_args.items():
+            pix2points = self.name_to_pix2points[name]
+            class_inferences = pix2points.predict_batch(
+                [images[arg] for arg in args], self.batch_size)
+            for arg, inferences in zip(args, class_inferences):
+                batch_inferences[arg] = inferences
+        map_function = map if self.executor is None else self.executor.map
+        return list(map_function(
+            self._solve, images, boxes2D, batch_inferences))
+
+    def _solve(self, image, box2D, inferences):
         points2D = inferences['points2D']
         points3D = inferences['points3D']
         points2D = denormalize_keypoints2D(points2D, *image.shape[:2])
@@ -397,8 +517,7 @@ class MultiInstanceMultiClassPIX2POSE6D(Processor):
         boxes2D = self.clip(image, boxes2D)
         cropped_images = self.crop(image, boxes2D)
         points2D, points3D, poses6D = [], [], []
-        for crop, box2D in zip(cropped_images, boxes2D):
-            inferences = self.estimate_pose(crop, box2D)
+        for inferences in self.estimate_poses(cropped_images, boxes2D):
             append_lists(inferences, [points2D, points3D, poses6D])
         if self.draw:
             image = self.draw_boxes2D(image, boxes2D)
@@ -409,6 +528,16 @@ class MultiInstanceMultiClassPIX2POSE6D(Processor):
                 image = self.draw_RGBmask[name](image, p2D, p3D)
         return self.wrap(image, boxes2D, points3D, poses6D)
 
+    def close(self):
+        """Shuts down the pool of threads solving the PnP problems."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __del__(self):
+        if getattr(self, 'executor', None) is not None:
+            self.close()
+
 
 class PIX2YCBTools6D(MultiInstanceMultiClassPIX2POSE6D):
     """Predicts poses6D of multiple instances of the YCB tools:
@@ -422,19 +551,25 @@ class PIX2YCBTools6D(MultiInstanceMultiClassPIX2POSE6D):
         epsilon: Float. Values below this value would be replaced by 0.
         resize: Boolean. If True RGB mask is resized before computing PnP.
         draw: Boolean. If True drawing functions are applied to output image.
+        batch_size: Int or ``None``. Maximum number of crops of the same
+            class given to its model at once. If ``None`` all crops of the
+            same class are given at once.
+        num_threads: Int. If larger than zero the PnP problems of all
+            instances are solved in a pool of ``num_threads`` threads.
 
     # Returns
         Dictionary with inferred boxes2D, poses6D and image.
     """
     def __init__(self, camera, score_thresh=0.45, nms_thresh=0.15,
-                 offsets=[0.25, 0.25], epsilon=0.15, resize=False, draw=True):
+                 offsets=[0.25, 0.25], epsilon=0.15, resize=False, draw=True,
+                 batch_size=None, num_threads=0):
 
         self.detect = SSD300FAT(score_thresh, nms_thresh, draw=False)
         self.name_to_sizes = self._build_name_to_sizes()
         self.name_to_model = self._build_name_to_model()
         super(PIX2YCBTools6D, self).__init__(
             self.detect, self.name_to_model, self.name_to_sizes, camera,
-            offsets, epsilon, resize, draw)
+            offsets, epsilon, resize, draw, batch_size, num_threads)
 
     def _build_name_to_model(self):
         URL = ('https://github.com/oarriaga/altamira-data/'
@@ -505,11 +640,14 @@ class AugmentEfficientPose(SequentialProcessor):
         probability: Float indicating the probability
             of data augmentation.
         num_pose_dims: Int, number of dimensions for pose.
+        image_store: ``ImageStore``, string or ``None``. Store of decoded
+            images and masks read by ``LoadImage`` instead of decoding
+            image files.
     """
     def __init__(self, model, mean, camera_matrix, split=pr.TRAIN,
                  num_classes=8, size=512, IOU=.5,
                  variances=[0.1, 0.1, 0.2, 0.2], probability=0.5,
-                 num_pose_dims=3):
+                 num_pose_dims=3, image_store=None):
         super(AugmentEfficientPose, self).__init__()
         self.augment_color = AugmentColor()
         self.augment_pose_6D = pr.AugmentPose6D(
@@ -531,8 +669,9 @@ class AugmentEfficientPose(SequentialProcessor):
         # pipeline
         self.add(pr.UnpackDictionary(['image', 'boxes', 'rotation',
                                       'translation_raw', 'class', 'mask']))
-        self.add(pr.ControlMap(pr.LoadImage(), [0], [0]))
-        self.add(pr.ControlMap(pr.LoadImage(), [5], [5]))
+        load_image = pr.LoadImage(image_store=image_store)
+        self.add(pr.ControlMap(load_image, [0], [0]))
+        self.add(pr.ControlMap(load_image, [5], [5]))
         if split == pr.TRAIN:
             self.add(pr.ControlMap(self.augment_color, [0], [0]))
             self.add(pr.ControlMap(self.augment_pose_6D, [0, 1, 2, 3, 5],
@@ -602,26 +741,31 @@ class EfficientPosePostprocess(Processor):
             pr.DecodeBoxes(model.prior_boxes, variances),
             pr.RemoveClass(class_names, class_arg)])
         self.scale_box = pr.ScaleBox()
-        self.postprocess_2 = pr.SequentialProcessor([
-            pr.NonMaximumSuppressionPerClass(nms_thresh),
-            pr.MergeNMSBoxWithClass(),
-            pr.FilterBoxes(class_names, score_thresh)])
+        self.score_thresh = score_thresh
+        self.nms_thresh = nms_thresh
         self.to_boxes2D = pr.ToBoxes2D(class_names)
         self.round_boxes = pr.RoundBoxes2D()
         self.denormalize = pr.DenormalizeBoxes2D()
         self.regress_translation = regress_translation
         self.compute_tx_ty_tz = compute_tx_ty_tz
-        self.compute_common_rows = pr.ComputeCommonRowIndices()
         self.squeeze = pr.Squeeze(axis=0)
         self.transform_rotations = pr.Scale(np.pi)
         self.to_pose_6D = pr.ToPose6D(class_names)
 
+    def _suppress(self, box_data):
+        """Applies non maximum suppression per class and filters the boxes
+        by score, while keeping the prior box index of every kept box.
+        """
+        box_args, class_labels = nms_per_class_args(box_data, self.nms_thresh)
+        box_data = merge_nms_box_with_class(box_data[box_args], class_labels)
+        is_confident = np.max(box_data[:, 4:], axis=1) >= self.score_thresh
+        return box_data[is_confident], box_args[is_confident]
+
     def call(self, image, model_output, image_scale):
         detections, transformations = model_output
         box_data = self.postprocess_1(detections)
         box_data = self.scale_box(box_data, 1 / image_scale)
-        box_data_all = box_data
-        box_data = self.postprocess_2(box_data)
+        box_data, selected_indices = self._suppress(box_data)
         boxes2D = self.to_boxes2D(box_data)
         boxes2D = self.denormalize(image, boxes2D)
         boxes2D = self.round_boxes(boxes2D)
@@ -629,7 +773,6 @@ class EfficientPosePostprocess(Processor):
         translations = transformations[:, :, self.num_pose_dims:]
         poses6D = []
         if len(boxes2D) > 0:
-            selected_indices = self.compute_common_rows(box_data_all, box_data)
             rotations = self.squeeze(rotations)
             rotations = rotations[selected_indices]
             rotations = self.transform_rotations(rotations)
@@ -673,6 +816,7 @@ class EstimateEfficientPose(Processor):
         preprocess: Callable.
         postprocess: Callable.
         draw_boxes2D: Callable.
+        draw_pose6D: Dict, class names to pose drawing callables.
         wrap: Callable.
 
     # Methods
@@ -695,15 +839,19 @@ class EstimateEfficientPose(Processor):
         self.show_boxes2D = show_boxes2D
         self.show_poses6D = show_poses6D
         if preprocess is None:
-            self.preprocess = EfficientPosePreprocess(model, mean)
+            preprocess = EfficientPosePreprocess(model, mean)
         if postprocess is None:
-            self.postprocess = EfficientPosePostprocess(
+            postprocess = EfficientPosePostprocess(
                 model, class_names, score_thresh,
                 nms_thresh, camera_matrix, regress_translation,
                 compute_tx_ty_tz, class_arg=0)
+        self.preprocess = preprocess
+        self.postprocess = postprocess
 
         super(EstimateEfficientPose, self).__init__()
         self.draw_boxes2D = pr.DrawBoxes2D(self.class_names)
+        self.draw_pose6D = self._build_draw_pose6D(
+            self.class_to_sizes, self.camera_matrix)
         self.wrap = pr.WrapOutput(['image', 'boxes2D', 'poses6D'])
 
     def _build_draw_pose6D(self, name_to_size, camera_parameter):
@@ -724,8 +872,6 @@ class EstimateEfficientPose(Processor):
         if self.show_boxes2D:
             image = self.draw_boxes2D(image, boxes2D)
         if self.show_poses6D:
-            self.draw_pose6D = self._build_draw_pose6D(
-                self.class_to_sizes, self.camera_matrix)
             for box2D, pose6D in zip(boxes2D, poses6D):
                 image = self.draw_pose6D[box2D.class_name](image, pose6D)
         return self.wrap(image, boxes2D, poses6D)
@@ -53,11 +53,20 @@ class RandomizeRenderedImage(SequentialProcessor):
     num_occlusions: Int. number of occlusions to be added to the image.
     max_radius_scale: Float between [0, 1] indicating the maximum radius in
         scale of the image size.
+    pool_size: Int. If larger than ``0`` decoded backgrounds are kept in a
+        pool of this size. See ``BlendRandomCroppedBackground``.
+    memory_budget: Int or ``None``. Maximum number of bytes of the pooled
+        backgrounds.
+    refresh_period: Int. Number of images after which a fraction of the
+        background pool is replaced.
     """
-    def __init__(self, image_paths, num_occlusions=1, max_radius_scale=0.5):
+    def __init__(self, image_paths, num_occlusions=1, max_radius_scale=0.5,
+                 pool_size=0, memory_budget=None, refresh_period=0):
         super(RandomizeRenderedImage, self).__init__()
         self.add(pr.ConcatenateAlphaMask())
-        self.add(pr.BlendRandomCroppedBackground(image_paths))
+        self.add(pr.BlendRandomCroppedBackground(
+            image_paths, pool_size, memory_budget,
+            refresh_period=refresh_period))
         for arg in range(num_occlusions):
             self.add(pr.AddOcclusion(max_radius_scale))
         self.add(pr.RandomImageBlur())
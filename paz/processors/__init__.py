@@ -10,7 +10,9 @@ from .detection import ToBoxes2D
 from .detection import MatchBoxes
 from .detection import EncodeBoxes
 from .detection import DecodeBoxes
+from .detection import ToSparseBoxes
 from .detection import NonMaximumSuppressionPerClass
+from .detection import DecodeAndSuppressBoxes2D
 from .detection import FilterBoxes
 from .detection import OffsetBoxes2D
 from .detection import CropImage
@@ -203,6 +205,7 @@ from .heatmaps import TransformKeypoints
 from .heatmaps import ExtractKeypointsLocations
 
 from .munkres import Munkres
+from .munkres import LinearAssignment
 
 from .angles import ChangeLinkOrder
 from .angles import CalculateRelativeAngles
@@ -9,12 +9,15 @@ from ..backend.boxes import decode
 from ..backend.boxes import offset
 from ..backend.boxes import clip
 from ..backend.boxes import nms_per_class
+from ..backend.boxes import nms_per_class_batched
 from ..backend.boxes import merge_nms_box_with_class
 from ..backend.boxes import denormalize_box
 from ..backend.boxes import make_box_square
 from ..backend.boxes import filter_boxes
 from ..backend.boxes import scale_box
 from ..backend.boxes import add_class_and_score
+from ..backend.boxes import decode_and_suppress
+from ..backend.boxes import to_sparse_boxes
 
 
 class SquareBoxes2D(Processor):
@@ -265,14 +268,21 @@ class MatchBoxes(Processor):
             will be considered positive. A positive box is box with a class
             different than `background`.
         variance: List of two floats.
+        dtype: Numpy data type used for computing intersections over union
+            e.g. `np.float32`. If `None` the type of the boxes is used.
+        chunk_size: Int or `None`. If given, intersections over union are
+            computed for at most `chunk_size` ground truth boxes at once.
     """
-    def __init__(self, prior_boxes, iou=.5):
+    def __init__(self, prior_boxes, iou=.5, dtype=None, chunk_size=None):
         self.prior_boxes = prior_boxes
         self.iou = iou
+        self.dtype = dtype
+        self.chunk_size = chunk_size
         super(MatchBoxes, self).__init__()
 
     def call(self, boxes):
-        boxes = match(boxes, self.prior_boxes, self.iou)
+        boxes = match(boxes, self.prior_boxes, self.iou,
+                      self.dtype, self.chunk_size)
         return boxes
 
 
@@ -293,6 +303,23 @@ class EncodeBoxes(Processor):
         return encoded_boxes
 
 
+class ToSparseBoxes(Processor):
+    """Keeps only positive encoded boxes together with their prior box
+    argument. Used for training with ``CompactMultiBoxLoss(sparse=True)``.
+
+    # Arguments
+        max_num_positives: Int. Maximum number of prior boxes matched to a
+            ground truth box per sample. Samples with more positive prior
+            boxes raise a ``ValueError``.
+    """
+    def __init__(self, max_num_positives=1000):
+        self.max_num_positives = max_num_positives
+        super(ToSparseBoxes, self).__init__()
+
+    def call(self, boxes):
+        return to_sparse_boxes(boxes, self.max_num_positives)
+
+
 class DecodeBoxes(Processor):
     """Decodes bounding boxes.
 
@@ -316,18 +343,79 @@ class NonMaximumSuppressionPerClass(Processor):
     # Arguments
         nms_thresh: Float between [0, 1].
         epsilon: Float between [0, 1].
+        top_k: Int, maximum number of boxes per class.
+        batched: Boolean. If True all classes are suppressed at once
+            using ``nms_per_class_batched`` instead of one loop per class.
     """
-    def __init__(self, nms_thresh=.45, epsilon=0.01):
+    def __init__(self, nms_thresh=.45, epsilon=0.01, top_k=200,
+                 batched=False):
         self.nms_thresh = nms_thresh
         self.epsilon = epsilon
+        self.top_k = top_k
+        self.batched = batched
+        if batched:
+            self._nms_per_class = nms_per_class_batched
+        else:
+            self._nms_per_class = nms_per_class
         super(NonMaximumSuppressionPerClass, self).__init__()
 
     def call(self, box_data):
-        box_data, class_labels = nms_per_class(
-            box_data, self.nms_thresh, self.epsilon)
+        box_data, class_labels = self._nms_per_class(
+            box_data, self.nms_thresh, self.epsilon, self.top_k)
         return box_data, class_labels
 
 
+class DecodeAndSuppressBoxes2D(Processor):
+    """Filters, decodes and applies non maximum suppression per class to
+    the raw predictions of a single-shot detector and returns ``Boxes2D``.
+    It is equivalent to applying ``Squeeze``, ``DecodeBoxes``,
+    ``RemoveClass``, ``NonMaximumSuppressionPerClass``,
+    ``MergeNMSBoxWithClass``, ``FilterBoxes`` and ``ToBoxes2D``, but
+    only the prior boxes with a score above ``score_thresh`` are decoded.
+
+    # Arguments
+        prior_boxes: Numpy array of shape (num_boxes, 4).
+        class_names: List of class names.
+        score_thresh: Float between [0, 1].
+        nms_thresh: Float between [0, 1].
+        variances: List of four float values.
+        class_arg: Int, index of the class to be removed.
+        epsilon: Float between [0, 1].
+        top_k: Int, maximum number of boxes per class.
+
+    # Methods
+        call()
+    """
+    def __init__(self, prior_boxes, class_names, score_thresh=0.5,
+                 nms_thresh=.45, variances=[0.1, 0.1, 0.2, 0.2],
+                 class_arg=None, epsilon=0.01, top_k=200):
+        self.prior_boxes = prior_boxes
+        self.score_thresh = score_thresh
+        self.nms_thresh = nms_thresh
+        self.variances = variances
+        self.class_arg = class_arg
+        self.epsilon = epsilon
+        self.top_k = top_k
+        # class is removed from ``class_names`` as in ``RemoveClass``
+        if class_arg is not None:
+            del class_names[class_arg]
+        self.arg_to_class = dict(zip(range(len(class_names)), class_names))
+        super(DecodeAndSuppressBoxes2D, self).__init__()
+
+    def call(self, predictions, image_scales=None):
+        if predictions.ndim == 3:
+            predictions = np.squeeze(predictions, axis=0)
+        boxes, scores, class_labels = decode_and_suppress(
+            predictions, self.prior_boxes, self.variances, self.score_thresh,
+            self.nms_thresh, self.epsilon, self.top_k, self.class_arg,
+            image_scales)
+        boxes2D = []
+        for box, score, class_arg in zip(boxes, scores, class_labels):
+            class_name = self.arg_to_class[class_arg]
+            boxes2D.append(Box2D(box, score, class_name))
+        return boxes2D
+
+
 class MergeNMSBoxWithClass(Processor):
     """Merges box coordinates with their corresponding class
     defined by `class_labels` which is decided by best box geometry
@@ -5,15 +5,15 @@ from ..abstract import Processor
 from paz import processors as pr
 
 from ..backend.keypoints import transform_keypoint
-from ..backend.image import resize_image
 from ..backend.keypoints import add_offset_to_point
 from ..backend.heatmaps import get_keypoints_locations, get_keypoints_heatmap
-from ..backend.heatmaps import get_top_k_keypoints_numpy
+from ..backend.heatmaps import select_top_k_keypoints
+from ..backend.heatmaps import suppress_non_maximum_heatmaps
+from ..backend.heatmaps import shift_to_larger_neighbours
 from ..backend.heatmaps import get_tags_heatmap, get_valid_detections
+from ..backend.heatmaps import resize_heatmaps
 from ..backend.standard import calculate_norm, pad_matrix, tensor_to_numpy
-from ..backend.standard import compare_vertical_neighbours, gather_nd
-from ..backend.standard import compare_horizontal_neighbours
-from ..backend.standard import max_pooling_2d
+from ..backend.standard import gather_nd
 
 
 class TransposeOutput(Processor):
@@ -38,25 +38,19 @@ class ScaleOutput(Processor):
     # Arguments
         scaling_factor: Int.
         full_scaling: Boolean. If all the array of array are to be scaled.
+        max_channels: Int. Maximum number of heatmaps resized at once.
+            See ``paz.backend.heatmaps.resize_heatmaps``.
         Output: List of numpy array
 
     """
-    def __init__(self, scale_factor, full_scaling=False):
+    def __init__(self, scale_factor, full_scaling=False, max_channels=1):
         super(ScaleOutput, self).__init__()
         self.scale_factor = int(scale_factor)
         self.full_scaling = full_scaling
+        self.max_channels = max_channels
 
     def _resize_output(self, output, size):
-        resized_output = []
-        for heatmap_arg, heatmap in enumerate(output):
-            resized_heatmaps = []
-            for keypoint_arg in range(len(heatmap)):
-                resized = resize_image(output[heatmap_arg][keypoint_arg], size)
-                resized_heatmaps.append(resized)
-            resized_heatmaps = np.stack(resized_heatmaps, axis=0)
-        resized_output.append(resized_heatmaps)
-        resized_output = np.stack(resized_output, axis=0)
-        return resized_output
+        return resize_heatmaps(output, size, self.max_channels)
 
     def call(self, outputs):
         for arg in range(len(outputs)):
@@ -143,7 +137,7 @@ class RemoveLastElement(Processor):
         super(RemoveLastElement, self).__init__()
 
     def call(self, x):
-        if all(isinstance(each, list) for each in x):
+        if isinstance(x, list):
             return [each[:, :-1] for each in x]
         else:
             return x[:, :-1]
@@ -172,8 +166,8 @@ class AggregateResults(Processor):
         return updated_tags
 
     def _calculate_heatmaps_average(self, heatmaps):
-        if self.with_flip:
-            heatmaps_average = (heatmaps[0] + heatmaps[1]) / 2.0
+        if self.with_flip or isinstance(heatmaps, list):
+            heatmaps_average = sum(heatmaps) / float(len(heatmaps))
         else:
             heatmaps_average = heatmaps[0]
         return heatmaps_average
@@ -191,6 +185,7 @@ class TopKDetections(Processor):
     # Arguments
         k: Int. Maximum number of instances to be detected.
         use_numpy: Boolean. Whether to use numpy functions or tf functions.
+            Both give the same detections.
         heatmaps: Numpy array of shape (1, num_joints, H, W)
         Tags: Numpy array of shape (1, num_joints, H, W, 2)
 
@@ -202,28 +197,21 @@ class TopKDetections(Processor):
         super(TopKDetections, self).__init__()
         self.k = k
         self.use_numpy = use_numpy
+        self._max_pooling_layers = {}
 
-    def _max_pooing_2d(self, heatmaps, pool_size, strides, padding,
-                       use_numpy=False):
-        if use_numpy:
-            heatmaps = np.squeeze(heatmaps)
-            heatmaps = np.transpose(heatmaps, [2, 0, 1])
-            max_heatmaps = np.zeros_like(heatmaps)
-            for arg, heatmap in enumerate(heatmaps):
-                max_heatmaps[arg] = max_pooling_2d(heatmap, pool_size,
-                                                   strides, padding)
-            max_heatmaps = np.transpose(max_heatmaps, [1, 2, 0])
-            max_pooled_values = np.expand_dims(max_heatmaps, 0)
-        else:
-            max_pooled_values = tf.keras.layers.MaxPooling2D(
-                pool_size, strides, padding)(heatmaps)
-        return max_pooled_values
+    def _max_pooing_2d(self, heatmaps, pool_size, strides, padding):
+        key = (pool_size, strides, padding)
+        if key not in self._max_pooling_layers:
+            self._max_pooling_layers[key] = tf.keras.layers.MaxPooling2D(
+                pool_size, strides, padding)
+        return self._max_pooling_layers[key](heatmaps)
 
     def _filter_heatmaps(self, heatmaps):
+        if self.use_numpy:
+            return suppress_non_maximum_heatmaps(heatmaps, pool_size=3)
         heatmaps = np.transpose(heatmaps, [0, 2, 3, 1])
         maximum_values = self._max_pooing_2d(heatmaps, pool_size=3, strides=1,
-                                             padding='same',
-                                             use_numpy=self.use_numpy)
+                                             padding='same')
         maximum_values = np.equal(maximum_values, heatmaps)
         maximum_values = maximum_values.astype(np.float32)
         filtered_heatmaps = heatmaps * maximum_values
@@ -232,7 +220,8 @@ class TopKDetections(Processor):
 
     def _get_top_k_keypoints(self, heatmaps, k, use_numpy):
         if use_numpy:
-            top_k_keypoints, indices = get_top_k_keypoints_numpy(heatmaps, k)
+            top_k_keypoints, indices = select_top_k_keypoints(heatmaps, k)
+            top_k_keypoints = np.squeeze(top_k_keypoints)
         else:
             top_k_keypoints, indices = tf.math.top_k(heatmaps, k)
             top_k_keypoints = np.squeeze(top_k_keypoints)
@@ -280,7 +269,7 @@ class GroupKeypointsByTag(Processor):
         self.keypoint_order = keypoint_order
         self.tag_thresh = tag_thresh
         self.detection_thresh = detection_thresh
-        self.munkres = pr.Munkres()
+        self.solve_assignment = pr.LinearAssignment()
 
     def _update_dictionary(self, tags, keypoints, arg,
                            default, keypoint_dict, tag_dict):
@@ -313,7 +302,7 @@ class GroupKeypointsByTag(Processor):
                     grouped_tags, 0)
                 norm = calculate_norm(difference, order=2, axis=2)
                 norm = pad_matrix(norm, padding='square', value=1e10)
-                lowest_cost = self.munkres.compute(norm)
+                lowest_cost = self.solve_assignment(norm)
                 lowest_cost = np.array(lowest_cost).astype(np.int32)
 
                 for row_arg, col_arg in lowest_cost:
@@ -331,6 +320,7 @@ class GroupKeypointsByTag(Processor):
 
 class AdjustKeypointsLocations(Processor):
     """Adjust the keypoint locations by removing the margins.
+    All objects and keypoints of an image are adjusted at once.
     # Arguments
         heatmaps: Numpy array.
         grouped_keypoints: numpy array. keypoints grouped by tag
@@ -340,16 +330,16 @@ class AdjustKeypointsLocations(Processor):
 
     def call(self, heatmaps, grouped_keypoints):
         for batch_id, objects in enumerate(grouped_keypoints):
-            for object_id, object in enumerate(objects):
-                for keypoint_id, keypoint in enumerate(object):
-                    heatmap = heatmaps[batch_id][keypoint_id]
-                    if keypoint[2] > 0:
-                        y, x = keypoint[0:2]
-                        y = compare_vertical_neighbours(x, y, heatmap)
-                        x = compare_horizontal_neighbours(x, y, heatmap)
-                        grouped_keypoints[batch_id][
-                            object_id, keypoint_id, 0:2] = add_offset_to_point(
-                                (y, x), offset=0.5)
+            if len(objects) == 0:
+                continue
+            object_args, keypoint_args = np.nonzero(objects[:, :, 2] > 0)
+            y = objects[object_args, keypoint_args, 0]
+            x = objects[object_args, keypoint_args, 1]
+            x, y = shift_to_larger_neighbours(
+                heatmaps[batch_id], keypoint_args, x, y)
+            y, x = add_offset_to_point((y, x), offset=0.5)
+            objects[object_args, keypoint_args, 0] = y
+            objects[object_args, keypoint_args, 1] = x
         return grouped_keypoints
 
 
@@ -370,6 +360,7 @@ class GetScores(Processor):
 
 class RefineKeypointsLocations(Processor):
     """Refine the keypoint locations by removing the margins.
+    Missing keypoints of an object are searched in all heatmaps at once.
     # Arguments
         heatmaps: Numpy array.
         Tgas: Numpy array.
@@ -379,55 +370,48 @@ class RefineKeypointsLocations(Processor):
         super(RefineKeypointsLocations, self).__init__()
 
     def _calculate_tags_mean(self, keypoints, tags):
-        keypoints_tags = []
-        for arg in range(keypoints.shape[0]):
-            if keypoints[arg, 2] > 0:
-                x, y = keypoints[arg][:2].astype(np.int32)
-                keypoints_tags.append(tags[arg, y, x])
-        tags_mean = np.mean(keypoints_tags, axis=0)
+        keypoint_args = np.flatnonzero(keypoints[:, 2] > 0)
+        x, y = keypoints[keypoint_args, :2].astype(np.int32).T
+        tags_mean = np.mean(tags[keypoint_args, y, x], axis=0)
         tags_mean = np.expand_dims(tags_mean, axis=[0, 1])
         return tags_mean
 
-    def _normalize_heatmap(self, arg, tags, tags_mean, heatmap):
-        normalized_tags = (tags[arg, :, :] - tags_mean)
-        normalized_tags_squared_sum = (normalized_tags ** 2).sum(axis=2)
-        return heatmap - np.round(np.sqrt(normalized_tags_squared_sum))
-
-    def _find_max_position(self, heatmap_per_keypoint,
-                           normalized_heatmap_per_keypoint):
-        max_indices = np.argmax(normalized_heatmap_per_keypoint)
-        shape = heatmap_per_keypoint.shape
-        x, y = np.unravel_index(max_indices, shape)
+    def _normalize_heatmaps(self, keypoint_args, tags, tags_mean, heatmaps):
+        normalized_tags = (tags[keypoint_args] - tags_mean)
+        np.square(normalized_tags, out=normalized_tags)
+        distances = normalized_tags.sum(axis=3)
+        np.round(np.sqrt(distances, out=distances), out=distances)
+        return heatmaps[keypoint_args] - distances
+
+    def _find_max_positions(self, normalized_heatmaps):
+        num_keypoints, H, W = normalized_heatmaps.shape
+        normalized_heatmaps = normalized_heatmaps.reshape(num_keypoints, -1)
+        max_indices = np.argmax(normalized_heatmaps, axis=1)
+        x, y = np.unravel_index(max_indices, (H, W))
         return x, y
 
-    def _update_keypoints(self, keypoints, updated_keypoints, heatmaps):
-        updated_keypoints = np.array(updated_keypoints)
-        for i in range(heatmaps.shape[0]):
-            if updated_keypoints[i, 2] > 0 and keypoints[i, 2] == 0:
-                keypoints[i, :3] = updated_keypoints[i, :3]
-        return keypoints
-
     def call(self, heatmaps, tags, grouped_keypoints):
         if len(tags.shape) == 3:
             tags = np.expand_dims(tags, -1)
         for arg in range(len(grouped_keypoints)):
-            tags_mean = self._calculate_tags_mean(grouped_keypoints[arg], tags)
-            updated_keypoints = []
-            for keypoint_arg in range(grouped_keypoints[arg].shape[0]):
-                heatmap_per_keypoint = heatmaps[keypoint_arg, :, :]
-                normalized_heatmap_per_keypoint = self._normalize_heatmap(
-                    keypoint_arg, tags, tags_mean, heatmap_per_keypoint)
-
-                x, y = self._find_max_position(
-                    heatmap_per_keypoint, normalized_heatmap_per_keypoint)
-                max_heatmaps_value = heatmap_per_keypoint[x, y]
-                x, y = add_offset_to_point((x, y), offset=0.5)
-                y = compare_vertical_neighbours(x, y, heatmap_per_keypoint)
-                x = compare_horizontal_neighbours(x, y, heatmap_per_keypoint)
-                updated_keypoints.append((y, x, max_heatmaps_value))
-
-            grouped_keypoints[arg] = self._update_keypoints(
-                grouped_keypoints[arg], updated_keypoints, heatmaps)
+            keypoints = grouped_keypoints[arg]
+            # only missing keypoints are updated
+            keypoint_args = np.flatnonzero(keypoints[:, 2] == 0)
+            if len(keypoint_args) == 0:
+                continue
+            tags_mean = self._calculate_tags_mean(keypoints, tags)
+            normalized_heatmaps = self._normalize_heatmaps(
+                keypoint_args, tags, tags_mean, heatmaps)
+            x, y = self._find_max_positions(normalized_heatmaps)
+            max_heatmaps_values = heatmaps[keypoint_args, x, y]
+            x, y = add_offset_to_point((x, y), offset=0.5)
+            x, y = shift_to_larger_neighbours(heatmaps, keypoint_args, x, y)
+            is_updated = max_heatmaps_values > 0
+            updated_args = keypoint_args[is_updated]
+            keypoints[updated_args, 0] = y[is_updated]
+            keypoints[updated_args, 1] = x[is_updated]
+            keypoints[updated_args, 2] = max_heatmaps_values[is_updated]
+            grouped_keypoints[arg] = keypoints
         return grouped_keypoints
 
 
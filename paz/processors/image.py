@@ -1,3 +1,6 @@
+import threading
+from collections import OrderedDict
+
 import numpy as np
 
 from ..abstract import Processor
@@ -33,6 +36,8 @@ from ..backend.image import solarize
 from ..backend.image import cutout
 from ..backend.image import add_gaussian_noise
 from ..backend.image import BILINEAR, CUBIC
+from ..backend.image import ImageStore
+from ..backend.image import BackgroundPool
 from ..backend.image.tensorflow_image import imagenet_preprocess_input
 from ..backend.image.opencv_image import convolve_image
 
@@ -110,14 +115,62 @@ class LoadImage(Processor):
 
     # Arguments
         num_channels: Integer, valid integers are: 1, 3 and 4.
-    """
-    def __init__(self, num_channels=3):
+        image_store: ``ImageStore``, string or ``None``. Store of decoded
+            images written with ``write_image_store``, or its directory.
+            Images in the store are read without decoding, while images
+            missing in the store are loaded from disk.
+        cache_size: Int. Number of decoded images kept in memory. If the
+            cache is full the least recently used image is removed.
+
+    # Notes
+        Images read from the store or the cache are returned as copies,
+        therefore later processors can modify them in place.
+    """
+    def __init__(self, num_channels=3, image_store=None, cache_size=0):
+        if isinstance(image_store, str):
+            image_store = ImageStore(image_store)
+        if image_store is not None:
+            if image_store.num_channels != num_channels:
+                raise ValueError('Image store has a different num_channels')
         self.num_channels = num_channels
+        self.image_store = image_store
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         super(LoadImage, self).__init__()
 
-    def call(self, image):
+    def _load(self, image):
+        if (self.image_store is not None) and (image in self.image_store):
+            return np.array(self.image_store[image])
         return load_image(image, self.num_channels)
 
+    def _load_cached(self, image):
+        with self._cache_lock:
+            if image in self._cache:
+                self._cache.move_to_end(image)
+                return self._cache[image].copy()
+        image_array = self._load(image)
+        with self._cache_lock:
+            self._cache[image] = image_array
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return image_array.copy()
+
+    def call(self, image):
+        if self.cache_size > 0:
+            return self._load_cached(image)
+        return self._load(image)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_cache'] = OrderedDict()
+        state.pop('_cache_lock')
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
+
 
 class RandomSaturation(Processor):
     """Applies random saturation to an image in RGB space.
@@ -374,14 +427,30 @@ class BlendRandomCroppedBackground(Processor):
     # Arguments
         background_paths: List of strings. Each element of the list is a
             full-path to an image used for cropping a background.
-    """
-    def __init__(self, background_paths):
+        pool_size: Int. If larger than ``0`` decoded backgrounds are kept
+            in a ``BackgroundPool`` of this size instead of being loaded
+            from disk for every image.
+        memory_budget: Int or ``None``. Maximum number of bytes of the
+            pooled backgrounds.
+        preload: Boolean. If ``True`` the pool is filled when built.
+        refresh_period: Int. Number of images after which a fraction of
+            the pool is replaced. If ``0`` the pool is never refreshed.
+        refresh_fraction: Float between [0, 1]. Fraction of the pool
+            replaced at every refresh.
+    """
+    def __init__(self, background_paths, pool_size=0, memory_budget=None,
+                 preload=False, refresh_period=0, refresh_fraction=0.1):
         super(BlendRandomCroppedBackground, self).__init__()
         if not isinstance(background_paths, list):
             raise ValueError('``background_paths`` must be list')
         if len(background_paths) == 0:
             raise ValueError('No paths given in ``background_paths``')
         self.background_paths = background_paths
+        self.background_pool = None
+        if pool_size > 0:
+            self.background_pool = BackgroundPool(
+                background_paths, pool_size, memory_budget, preload,
+                refresh_period, refresh_fraction)
 
     def _random_shape_crop(self, image, shape, buffer=200):
         """Randomly crops an image of the given ``shape``.
@@ -408,6 +477,9 @@ class BlendRandomCroppedBackground(Processor):
         return cropped_image
 
     def call(self, image):
+        if self.background_pool is not None:
+            background = self.background_pool.sample(image.shape[:2])
+            return blend_alpha_channel(image, background)
         random_arg = np.random.randint(0, len(self.background_paths))
         background_path = self.background_paths[random_arg]
         background = load_image(background_path)
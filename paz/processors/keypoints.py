@@ -19,6 +19,9 @@ from ..backend.keypoints import merge_into_mean
 from ..backend.keypoints import filter_keypoints3D
 from ..backend.keypoints import initialize_translation, solve_least_squares
 from ..backend.keypoints import get_bones_length, compute_reprojection_error
+from ..backend.keypoints import compute_reprojection_residuals
+from ..backend.keypoints import compute_reprojection_jacobian
+from ..backend.keypoints import compute_reprojection_sparsity
 from ..backend.keypoints import compute_optimized_pose3D
 from ..datasets.human36m import args_to_mean
 from ..datasets.human36m import h36m_to_coco_joints2D
@@ -321,19 +324,45 @@ class OptimizeHumanPose3D(Processor):
     #Arguments
         solver: library solver
         camera_intrinsics: camera intrinsic parameters
+        jacobian: String or None. If ``None`` the norm of all reprojection
+            errors is minimized with dense finite differences. If
+            ``sparse`` or ``analytic`` the reprojection residuals are
+            minimized and the solver receives either the block diagonal
+            ``jac_sparsity`` or the analytic ``jac`` of the residuals.
 
     #Returns
         keypoints3D, optimized keypoints3D
     """
-    def __init__(self, args_to_joints3D, solver, camera_intrinsics):
+    def __init__(self, args_to_joints3D, solver, camera_intrinsics,
+                 jacobian=None):
         super(OptimizeHumanPose3D, self).__init__()
+        if jacobian not in [None, 'sparse', 'analytic']:
+            raise ValueError('Invalid jacobian', jacobian)
         self.args_to_joints3D = args_to_joints3D
         self.camera_intrinsics = camera_intrinsics
+        self.jacobian = jacobian
         self.filter_keypoints2D = SequentialProcessor(
             [pr.MergeKeypoints2D(args_to_mean),
              pr.FilterKeypoints2D(args_to_mean, h36m_to_coco_joints2D)])
         self.solver = solver
 
+    def _solve(self, initial_joint_translation, joints3D, joints2D):
+        if self.jacobian is None:
+            return solve_least_squares(
+                self.solver, compute_reprojection_error,
+                initial_joint_translation, joints3D, joints2D,
+                self.camera_intrinsics)
+        if self.jacobian == 'sparse':
+            num_persons, num_joints = joints3D.shape[:2]
+            kwargs = {'jac_sparsity': compute_reprojection_sparsity(
+                num_persons, num_joints)}
+        if self.jacobian == 'analytic':
+            kwargs = {'jac': compute_reprojection_jacobian}
+        return solve_least_squares(
+            self.solver, compute_reprojection_residuals,
+            initial_joint_translation, joints3D, joints2D,
+            self.camera_intrinsics, **kwargs)
+
     def call(self, keypoints3D, keypoints2D):
         joints3D = filter_keypoints3D(keypoints3D, self.args_to_joints3D)
         joints2D = self.filter_keypoints2D(keypoints2D)
@@ -343,9 +372,8 @@ class OptimizeHumanPose3D(Processor):
         ratio = length3D / length2D
         initial_joint_translation = initialize_translation(
             root2D, self.camera_intrinsics, ratio)
-        joint_translation = solve_least_squares(
-            self.solver, compute_reprojection_error, initial_joint_translation,
-            joints3D, joints2D, self.camera_intrinsics)
+        joint_translation = self._solve(
+            initial_joint_translation, joints3D, joints2D)
         optimized_poses3D, projection2D = compute_optimized_pose3D(
             keypoints3D, joint_translation, self.camera_intrinsics)
         return joints2D, joints3D, optimized_poses3D, projection2D
@@ -10,6 +10,7 @@ from ..backend.munkres import find_star_in_col
 from ..backend.munkres import find_prime_in_row
 from ..backend.munkres import get_min_value
 from ..backend.munkres import find_smallest_uncovered
+from ..backend.munkres import solve_assignment
 
 from ..backend.standard import pad_matrix
 
@@ -219,3 +220,21 @@ class Munkres(Processor):
         if (events == 0):
             raise UnsolvableMatrix("Matrix cannot be solved!")
         return 4
+
+
+class LinearAssignment(Processor):
+    """Solves the rectangular linear assignment problem. Gives assignments
+    with the same minimum total cost as ``Munkres`` using a vectorized
+    shortest augmenting path algorithm.
+
+    # Returns
+        List of tuples ``(row_arg, col_arg)`` sorted by row.
+    """
+    def __init__(self):
+        super(LinearAssignment, self).__init__()
+
+    def compute(self, cost_matrix):
+        return solve_assignment(cost_matrix)
+
+    def call(self, cost_matrix):
+        return solve_assignment(cost_matrix)
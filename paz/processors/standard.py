@@ -187,16 +187,26 @@ class SequenceWrapper(Processor):
             tensor name as key and the tensor shape of a single sample as value
             e.g. {2: {'classes': [10]}}.
             The values given here are for the labels of the model.
+        dtypes: Dictionary containing tensor names as keys and numpy data
+            types as values e.g. {'input_image': 'uint8'}. Batches of
+            tensors not given here are allocated with ``default_dtype``.
+        default_dtype: Numpy data type of all tensors not given in
+            ``dtypes``.
     """
-    def __init__(self, inputs_info, labels_info):
+    def __init__(self, inputs_info, labels_info, dtypes=None,
+                 default_dtype='float32'):
         if not isinstance(inputs_info, dict):
             raise ValueError('``inputs_info`` must be a dictionary')
         self.inputs_info = inputs_info
         if not isinstance(labels_info, dict):
             raise ValueError('``inputs_info`` must be a dictionary')
         self.labels_info = labels_info
+        self.dtypes = {} if dtypes is None else dtypes
+        self.default_dtype = default_dtype
         self.inputs_name_to_shape = self._extract_name_to_shape(inputs_info)
         self.labels_name_to_shape = self._extract_name_to_shape(labels_info)
+        self.inputs_name_to_dtype = self._extract_name_to_dtype(inputs_info)
+        self.labels_name_to_dtype = self._extract_name_to_dtype(labels_info)
         self.ordered_input_names = self._extract_ordered_names(inputs_info)
         self.ordered_label_names = self._extract_ordered_names(labels_info)
         super(SequenceWrapper, self).__init__()
@@ -208,6 +218,13 @@ class SequenceWrapper(Processor):
                 name_to_shape[key] = value
         return name_to_shape
 
+    def _extract_name_to_dtype(self, info):
+        name_to_dtype = {}
+        for name in self._extract_name_to_shape(info).keys():
+            dtype = self.dtypes.get(name, self.default_dtype)
+            name_to_dtype[name] = np.dtype(dtype)
+        return name_to_dtype
+
     def _extract_ordered_names(self, info):
         arguments = list(info.keys())
         arguments.sort()
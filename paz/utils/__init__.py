@@ -3,3 +3,4 @@ from .logger import build_directory
 from .logger import make_directory
 from .logger import write_weights
 from .documentation import docstring
+from .profiler import Profiler
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import threading
+
+import numpy as np
+
+from ..abstract import processor as processor_module
+
+
+def compute_output_size(outputs):
+    """Computes the number of bytes of all numpy arrays in ``outputs``.
+
+    # Arguments:
+        outputs: Output of a processor. Arrays inside lists, tuples and
+            dictionaries are also counted.
+
+    # Returns
+        Int. Number of bytes.
+    """
+    if isinstance(outputs, np.ndarray):
+        return outputs.nbytes
+    if isinstance(outputs, (list, tuple)):
+        return sum([compute_output_size(output) for output in outputs])
+    if isinstance(outputs, dict):
+        return compute_output_size(list(outputs.values()))
+    return 0
+
+
+class Profiler(object):
+    """Records wall time, number of calls and output array sizes of every
+    ``Processor`` and ``SequentialProcessor`` called while it is enabled.
+    Nested processors are recorded with the names of all their parent
+    processors e.g. ``AugmentDetection/ControlMap-LoadImage/LoadImage``.
+    Processors are only instrumented while a profiler is enabled.
+    Calls from different threads are nested separately.
+
+    # Arguments:
+        record_trace: Boolean. If ``True`` every call is also stored as an
+            event that can be written as a Chrome trace.
+        max_events: Int. Maximum number of stored trace events.
+
+    # Properties
+        records: Dictionary with processor names as keys and dictionaries
+            with ``calls``, ``total_time``, ``self_time``, ``min_time``,
+            ``max_time`` and ``output_bytes`` as values. Times are given
+            in seconds.
+        events: List of trace events.
+
+    # Methods
+        enable()
+        disable()
+        reset()
+        summary()
+        to_dict()
+        write_json()
+        write_chrome_trace()
+
+    # Example
+    ```python
+    from paz.utils import Profiler
+
+    with Profiler() as profiler:
+        pipeline(image)
+    profiler.summary()
+    ```
+    """
+    def __init__(self, record_trace=True, max_events=100000):
+        self.record_trace = record_trace
+        self.max_events = max_events
+        self._previous_profiler = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Removes all records and events."""
+        self.records = {}
+        self.events = []
+        # each thread nests its own processor calls
+        self._stacks = threading.local()
+        self._start_time = time.perf_counter()
+
+    def enable(self):
+        """Starts instrumenting all processor calls."""
+        self._previous_profiler = processor_module.PROFILER
+        processor_module.PROFILER = self
+
+    def disable(self):
+        """Stops instrumenting processor calls."""
+        processor_module.PROFILER = self._previous_profiler
+        self._previous_profiler = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.disable()
+
+    def profile(self, processor, function, *args, **kwargs):
+        """Calls ``function`` and records it under the name of ``processor``.
+
+        # Arguments:
+            processor: Instance of ``Processor`` or ``SequentialProcessor``.
+            function: Callable to be profiled.
+            args: Positional arguments of ``function``.
+            kwargs: Keyword arguments of ``function``.
+
+        # Returns
+            Outputs of ``function``.
+        """
+        # processors not initializing ``Processor`` have no ``name``
+        name = getattr(processor, 'name', processor.__class__.__name__)
+        names, child_times = self._get_stacks()
+        names.append(name)
+        child_times.append(0.0)
+        start_time = time.perf_counter()
+        try:
+            outputs = function(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start_time
+            name = '/'.join(names)
+            names.pop()
+            child_time = child_times.pop()
+            if child_times:
+                child_times[-1] = child_times[-1] + duration
+        output_bytes = compute_output_size(outputs)
+        with self._lock:
+            self._record(name, start_time, duration, child_time, output_bytes)
+        return outputs
+
+    def _get_stacks(self):
+        if not hasattr(self._stacks, 'names'):
+            self._stacks.names = []
+            self._stacks.child_times = []
+        return self._stacks.names, self._stacks.child_times
+
+    def _record(self, name, start_time, duration, child_time, output_bytes):
+        if name not in self.records:
+            self.records[name] = {
+                'calls': 0, 'total_time': 0.0, 'self_time': 0.0,
+                'min_time': np.inf, 'max_time': 0.0, 'output_bytes': 0}
+        record = self.records[name]
+        record['calls'] = record['calls'] + 1
+        record['total_time'] = record['total_time'] + duration
+        record['self_time'] = record['self_time'] + duration - child_time
+        record['min_time'] = min(record['min_time'], duration)
+        record['max_time'] = max(record['max_time'], duration)
+        record['output_bytes'] = record['output_bytes'] + output_bytes
+        if self.record_trace and (len(self.events) < self.max_events):
+            self.events.append({
+                'name': name.split('/')[-1], 'cat': name, 'ph': 'X',
+                'ts': (start_time - self._start_time) * 1e6,
+                'dur': duration * 1e6, 'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': {'output_bytes': output_bytes}})
+
+    def to_dict(self):
+        """Returns records sorted by total time.
+
+        # Returns
+            List of dictionaries with the key ``name`` and all record keys.
+        """
+        records = []
+        for name, record in self.records.items():
+            record = dict(record, name=name)
+            record['mean_time'] = record['total_time'] / record['calls']
+            records.append(record)
+        return sorted(records, key=lambda record: -record['total_time'])
+
+    def summary(self, print_fn=print, max_name_length=60):
+        """Prints a table with the records sorted by total time.
+
+        # Arguments:
+            print_fn: Function used to print each line.
+            max_name_length: Int. Processor names longer than this value
+                are shortened from the left.
+        """
+        header = '%-*s %8s %12s %12s %12s %12s' % (
+            max_name_length, 'Processor', 'Calls', 'Total [ms]',
+            'Self [ms]', 'Mean [ms]', 'Output [KB]')
+        print_fn(header)
+        print_fn('-' * len(header))
+        for record in self.to_dict():
+            name = record['name']
+            if len(name) > max_name_length:
+                name = '...' + name[-(max_name_length - 3):]
+            print_fn('%-*s %8d %12.3f %12.3f %12.3f %12.1f' % (
+                max_name_length, name, record['calls'],
+                record['total_time'] * 1e3, record['self_time'] * 1e3,
+                record['mean_time'] * 1e3,
+                record['output_bytes'] / record['calls'] / 1024.0))
+
+    def write_json(self, filepath, indent=4):
+        """Writes the records as a json file.
+
+        # Arguments:
+            filepath: String. Path of the json file.
+            indent: Number of spaces between keys.
+        """
+        with open(filepath, 'w') as filedata:
+            json.dump(self.to_dict(), filedata, indent=indent)
+
+    def write_chrome_trace(self, filepath):
+        """Writes the trace events as a json file that can be opened in
+        ``chrome://tracing`` or in Perfetto.
+
+        # Arguments:
+            filepath: String. Path of the json file.
+        """
+        with open(filepath, 'w') as filedata:
+            json.dump({'traceEvents': self.events,
+                       'displayTimeUnit': 'ms'}, filedata)
@@ -0,0 +1,110 @@
+import os
+import mmap
+import pickle
+
+import pytest
+import numpy as np
+
+from paz.abstract import ColumnarDataset, ProcessingSequence
+from paz.abstract import SequentialProcessor
+from paz import processors as pr
+
+
+@pytest.fixture
+def samples():
+    return [{'image': 'ümlaut_%d.jpg' % arg,
+             'boxes': np.random.rand(arg, 5),
+             'class_arg': arg} for arg in range(5)]
+
+
+def is_memory_mapped(array):
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def assert_same_samples(samples, dataset):
+    assert len(samples) == len(dataset)
+    for sample, dataset_sample in zip(samples, dataset):
+        assert set(sample.keys()) == set(dataset_sample.keys())
+        for key, value in sample.items():
+            if isinstance(value, np.ndarray):
+                assert np.array_equal(value, dataset_sample[key])
+            else:
+                assert value == dataset_sample[key]
+
+
+def test_from_samples(samples):
+    dataset = ColumnarDataset.from_samples(samples)
+    assert_same_samples(samples, dataset)
+    assert dataset.columns['boxes'].shape == (10, 5)
+    assert dataset.column_types == {
+        'image': 'string', 'boxes': 'array', 'class_arg': 'scalar'}
+
+
+def test_indexing(samples):
+    dataset = ColumnarDataset.from_samples(samples)
+    assert_same_samples(samples[-1:], [dataset[-1]])
+    assert_same_samples(samples[1:4], dataset[1:4])
+    assert_same_samples(samples[3:10], dataset[3:10])
+    with pytest.raises(IndexError):
+        dataset[5]
+
+
+def test_different_keys(samples):
+    samples[2].pop('class_arg')
+    with pytest.raises(ValueError):
+        ColumnarDataset.from_samples(samples)
+
+
+def test_add(samples):
+    dataset = (ColumnarDataset.from_samples(samples[:2]) +
+               ColumnarDataset.from_samples(samples[2:]))
+    assert_same_samples(samples, dataset)
+
+
+def test_save_and_load(tmpdir, samples):
+    directory = os.path.join(str(tmpdir), 'dataset')
+    ColumnarDataset.from_samples(samples).save(directory)
+    dataset = ColumnarDataset.load(directory)
+    assert_same_samples(samples, dataset)
+    assert is_memory_mapped(dataset.columns['boxes'])
+    assert is_memory_mapped(dataset[3]['boxes'])
+    assert not dataset[3]['boxes'].flags.writeable
+    dataset = ColumnarDataset.load(directory, False)
+    assert_same_samples(samples, dataset)
+    assert not is_memory_mapped(dataset[3]['boxes'])
+
+
+def test_pickle_memory_mapped(tmpdir, samples):
+    directory = os.path.join(str(tmpdir), 'dataset')
+    ColumnarDataset.from_samples(samples).save(directory)
+    dataset = ColumnarDataset.load(directory)
+    serialized_dataset = pickle.dumps(dataset)
+    assert b'.jpg' not in serialized_dataset
+    assert_same_samples(samples, pickle.loads(serialized_dataset))
+    dataset = ColumnarDataset.load(directory, mmap=False)
+    assert_same_samples(samples, pickle.loads(pickle.dumps(dataset)))
+
+
+def test_ProcessingSequence(tmpdir):
+    samples = [{'value': np.full((3, 2), arg, dtype=float)}
+               for arg in range(7)]
+    directory = os.path.join(str(tmpdir), 'dataset')
+    ColumnarDataset.from_samples(samples).save(directory)
+    pipeline = SequentialProcessor()
+    pipeline.add(pr.UnpackDictionary(['value']))
+    pipeline.add(pr.SequenceWrapper({0: {'value': [3, 2]}},
+                                    {0: {'label': [3, 2]}}))
+    sequence = ProcessingSequence(pipeline, 4, samples)
+    columnar_sequence = ProcessingSequence(
+        pipeline, 4, ColumnarDataset.load(directory), num_workers=2)
+    assert len(sequence) == len(columnar_sequence)
+    for batch_index in range(len(sequence)):
+        inputs, labels = sequence[batch_index]
+        columnar_inputs, columnar_labels = columnar_sequence[batch_index]
+        assert np.allclose(inputs['value'], columnar_inputs['value'])
+        assert np.allclose(labels['label'], columnar_labels['label'])
+    columnar_sequence.close()
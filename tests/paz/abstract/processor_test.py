@@ -197,3 +197,63 @@ def test_copy_with_controlmap_using_3_channels_plus():
     assert len(values) == 2
     assert np.allclose(values[0], A_random_values + B_random_values)
     assert np.allclose(values[1], A_random_values)
+
+
+class PipelineWithNestedControlMaps(SequentialProcessor):
+    def __init__(self):
+        super(PipelineWithNestedControlMaps, self).__init__()
+        self.add(lambda a, b: (a, b))
+        self.add(pr.ControlMap(TransformA(), [0], [0]))
+        self.add(pr.ControlMap(TransformA(), [0], [0]))
+        self.add(pr.ControlMap(SequentialProcessor([
+            TransformB(), pr.ControlMap(pr.Copy(), [1], [2], keep={0: 0})]),
+            [0, 1], [1, 0]))
+        self.add(pr.ControlMap(SumTwoValues(), [0, 1], [0], keep={1: 1}))
+
+
+class AddOne(Processor):
+    def __init__(self):
+        super(AddOne, self).__init__()
+
+    def call(self, x):
+        return x + 1.0
+
+
+class PipelineWithConsecutiveExits(SequentialProcessor):
+    def __init__(self):
+        super(PipelineWithConsecutiveExits, self).__init__()
+        self.add(pr.ControlMap(SequentialProcessor([
+            AddOne(), pr.ControlMap(AddOne(), [0], [0])]), [1], [1]))
+        self.add(pr.ControlMap(AddOne(), [0], [0]))
+
+
+@pytest.mark.parametrize('pipeline_class', [
+    PipelineWithTwoChannels, PipelineWithThreeChannels,
+    PipelineWithThreeChannelsPlus, PipelineWithNestedControlMaps,
+    PipelineWithConsecutiveExits])
+def test_compiled_sequential_processor(pipeline_class):
+    A_random_values = np.random.random((16, 16))
+    B_random_values = np.random.random((16, 16))
+    inputs = [A_random_values]
+    if pipeline_class is not PipelineWithTwoChannels:
+        inputs.append(B_random_values)
+    values = pipeline_class()(*inputs)
+    compiled_pipeline = pipeline_class().compile()
+    for call_arg in range(3):
+        compiled_values = compiled_pipeline(*inputs)
+        assert len(values) == len(compiled_values)
+        for value, compiled_value in zip(values, compiled_values):
+            assert np.allclose(value, compiled_value)
+
+
+def test_compiled_sequential_processor_kwargs():
+    transformB = TransformB().compile()
+    values = transformB(boxes=1.0, image=2.0)
+    assert np.allclose([2.0, -4.0], values)
+
+
+def test_compiled_sequential_processor_is_reset_by_add():
+    pipeline = TransformA().compile()
+    assert np.allclose(pipeline(255.0), 1.0)
+    pipeline.add(ProcessorC())
+    assert np.allclose(pipeline(255.0 * 255.0), 1.0)
@@ -28,3 +28,69 @@ for _ in range(10):
     batch = sequence.__getitem__(0)
     value_A, value_B = batch[0]['value_A'][0], batch[1]['value_B'][0]
     print(value_B)
+
+
+class AddNoise(Processor):
+    def __init__(self):
+        super(AddNoise, self).__init__()
+
+    def call(self, value):
+        return value + np.random.rand(*value.shape)
+
+
+def build_noise_pipeline():
+    pipeline = SequentialProcessor()
+    pipeline.add(pr.UnpackDictionary(['value']))
+    pipeline.add(AddNoise())
+    pipeline.add(pr.SequenceWrapper({0: {'value': [3, 2]}},
+                                    {0: {'label': [3, 2]}}))
+    return pipeline
+
+
+def test_ProcessingSequence_workers_match_serial():
+    data = [{'value': np.full((3, 2), arg, dtype=float)} for arg in range(7)]
+    serial = ProcessingSequence(build_noise_pipeline(), 4, data, seed=7)
+    workers = ProcessingSequence(
+        build_noise_pipeline(), 4, data, num_workers=2, seed=7)
+    for batch_index in range(len(serial)):
+        serial_inputs, serial_labels = serial[batch_index]
+        worker_inputs, worker_labels = workers[batch_index]
+        assert np.allclose(serial_inputs['value'], worker_inputs['value'])
+        assert np.allclose(serial_labels['label'], worker_labels['label'])
+    # last batch is only partially filled
+    assert np.allclose(worker_inputs['value'][3:], 0.0)
+    workers.close()
+
+
+def test_ProcessingSequence_seed_changes_with_epoch():
+    data = [{'value': np.zeros((3, 2))} for arg in range(4)]
+    sequence = ProcessingSequence(build_noise_pipeline(), 4, data, seed=7)
+    inputs_A = sequence[0][0]['value']
+    assert np.allclose(inputs_A, sequence[0][0]['value'])
+    sequence.on_epoch_end()
+    assert not np.allclose(inputs_A, sequence[0][0]['value'])
+
+
+def test_ProcessingSequence_dtypes():
+    pipeline = build_noise_pipeline()
+    pipeline.pop()
+    pipeline.add(pr.SequenceWrapper({0: {'value': [3, 2]}},
+                                    {0: {'label': [3, 2]}},
+                                    {'value': 'uint8'}))
+    data = [{'value': np.zeros((3, 2))} for arg in range(2)]
+    inputs, labels = ProcessingSequence(pipeline, 2, data)[0]
+    assert inputs['value'].dtype == np.uint8
+    assert labels['label'].dtype == np.float32
+
+
+def test_ProcessingSequence_buffer_ring():
+    data = [{'value': np.ones((3, 2))} for arg in range(5)]
+    sequence = ProcessingSequence(
+        build_noise_pipeline(), 2, data, num_buffers=2)
+    inputs_A = sequence[0][0]['value']
+    inputs_B = sequence[1][0]['value']
+    inputs_C = sequence[2][0]['value']
+    assert inputs_A is inputs_C
+    assert inputs_A is not inputs_B
+    assert np.all(inputs_C[0] >= 1.0)
+    assert np.allclose(inputs_C[1], 0.0)
@@ -8,13 +8,21 @@ from paz.backend.boxes import to_corner_form
 from paz.backend.boxes import to_center_form
 from paz.backend.boxes import encode
 from paz.backend.boxes import match
+from paz.backend.boxes import match_batch
+from paz.backend.boxes import to_sparse_boxes
+from paz.backend.boxes import to_one_hot
+from paz.backend.boxes import compute_prior_ious
 from paz.backend.boxes import decode
 from paz.backend.boxes import flip_left_right
 from paz.backend.boxes import to_image_coordinates
 from paz.backend.boxes import to_normalized_coordinates
 from paz.models.detection.utils import create_prior_boxes
+from paz.models.detection import utils as detection_utils
 from paz.backend.boxes import extract_bounding_box_corners
 from paz.backend.boxes import nms_per_class
+from paz.backend.boxes import nms_per_class_batched
+from paz.backend.boxes import nms_per_class_batch
+from paz.backend.boxes import nms_per_class_args
 from paz.backend.boxes import merge_nms_box_with_class
 from paz.models import SSD300
 
@@ -198,6 +206,65 @@ def test_match_box(boxes_with_label, target_unique_matches):
                           np.unique(matched_boxes[:, :-1], axis=0))
 
 
+def test_match_chunks_and_dtype(boxes_with_label):
+    prior_boxes = create_prior_boxes('VOC')
+    matched_boxes = match(boxes_with_label.copy(), prior_boxes)
+    chunked_boxes = match(boxes_with_label.copy(), prior_boxes, chunk_size=1)
+    assert np.array_equal(matched_boxes, chunked_boxes)
+    float32_boxes = match(boxes_with_label.copy(), prior_boxes, 0.5,
+                          np.float32)
+    assert np.array_equal(matched_boxes, float32_boxes)
+
+
+def test_match_batch(boxes_with_label):
+    prior_boxes = create_prior_boxes('VOC')
+    batch_boxes = [boxes_with_label, np.zeros((0, 5)), boxes_with_label[:1]]
+    matched_boxes = match_batch(batch_boxes, prior_boxes)
+    assert matched_boxes.shape == (3, len(prior_boxes), 5)
+    assert np.array_equal(
+        matched_boxes[0], match(boxes_with_label.copy(), prior_boxes))
+    assert np.all(matched_boxes[1] == 0)
+    assert np.array_equal(
+        matched_boxes[2], match(boxes_with_label[:1].copy(), prior_boxes))
+
+
+def test_match_batch_random_samples():
+    prior_boxes = create_prior_boxes('VOC')
+    batch_boxes = []
+    for sample_arg in range(50):
+        num_boxes = np.random.randint(1, 6)
+        x_min, y_min = np.random.rand(2, num_boxes) * 0.7
+        width, height = np.random.rand(2, num_boxes) * 0.3 + 0.01
+        class_args = np.random.randint(1, 21, num_boxes)
+        batch_boxes.append(np.stack([x_min, y_min, x_min + width,
+                                     y_min + height, class_args], axis=1))
+    matched_boxes = match_batch(batch_boxes, prior_boxes)
+    for boxes, sample_matches in zip(batch_boxes, matched_boxes):
+        assert np.array_equal(sample_matches, match(boxes, prior_boxes))
+
+
+def test_compute_prior_ious(boxes_with_label):
+    prior_boxes = to_corner_form(create_prior_boxes('VOC'))
+    ious = compute_prior_ious(boxes_with_label[:, :4], prior_boxes)
+    assert np.allclose(ious, compute_ious(boxes_with_label, prior_boxes))
+
+
+def test_to_one_hot():
+    one_hot_vectors = to_one_hot(np.array([0, 2, 1]), 3)
+    assert np.array_equal(one_hot_vectors, np.eye(3)[[0, 2, 1]])
+
+
+def test_to_sparse_boxes():
+    boxes = np.zeros((6, 5))
+    boxes[:, :4] = np.arange(24).reshape(6, 4)
+    boxes[[1, 4], 4] = [3, 7]
+    sparse_boxes = to_sparse_boxes(boxes, 3)
+    assert sparse_boxes.shape == (3, 6)
+    assert np.array_equal(sparse_boxes[:, 0], [1, 4, -1])
+    assert np.array_equal(sparse_boxes[:2, 1:], boxes[[1, 4]])
+    assert np.all(sparse_boxes[2, 1:] == 0)
+
+
 def test_to_encode(boxes_with_label):
     priors = create_prior_boxes('VOC')
     matches = match(boxes_with_label, priors)
@@ -221,6 +288,45 @@ def test_prior_boxes(target_prior_boxes):
     assert np.all(prior_boxes[:10].astype('float32') == target_prior_boxes)
 
 
+@pytest.mark.parametrize(('configuration_name, num_prior_boxes'),
+                         [('VOC', 8732), ('COCO', 24564)])
+def test_prior_boxes_shape(configuration_name, num_prior_boxes):
+    prior_boxes = create_prior_boxes(configuration_name)
+    assert prior_boxes.shape == (num_prior_boxes, 4)
+
+
+def test_prior_boxes_cache_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv('KERAS_HOME', str(tmp_path))
+    monkeypatch.setattr(detection_utils, 'PRIOR_BOXES', {})
+    prior_boxes = create_prior_boxes('VOC', cache_to_disk=True)
+    filepaths = list((tmp_path / 'paz' / 'prior_boxes').glob('VOC-*.npy'))
+    assert len(filepaths) == 1
+    assert np.array_equal(np.load(filepaths[0]), prior_boxes)
+    prior_boxes[:] = 0.0
+    assert np.array_equal(create_prior_boxes('VOC'), np.load(filepaths[0]))
+
+
+def test_prior_boxes_cache_key_changes_with_configuration(
+        tmp_path, monkeypatch):
+    monkeypatch.setenv('KERAS_HOME', str(tmp_path))
+    monkeypatch.setattr(detection_utils, 'PRIOR_BOXES', {})
+    get_configuration = detection_utils.get_prior_box_configuration
+    prior_boxes = create_prior_boxes('VOC', cache_to_disk=True)
+
+    def get_prior_box_configuration(configuration_name='VOC'):
+        configuration = get_configuration(configuration_name)
+        configuration['max_sizes'] = configuration['min_sizes']
+        return configuration
+
+    monkeypatch.setattr(detection_utils, 'get_prior_box_configuration',
+                        get_prior_box_configuration)
+    monkeypatch.setattr(detection_utils, 'PRIOR_BOXES', {})
+    changed_prior_boxes = create_prior_boxes('VOC', cache_to_disk=True)
+    filepaths = list((tmp_path / 'paz' / 'prior_boxes').glob('VOC-*.npy'))
+    assert len(filepaths) == 2
+    assert not np.array_equal(prior_boxes, changed_prior_boxes)
+
+
 def test_flip_left_right_pass_by_value(boxes_with_label):
     initial_boxes_with_label = boxes_with_label.copy()
     flip_left_right(boxes_with_label, 1.0)
@@ -278,6 +384,50 @@ def test_nms_per_class_and_merge_box(
     assert np.all(retained_scores == row_wise_score_sum), (
         'Other scores are not all zeros')
 
+
+@pytest.fixture
+def random_box_data():
+    random_state = np.random.RandomState(777)
+    prior_boxes = to_corner_form(create_prior_boxes('VOC'))
+    class_predictions = random_state.rand(len(prior_boxes), 5)
+    return np.concatenate((prior_boxes, class_predictions), axis=1)
+
+
+@pytest.mark.parametrize(('nms_thresh, epsilon, top_k'),
+                         [(0.45, 0.01, 200),
+                          (0.45, 0.9, 200),
+                          (0.75, 0.5, 50),
+                          (0.50, 1.1, 200)])
+def test_nms_per_class_batched(random_box_data, nms_thresh, epsilon, top_k):
+    nms_boxes, class_labels = nms_per_class(
+        random_box_data, nms_thresh, epsilon, top_k)
+    batched_nms_boxes, batched_class_labels = nms_per_class_batched(
+        random_box_data, nms_thresh, epsilon, top_k)
+    assert batched_nms_boxes.shape == nms_boxes.shape
+    assert np.all(batched_nms_boxes == nms_boxes)
+    assert np.all(batched_class_labels == class_labels)
+
+
+def test_nms_per_class_args(random_box_data):
+    nms_boxes, class_labels = nms_per_class(random_box_data, 0.45, 0.3, 100)
+    box_args, arg_class_labels = nms_per_class_args(
+        random_box_data, 0.45, 0.3, 100)
+    assert np.all(random_box_data[box_args] == nms_boxes)
+    assert np.all(arg_class_labels == class_labels)
+
+
+def test_nms_per_class_batch(random_box_data):
+    batch_box_data = np.stack([random_box_data, random_box_data[::-1]])
+    batch_box_data[1, :, 4:] = batch_box_data[1, :, 4:] ** 2
+    outputs = nms_per_class_batch(batch_box_data, 0.45, 0.3, 100)
+    assert len(outputs) == len(batch_box_data)
+    for box_data, (batched_nms_boxes, batched_class_labels) in zip(
+            batch_box_data, outputs):
+        nms_boxes, class_labels = nms_per_class(box_data, 0.45, 0.3, 100)
+        assert np.all(batched_nms_boxes == nms_boxes)
+        assert np.all(batched_class_labels == class_labels)
+
+
 # def test_data_loader_check():
 #     voc_root = './examples/object_detection/data/VOCdevkit/'
 #     data_names = [['VOC2007', 'VOC2012'], 'VOC2007']
@@ -299,3 +449,10 @@ def test_nms_per_class_and_merge_box(
 #         boxes_count.append(len(boxes))
 #     assert image_count == target_image_count
 #     assert target_box_count == boxes_count
+
+
+def test_to_sparse_boxes_with_too_many_positives():
+    boxes = np.zeros((6, 5))
+    boxes[[0, 2, 3, 5], 4] = 1
+    with pytest.raises(ValueError):
+        to_sparse_boxes(boxes, 3)
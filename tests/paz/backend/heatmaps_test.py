@@ -1,5 +1,8 @@
 import numpy as np
 from paz.backend import heatmaps
+from paz.backend.image import resize_image
+from paz.backend.standard import compare_vertical_neighbours
+from paz.backend.standard import compare_horizontal_neighbours
 import pytest
 
 
@@ -85,3 +88,65 @@ def test_get_keypoints_coordinates(keypoint_indices, output,
 def test_get_valid_detections(detections, valid_detections):
     estimated_detection = heatmaps.get_valid_detections(detections, 0.2)
     assert np.allclose(estimated_detection, valid_detections)
+
+
+@pytest.mark.parametrize('pool_size', [3, 4])
+def test_max_filter_heatmaps(pool_size):
+    values = np.random.RandomState(0).normal(size=(2, 3, 7, 6))
+    maximums = heatmaps.max_filter_heatmaps(values, pool_size)
+    pad_before = (pool_size - 1) // 2
+    pad_after = pool_size - 1 - pad_before
+    padding = [(0, 0), (0, 0)] + [(pad_before, pad_after)] * 2
+    padded = np.pad(values, padding, constant_values=-np.inf)
+    for y in range(7):
+        for x in range(6):
+            window = padded[..., y:y + pool_size, x:x + pool_size]
+            assert np.allclose(maximums[..., y, x], window.max(axis=(2, 3)))
+
+
+def test_suppress_non_maximum_heatmaps():
+    values = np.zeros((1, 1, 5, 5))
+    values[0, 0, 1, 1], values[0, 0, 1, 2], values[0, 0, 4, 4] = 3, 2, 1
+    suppressed = heatmaps.suppress_non_maximum_heatmaps(values)
+    assert np.array_equal(np.argwhere(suppressed), [[0, 0, 1, 1],
+                                                    [0, 0, 4, 4]])
+
+
+def test_select_top_k_keypoints():
+    values = np.array([[[0.0, 2.0, 1.0, 2.0, 0.0, 0.0, 3.0]]])
+    top_k_values, top_k_indices = heatmaps.select_top_k_keypoints(values, 5)
+    assert np.array_equal(top_k_values, [[[3.0, 2.0, 2.0, 1.0, 0.0]]])
+    assert np.array_equal(top_k_indices, [[[6, 1, 3, 2, 0]]])
+
+
+def test_shift_to_larger_neighbours():
+    values = np.random.RandomState(0).rand(3, 6, 5)
+    keypoint_args = np.array([0, 1, 2, 2])
+    x, y = np.array([0.0, 5.0, 2.0, 3.5]), np.array([4.0, 0.0, 2.0, 1.5])
+    shifted_x, shifted_y = heatmaps.shift_to_larger_neighbours(
+        values, keypoint_args, x, y)
+    for arg, keypoint_arg in enumerate(keypoint_args):
+        heatmap = values[keypoint_arg]
+        target_y = compare_vertical_neighbours(x[arg], y[arg], heatmap)
+        target_x = compare_horizontal_neighbours(x[arg], target_y, heatmap)
+        assert shifted_x[arg] == target_x
+        assert shifted_y[arg] == target_y
+
+
+def test_resize_heatmaps():
+    values = np.random.RandomState(0).rand(2, 3, 4, 6).astype(np.float32)
+    resized = heatmaps.resize_heatmaps(values, (12, 8))
+    assert resized.shape == (2, 3, 8, 12)
+    for sample_arg in range(2):
+        for heatmap_arg in range(3):
+            target = resize_image(values[sample_arg, heatmap_arg], (12, 8))
+            assert np.array_equal(resized[sample_arg, heatmap_arg], target)
+
+
+@pytest.mark.parametrize('max_channels', [4, 512])
+def test_resize_heatmaps_max_channels(max_channels):
+    values = np.random.RandomState(0).rand(2, 17, 8, 6).astype(np.float32)
+    resized = heatmaps.resize_heatmaps(values, (12, 16))
+    chunk_resized = heatmaps.resize_heatmaps(values, (12, 16), max_channels)
+    assert chunk_resized.shape == (2, 17, 16, 12)
+    assert np.allclose(resized, chunk_resized, atol=1e-6)
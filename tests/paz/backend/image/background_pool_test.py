@@ -0,0 +1,87 @@
+import os
+import pickle
+
+import pytest
+import numpy as np
+
+from paz.backend.image import write_image, BackgroundPool
+
+
+@pytest.fixture
+def background_paths(tmpdir):
+    background_paths = []
+    for background_arg in range(6):
+        background = np.full((40, 50, 3), background_arg, dtype=np.uint8)
+        path = os.path.join(str(tmpdir), 'background_%d.png' % background_arg)
+        write_image(path, background)
+        background_paths.append(path)
+    return background_paths
+
+
+def test_lazy_pool(background_paths):
+    pool = BackgroundPool(background_paths, pool_size=3)
+    assert len(pool) == 0
+    crops = [pool.sample((10, 20)) for _ in range(10)]
+    assert len(pool) == 3
+    for crop in crops:
+        assert crop.shape == (10, 20, 3)
+        assert not crop.flags.owndata
+        assert not crop.flags.writeable
+    # crops are only taken from the three pooled backgrounds
+    assert len(set([crop[0, 0, 0] for crop in crops])) <= 3
+
+
+def test_preload_and_memory_budget(background_paths):
+    pool = BackgroundPool(
+        background_paths, pool_size=6, memory_budget=2 * 40 * 50 * 3,
+        preload=True)
+    assert len(pool) == 2
+    assert pool.num_bytes == 2 * 40 * 50 * 3
+
+
+def test_upscale_once(background_paths):
+    pool = BackgroundPool(background_paths, pool_size=1, buffer=10)
+    crop = pool.sample((45, 60))
+    assert crop.shape == (45, 60, 3)
+    assert pool.num_bytes == 55 * 70 * 3
+    pool.sample((45, 60))
+    assert pool.num_bytes == 55 * 70 * 3
+
+
+def test_refresh(background_paths):
+    pool = BackgroundPool(background_paths, pool_size=4, preload=True)
+    path_args = set(pool._path_args)
+    for _ in range(4):
+        pool.sample((10, 10))
+    assert pool._path_args == path_args
+    pool.refresh(fraction=1.0)
+    assert len(pool) == 4
+    assert pool.num_bytes == 4 * 40 * 50 * 3
+
+
+def test_periodic_refresh_replaces_backgrounds(background_paths):
+    pool = BackgroundPool(background_paths, pool_size=4, refresh_period=5,
+                          refresh_fraction=0.5)
+    for _ in range(4):
+        pool.sample((10, 10))
+    path_args = set(pool._path_args)
+    assert len(path_args) == 4
+    # the fifth sample removes two backgrounds and adds a new one
+    pool.sample((10, 10))
+    assert len(pool) == 3
+    assert len(path_args.difference(pool._path_args)) == 2
+    kept_args = path_args.intersection(pool._path_args)
+    assert len(kept_args) == 2
+    pool.sample((10, 10))
+    assert len(pool) == 4
+    # the two backgrounds never pooled before replace the removed ones
+    new_args = set(range(6)).difference(path_args)
+    assert pool._path_args == kept_args.union(new_args)
+    assert pool.num_bytes == 4 * 40 * 50 * 3
+
+
+def test_pickle(background_paths):
+    pool = BackgroundPool(background_paths, pool_size=2, preload=True)
+    serialized_pool = pickle.dumps(pool)
+    assert len(serialized_pool) < 2000
+    assert len(pickle.loads(serialized_pool)) == 2
@@ -0,0 +1,51 @@
+import os
+import pickle
+
+import pytest
+import numpy as np
+
+from paz.backend.image import (
+    write_image, load_image, write_image_store, ImageStore)
+
+
+@pytest.fixture
+def image_paths(tmpdir):
+    image_paths = []
+    for image_arg, (H, W) in enumerate([(12, 20), (8, 8), (30, 10)]):
+        image = np.random.randint(0, 256, (H, W, 3), dtype=np.uint8)
+        image_path = os.path.join(str(tmpdir), 'image_%d.png' % image_arg)
+        write_image(image_path, image)
+        image_paths.append(image_path)
+    return image_paths
+
+
+@pytest.mark.parametrize('num_channels', [1, 3])
+def test_write_image_store(tmpdir, image_paths, num_channels):
+    directory = os.path.join(str(tmpdir), 'store')
+    image_store = write_image_store(
+        directory, image_paths + image_paths[:1], num_channels)
+    assert len(image_store) == 3
+    for image_path in image_paths:
+        image = load_image(image_path, num_channels)
+        assert image_path in image_store
+        assert np.array_equal(image_store[image_path], image)
+    assert not image_store[image_paths[0]].flags.writeable
+    assert 'missing.png' not in image_store
+
+
+def test_write_image_store_with_size(tmpdir, image_paths):
+    directory = os.path.join(str(tmpdir), 'store')
+    image_store = write_image_store(directory, image_paths, size=(16, 8))
+    assert image_store.size == [16, 8]
+    for image_path in image_paths:
+        assert image_store[image_path].shape == (8, 16, 3)
+
+
+def test_pickle_image_store(tmpdir, image_paths):
+    directory = os.path.join(str(tmpdir), 'store')
+    write_image_store(directory, image_paths)
+    serialized_image_store = pickle.dumps(ImageStore(directory))
+    assert len(serialized_image_store) < 1000
+    image_store = pickle.loads(serialized_image_store)
+    image = load_image(image_paths[2])
+    assert np.array_equal(image_store[image_paths[2]], image)
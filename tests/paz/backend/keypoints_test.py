@@ -4,6 +4,14 @@ from paz.backend.keypoints import rotate_point2D
 from paz.backend.keypoints import transform_keypoint
 from paz.backend.keypoints import add_offset_to_point
 from paz.backend.keypoints import rotate_keypoints3D
+from paz.backend.keypoints import get_bones_length
+from paz.backend.keypoints import compute_reprojection_error
+from paz.backend.keypoints import compute_reprojection_residuals
+from paz.backend.keypoints import compute_reprojection_jacobian
+from paz.backend.keypoints import compute_reprojection_sparsity
+from paz.backend.keypoints import compute_optimized_pose3D
+from paz.backend.keypoints import human_pose3D_to_pose6D
+from paz.backend.keypoints import human_poses3D_to_poses6D
 
 
 @pytest.fixture(params=[[2, 1]])
@@ -71,4 +79,87 @@ def test_add_offset_to_point(keypoint, offset, shifted_keypoint):
 def test_rotate_keypoints(rotation_matrix, keypoint3D, rotated_keypoint):
     calculated_rotated_keypoint = rotate_keypoints3D(
         np.expand_dims(rotation_matrix, 0), keypoint3D)
-    assert np.allclose(rotated_keypoint, calculated_rotated_keypoint)
\ No newline at end of file
+    assert np.allclose(rotated_keypoint, calculated_rotated_keypoint)
+
+
+@pytest.fixture
+def camera_intrinsics():
+    return np.array([[500.0, 0.0, 320.0],
+                     [0.0, 450.0, 240.0],
+                     [0.0, 0.0, 1.0]])
+
+
+@pytest.fixture
+def persons():
+    random_state = np.random.RandomState(0)
+    keypoints3D = random_state.randn(3, 16, 3) * 300
+    keypoints2D = random_state.rand(3, 32) * 480
+    translations = np.ravel([[100.0, -50.0, 4000.0],
+                             [-900.0, 30.0, 6000.0],
+                             [500.0, 200.0, 5000.0]])
+    return translations, keypoints3D, keypoints2D
+
+
+def test_get_bones_length():
+    start_joints, end_joints = np.array([0, 1]), np.array([1, 2])
+    poses2D = np.zeros((2, 16, 2))
+    poses2D[:, 1], poses2D[:, 2] = [3.0, 4.0], [3.0, 10.0]
+    poses2D[1] = 2 * poses2D[1]
+    poses3D = np.zeros((2, 16, 3))
+    poses3D[:, 1], poses3D[:, 2] = [0.0, 0.0, 2.0], [1.0, 0.0, 2.0]
+    lengths2D, lengths3D = get_bones_length(
+        np.reshape(poses2D, (2, 32)), poses3D, start_joints, end_joints)
+    assert np.allclose(lengths2D, [11.0, 22.0])
+    assert np.allclose(lengths3D, [3.0, 3.0])
+
+
+def test_compute_reprojection_residuals(persons, camera_intrinsics):
+    residuals = compute_reprojection_residuals(*persons, camera_intrinsics)
+    error = compute_reprojection_error(*persons, camera_intrinsics)
+    assert residuals.shape == (3 * 32,)
+    assert np.allclose(np.linalg.norm(residuals), error)
+
+
+def test_compute_reprojection_jacobian(persons, camera_intrinsics):
+    translations, keypoints3D, keypoints2D = persons
+    jacobian = compute_reprojection_jacobian(
+        translations, keypoints3D, keypoints2D, camera_intrinsics).toarray()
+    numerical_jacobian = np.zeros_like(jacobian)
+    for arg in range(len(translations)):
+        step = np.zeros_like(translations)
+        step[arg] = 1e-3
+        residuals_A = compute_reprojection_residuals(
+            translations + step, keypoints3D, keypoints2D, camera_intrinsics)
+        residuals_B = compute_reprojection_residuals(
+            translations - step, keypoints3D, keypoints2D, camera_intrinsics)
+        numerical_jacobian[:, arg] = (residuals_A - residuals_B) / 2e-3
+    assert np.allclose(jacobian, numerical_jacobian, atol=1e-6)
+    sparsity = compute_reprojection_sparsity(3, 16)
+    assert sparsity.shape == jacobian.shape
+    assert np.all(sparsity[jacobian != 0] == 1)
+    assert np.sum(sparsity) == 3 * 32 * 3
+
+
+def test_compute_optimized_pose3D(persons, camera_intrinsics):
+    translations, keypoints3D, keypoints2D = persons
+    poses3D, projections2D = compute_optimized_pose3D(
+        keypoints3D, np.reshape(translations, (-1, 3)), camera_intrinsics)
+    residuals = compute_reprojection_residuals(*persons, camera_intrinsics)
+    assert poses3D.shape == (3, 16, 3)
+    assert projections2D.shape == (3, 1, 32)
+    assert np.allclose(np.ravel(keypoints2D) - np.ravel(projections2D),
+                       residuals)
+
+
+def test_human_poses3D_to_poses6D():
+    poses3D = np.random.RandomState(0).randn(4, 32, 3) * 300
+    rotations, translations = human_poses3D_to_poses6D(poses3D)
+    assert rotations.shape == (4, 3, 3)
+    assert translations.shape == (4, 3)
+    identities = np.matmul(rotations, np.transpose(rotations, (0, 2, 1)))
+    assert np.allclose(identities, np.identity(3))
+    for person_arg, pose3D in enumerate(poses3D):
+        rotation, translation = human_pose3D_to_pose6D(pose3D)
+        assert np.allclose(rotation, rotations[person_arg])
+        assert np.allclose(translation, translations[person_arg])
+        assert np.allclose(translation, pose3D[0] / 1e3)
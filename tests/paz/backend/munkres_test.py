@@ -1,4 +1,6 @@
+import numpy as np
 from paz.processors import Munkres
+from paz.processors import LinearAssignment
 from paz.backend import munkres
 import pytest
 
@@ -104,3 +106,32 @@ def test_matrix_cost(cost_matrices):
 def test_get_min_value(rectangular_cost_matrix, expected_min_value):
     min_value = munkres.get_min_value(rectangular_cost_matrix[0])
     assert (min_value == expected_min_value)
+
+
+def test_solve_assignment_cost(cost_matrices):
+    solve_assignment = LinearAssignment()
+    for cost_matrix, expected_total in cost_matrices:
+        indexes = solve_assignment(cost_matrix)
+        total_cost = 0
+        for r, c in indexes:
+            total_cost += cost_matrix[r][c]
+        assert np.isclose(expected_total, total_cost)
+
+
+@pytest.mark.parametrize('shape', [(5, 5), (4, 7), (7, 4), (1, 3)])
+def test_solve_assignment_matches_munkres(shape):
+    cost_matrix = np.random.RandomState(0).randint(0, 10, shape)
+    indexes = munkres.solve_assignment(cost_matrix)
+    munkres_indexes = Munkres().compute(cost_matrix.tolist())
+    assert len(indexes) == min(shape)
+    assert indexes == sorted(indexes)
+    assert len(set([c for r, c in indexes])) == len(indexes)
+    total_cost = sum([cost_matrix[r, c] for r, c in indexes])
+    munkres_cost = sum([cost_matrix[r, c] for r, c in munkres_indexes])
+    assert total_cost == munkres_cost
+
+
+def test_solve_assignment_unsolvable():
+    cost_matrix = [[1, DISALLOWED], [2, DISALLOWED]]
+    with pytest.raises(munkres.UnsolvableMatrix):
+        munkres.solve_assignment(cost_matrix)
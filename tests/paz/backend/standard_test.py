@@ -172,3 +172,45 @@ def test_max_pooling_2d(max_pooling_2d_test_matrix,
 
     assert np.allclose(valid_max_pool, valid_max_pooled_2d_matrix)
     assert np.allclose(same_max_pool, same_max_pooled_2d_matrix)
+
+
+def test_predict_batch():
+    inputs = [np.full((2, 3), value) for value in range(5)]
+    model_calls = []
+
+    def model(x):
+        model_calls.append(len(x))
+        return x * 2.0
+    outputs = standard.predict_batch(
+        inputs, model, lambda x: x[np.newaxis], np.squeeze, batch_size=2)
+    assert model_calls == [2, 2, 1]
+    assert len(outputs) == len(inputs)
+    for x, y in zip(inputs, outputs):
+        assert np.allclose(y, x * 2.0)
+
+
+def test_predict_batch_with_padding():
+    inputs = [np.full((2, 3), value) for value in range(5)]
+    model_calls = []
+
+    def model(x):
+        model_calls.append(len(x))
+        return [x * 2.0, x + 1.0]
+    outputs = standard.predict_batch(
+        inputs, model, lambda x: x[np.newaxis], batch_size=2, pad_batch=True)
+    assert model_calls == [2, 2, 2]
+    assert len(outputs) == len(inputs)
+    for x, (y_scaled, y_shifted) in zip(inputs, outputs):
+        assert np.allclose(y_scaled, x[np.newaxis] * 2.0)
+        assert np.allclose(y_shifted, x[np.newaxis] + 1.0)
+
+
+def test_pad_batch_dimension():
+    x = np.ones((3, 2, 2), dtype=np.float32)
+    padded_x = standard.pad_batch_dimension(x, 5)
+    assert padded_x.shape == (5, 2, 2)
+    assert padded_x.dtype == np.float32
+    assert np.allclose(padded_x[:3], x)
+    assert np.allclose(padded_x[3:], 0.0)
+    with pytest.raises(ValueError):
+        standard.pad_batch_dimension(x, 2)
@@ -0,0 +1,86 @@
+import os
+import mmap
+
+import pytest
+import numpy as np
+
+from paz.abstract import ColumnarDataset
+from paz.datasets import VOC
+from paz.datasets.cache import (
+    write_annotations, read_annotations, load_cached_annotations)
+
+
+def is_memory_mapped(array):
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def assert_same_data(data, cached_data):
+    assert len(data) == len(cached_data)
+    for sample, cached_sample in zip(data, cached_data):
+        assert set(sample.keys()) == set(cached_sample.keys())
+        for key, value in sample.items():
+            if isinstance(value, str):
+                assert value == cached_sample[key]
+            else:
+                assert np.array_equal(value, cached_sample[key])
+
+
+def test_write_and_read_annotations(tmpdir):
+    data = [{'image': 'ümlaut_%d.jpg' % arg,
+             'boxes': np.random.rand(arg, 5)} for arg in range(4)]
+    directory = os.path.join(str(tmpdir), 'annotations')
+    write_annotations(directory, data)
+    cached_data = read_annotations(directory)
+    assert_same_data(data, cached_data)
+    assert is_memory_mapped(cached_data[1]['boxes'])
+    assert not cached_data[1]['boxes'].flags.writeable
+    cached_data = read_annotations(directory, mmap=False)
+    assert_same_data(data, cached_data)
+    assert not is_memory_mapped(cached_data[1]['boxes'])
+
+
+@pytest.mark.parametrize('evaluate', [True, False])
+def test_VOC_cache(VOC_path, tmpdir, evaluate):
+    cache_directory = os.path.join(str(tmpdir), 'cache')
+    data = VOC(VOC_path, evaluate=evaluate).load_data()
+    args = (VOC_path, 'train', 'all', 'VOC2007', True, evaluate, True,
+            cache_directory)
+    assert_same_data(data, VOC(*args).load_data())
+    assert len(os.listdir(cache_directory)) == 1
+    assert_same_data(data, VOC(*args).load_data())
+    assert len(os.listdir(cache_directory)) == 1
+
+
+def test_cache_key_changes_with_sources(tmpdir):
+    source_path = os.path.join(str(tmpdir), 'labels.txt')
+    cache_directory = os.path.join(str(tmpdir), 'cache')
+    with open(source_path, 'w') as filedata:
+        filedata.write('0.5')
+
+    def load_data():
+        with open(source_path, 'r') as filedata:
+            return [{'boxes': np.full((1, 5), float(filedata.read()))}]
+
+    args = ('labels', [source_path], {'split': 'train'}, cache_directory)
+    assert load_cached_annotations(load_data, *args)[0]['boxes'][0, 0] == 0.5
+    with open(source_path, 'w') as filedata:
+        filedata.write('0.75')
+    os.utime(source_path, ns=(0, 0))
+    assert load_cached_annotations(load_data, *args)[0]['boxes'][0, 0] == 0.75
+    assert len(os.listdir(cache_directory)) == 2
+
+
+def test_VOC_columnar(VOC_path, tmpdir):
+    cache_directory = os.path.join(str(tmpdir), 'cache')
+    data = VOC(VOC_path).load_data()
+    columnar_data = VOC(VOC_path, columnar=True).load_data()
+    assert isinstance(columnar_data, ColumnarDataset)
+    assert_same_data(data, columnar_data)
+    cached_data = VOC(VOC_path, cache=True, columnar=True,
+                      cache_directory=cache_directory).load_data()
+    assert isinstance(cached_data, ColumnarDataset)
+    assert_same_data(data, cached_data)
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+
+XML = """<annotation>
+    <filename>{0}.jpg</filename>
+    <size><width>200</width><height>100</height></size>
+    <object>
+        <name>dog</name><difficult>0</difficult>
+        <bndbox><xmin>11</xmin><ymin>21</ymin><xmax>51</xmax><ymax>61</ymax>
+        </bndbox>
+    </object>
+    <object>
+        <name>cat</name><difficult>{1}</difficult>
+        <bndbox><xmin>1</xmin><ymin>1</ymin><xmax>{2}</xmax><ymax>41</ymax>
+        </bndbox>
+    </object>
+</annotation>
+"""
+
+
+@pytest.fixture
+def VOC_path(tmpdir):
+    dataset_path = os.path.join(str(tmpdir), 'VOCdevkit', 'VOC2007')
+    annotations_path = os.path.join(dataset_path, 'Annotations')
+    split_path = os.path.join(dataset_path, 'ImageSets', 'Main')
+    os.makedirs(annotations_path)
+    os.makedirs(split_path)
+    names = ['%06d' % arg for arg in range(6)]
+    for arg, name in enumerate(names):
+        filepath = os.path.join(annotations_path, name + '.xml')
+        with open(filepath, 'w') as filedata:
+            filedata.write(XML.format(name, arg % 2, 100 + arg))
+    with open(os.path.join(split_path, 'train.txt'), 'w') as filedata:
+        filedata.write('\n'.join(names))
+    return os.path.join(str(tmpdir), 'VOCdevkit')
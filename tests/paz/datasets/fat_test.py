@@ -0,0 +1,39 @@
+import os
+import json
+
+import pytest
+import numpy as np
+
+from paz.datasets import FAT
+
+
+@pytest.fixture
+def FAT_path(tmpdir):
+    for scene_arg in range(2):
+        scene_path = os.path.join(str(tmpdir), 'mixed', 'scene_%d' % scene_arg)
+        os.makedirs(scene_path)
+        for frame_arg in range(3):
+            for side in ['left', 'right']:
+                name = os.path.join(scene_path, '%06d.%s' % (frame_arg, side))
+                open(name + '.jpg', 'w').close()
+                objects = [{'bounding_box': {'top_left': [54, 96 * arg],
+                                             'bottom_right': [108, 192]},
+                            'class': '002_master_chef_can_16k'}
+                           for arg in range(frame_arg)]
+                with open(name + '.json', 'w') as filedata:
+                    json.dump({'objects': objects}, filedata)
+    return str(tmpdir) + '/'
+
+
+@pytest.mark.parametrize('num_workers, use_processes', [(3, False), (2, True)])
+def test_FAT_parallel_parsing(FAT_path, num_workers, use_processes):
+    data = FAT(FAT_path).load_data()
+    parallel_data = FAT(FAT_path, num_workers=num_workers,
+                        use_processes=use_processes).load_data()
+    # frames without objects are skipped
+    assert len(data) == len(parallel_data) == 8
+    for sample, parallel_sample in zip(data, parallel_data):
+        assert sample['image'] == parallel_sample['image']
+        assert np.array_equal(sample['boxes'], parallel_sample['boxes'])
+    class_arg = FAT(FAT_path).class_to_arg['002_master_chef_can']
+    assert np.allclose(data[0]['boxes'], [[0.0, 0.1, 0.2, 0.2, class_arg]])
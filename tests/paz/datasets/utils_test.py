@@ -0,0 +1,24 @@
+import time
+
+import pytest
+
+from paz.datasets.utils import map_files
+
+
+def parse(filepath):
+    time.sleep(0.001 * (len(filepath) % 3))
+    return filepath.upper()
+
+
+@pytest.mark.parametrize('num_workers, use_processes',
+                         [(0, False), (4, False), (2, True)])
+def test_map_files_order(num_workers, use_processes):
+    filepaths = ['file_%d.xml' % arg for arg in range(50)]
+    outputs = map_files(parse, filepaths, num_workers, use_processes, 4)
+    assert list(outputs) == [filepath.upper() for filepath in filepaths]
+
+
+def test_map_files_throughput(capsys):
+    filepaths = ['file_%d.xml' % arg for arg in range(10)]
+    list(map_files(parse, filepaths, 2, name='test'))
+    assert 'test: parsed 10 files' in capsys.readouterr().out
@@ -0,0 +1,31 @@
+import pytest
+import numpy as np
+
+from paz.datasets import VOC
+
+
+@pytest.mark.parametrize('num_workers, use_processes', [(3, False), (2, True)])
+def test_VOC_parallel_parsing(VOC_path, num_workers, use_processes):
+    data = VOC(VOC_path, evaluate=True).load_data()
+    parallel_data = VOC(VOC_path, evaluate=True, num_workers=num_workers,
+                        use_processes=use_processes).load_data()
+    assert len(data) == len(parallel_data) == 6
+    for sample, parallel_sample in zip(data, parallel_data):
+        assert sample['image'] == parallel_sample['image']
+        assert np.array_equal(sample['boxes'], parallel_sample['boxes'])
+        assert np.array_equal(sample['difficulties'],
+                              parallel_sample['difficulties'])
+
+
+def test_VOC_without_difficult_samples(VOC_path):
+    data = VOC(VOC_path, with_difficult_samples=False).load_data()
+    num_boxes = [len(sample['boxes']) for sample in data]
+    assert num_boxes == [2, 1, 2, 1, 2, 1]
+    assert np.allclose(data[0]['boxes'][0], [0.05, 0.2, 0.25, 0.6, 12])
+
+
+def test_VOC_verbose(VOC_path, capsys):
+    VOC(VOC_path, num_workers=2).load_data()
+    assert capsys.readouterr().out == ''
+    VOC(VOC_path, num_workers=2, verbose=True).load_data()
+    assert 'VOC2007 train: parsed 6 files' in capsys.readouterr().out
@@ -1,6 +1,10 @@
 import numpy as np
 import pytest
 from paz.optimization.losses.multi_box_loss import MultiBoxLoss
+from paz.optimization.losses.multi_box_loss import CompactMultiBoxLoss
+from paz.backend.boxes import to_sparse_boxes
+from paz.models.detection.utils import create_prior_boxes
+from paz.pipelines import PreprocessBoxes
 
 
 @pytest.fixture
@@ -121,3 +125,50 @@ def test_negative_classification_loss(y_true, y_pred, loss,
         negative_classification_loss, dtype='float32')
     assert np.allclose(
         negative_classification_loss, target_negative_classification_loss)
+
+
+@pytest.fixture
+def y_true_class_index(y_true):
+    class_args = np.argmax(y_true[:, :, 4:], axis=-1)[..., None]
+    return np.concatenate([y_true[:, :, :4], class_args], axis=-1)
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_compact_multiboxloss(y_true_class_index, y_pred, sparse,
+                              target_multibox_loss,
+                              target_localization_loss,
+                              target_positive_classification_loss,
+                              target_negative_classification_loss):
+    y_true = y_true_class_index
+    if sparse:
+        y_true = to_sparse_boxes(y_true[0], 5)[None]
+    loss = CompactMultiBoxLoss(sparse=sparse)
+    assert np.allclose(loss.compute_loss(y_true, y_pred),
+                       target_multibox_loss)
+    assert np.allclose(loss.localization(y_true, y_pred),
+                       target_localization_loss)
+    assert np.allclose(loss.positive_classification(y_true, y_pred),
+                       target_positive_classification_loss)
+    assert np.allclose(loss.negative_classification(y_true, y_pred),
+                       target_negative_classification_loss)
+
+
+def test_compact_multiboxloss_with_many_positives():
+    prior_boxes = create_prior_boxes('VOC')
+    x_min = np.linspace(0.0, 0.6, 10)
+    boxes = np.stack([x_min, x_min / 2.0, x_min + 0.3, x_min / 2.0 + 0.4,
+                      np.arange(1, 11)], axis=1)
+    args = (21, prior_boxes, 0.5, [0.1, 0.1, 0.2, 0.2])
+    y_true = PreprocessBoxes(*args, 'class_index')(boxes.copy())
+    num_positives = np.sum(y_true[:, 4] > 0)
+    assert num_positives > 50
+    with pytest.raises(ValueError):
+        PreprocessBoxes(*args, 'sparse', 50)(boxes.copy())
+    y_sparse = PreprocessBoxes(*args, 'sparse', num_positives)(boxes.copy())
+    y_pred = np.random.rand(1, len(prior_boxes), 4 + 21).astype('float32')
+    y_pred[:, :, 4:] = y_pred[:, :, 4:] / np.sum(
+        y_pred[:, :, 4:], axis=-1, keepdims=True)
+    dense_loss = CompactMultiBoxLoss().compute_loss(y_true[None], y_pred)
+    sparse_loss = CompactMultiBoxLoss(sparse=True).compute_loss(
+        y_sparse[None], y_pred)
+    assert np.allclose(dense_loss, sparse_loss)
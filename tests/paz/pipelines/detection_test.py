@@ -14,6 +14,9 @@ from paz.pipelines import (
 from paz.pipelines import HaarCascadeFrontalFace
 from paz.pipelines import DetectFaceKeypointNet2D32
 from paz.pipelines import DetectMiniXceptionFER
+from paz.pipelines import PredictCroppedBoxes2D
+from paz.pipelines import PreprocessBoxes
+from paz.models.detection.utils import create_prior_boxes
 from paz.abstract.messages import Box2D
 
 
@@ -258,6 +261,19 @@ def test_SSD300VOC(image_with_everyday_objects, boxes_SSD300VOC):
     assert_inferences(detector, image_with_everyday_objects, boxes_SSD300VOC)
 
 
+def test_SSD300VOC_predict_batch(image_with_everyday_objects,
+                                 boxes_SSD300VOC):
+    detector = SSD300VOC(draw=False)
+    images = [image_with_everyday_objects, image_with_everyday_objects]
+    for inferences in detector.predict_batch(images):
+        predicted_boxes2D = inferences['boxes2D']
+        assert len(predicted_boxes2D) == len(boxes_SSD300VOC)
+        for box2D, predicted_box2D in zip(boxes_SSD300VOC, predicted_boxes2D):
+            assert np.allclose(box2D.coordinates, predicted_box2D.coordinates)
+            assert np.allclose(box2D.score, predicted_box2D.score)
+            assert (box2D.class_name == predicted_box2D.class_name)
+
+
 def test_SSD300FAT(image_with_tools, boxes_SSD300FAT):
     detector = SSD300FAT(0.5)
     assert_inferences(detector, image_with_tools, boxes_SSD300FAT)
@@ -294,6 +310,37 @@ def test_boxes_DetectFaceKeypointNet2D32(image_with_faces,
     assert_inferences(detector, image_with_faces, boxes_FaceKeypointNet2D32)
 
 
+def test_DetectMiniXceptionFER_with_padded_batch(image_with_faces,
+                                                 boxes_MiniXceptionFER):
+    cv2.ocl.setUseOpenCL(False)
+    cv2.setNumThreads(1)
+    cv2.setRNGSeed(777)
+    detector = DetectMiniXceptionFER(batch_size=4, pad_batch=True)
+    assert_inferences(detector, image_with_faces, boxes_MiniXceptionFER)
+
+
+def test_PredictCroppedBoxes2D_batches_crops():
+    class Estimate(object):
+        def __init__(self):
+            self.batch_sizes = []
+
+        def __call__(self, image):
+            return image.shape
+
+        def predict_batch(self, images, batch_size, pad_batch):
+            self.batch_sizes.append(len(images))
+            return [self(image) for image in images]
+
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    boxes2D = [Box2D([10, 10, 30, 50], 1.0, 'a'),
+               Box2D([50, 50, 90, 70], 1.0, 'b')]
+    estimate = Estimate()
+    boxes2D, predictions = PredictCroppedBoxes2D(estimate)(image, boxes2D)
+    assert estimate.batch_sizes == [2]
+    assert predictions == [(40, 40, 3), (40, 40, 3)]
+    assert [box2D.class_name for box2D in boxes2D] == ['a', 'b']
+
+
 @pytest.mark.parametrize(('detection_pipeline, boxes_EFFICIENTDETDXCOCO'),
                          [
                             (EFFICIENTDETD0COCO, boxes_EFFICIENTDETD0COCO),
@@ -312,3 +359,20 @@ def test_EFFICIENTDETDXCOCO(
     boxes_EFFICIENTDETDXCOCO = boxes_EFFICIENTDETDXCOCO()
     assert_inferences(
         detector, image_with_multiple_objects, boxes_EFFICIENTDETDXCOCO)
+
+
+def test_PreprocessBoxes_encodings():
+    prior_boxes = create_prior_boxes('VOC')
+    boxes = np.array([[0.1, 0.1, 0.4, 0.5, 3.0], [0.5, 0.2, 0.9, 0.8, 7.0]])
+    args = (21, prior_boxes, 0.5, [0.1, 0.1, 0.2, 0.2])
+    one_hot = PreprocessBoxes(*args)(boxes.copy())
+    class_index = PreprocessBoxes(*args, 'class_index')(boxes.copy())
+    sparse = PreprocessBoxes(*args, 'sparse', 50)(boxes.copy())
+    assert one_hot.shape == (len(prior_boxes), 4 + 21)
+    assert class_index.shape == (len(prior_boxes), 4 + 1)
+    assert sparse.shape == (50, 6)
+    assert np.array_equal(np.argmax(one_hot[:, 4:], axis=1), class_index[:, 4])
+    positive_args = np.flatnonzero(class_index[:, 4])
+    num_positives = len(positive_args)
+    assert np.array_equal(sparse[:num_positives, 0], positive_args)
+    assert np.all(sparse[num_positives:, 0] == -1)
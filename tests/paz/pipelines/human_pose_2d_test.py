@@ -1,9 +1,13 @@
 import pytest
 import os
 import numpy as np
+from tensorflow.keras.layers import Input, Conv2D, UpSampling2D
+from tensorflow.keras.models import Model
 from tensorflow.keras.utils import get_file
 from paz.backend.image import load_image
 from paz.applications import HigherHRNetHumanPose2D
+from paz.pipelines import GetHeatmapsAndTags, GetMultiScaleHeatmapsAndTags
+from paz import processors as pr
 
 
 @pytest.fixture
@@ -148,3 +152,43 @@ def test_DetectHumanPose2D_multi_person(image_with_multi_person,
     inferences = detect(image_with_multi_person)
     assert np.allclose(inferences['scores'], labeled_scores_multi_person)
     assert np.allclose(inferences['keypoints'], labeled_joint_multi_person)
+
+
+@pytest.fixture
+def heatmaps_model():
+    image = Input(shape=(None, None, 3))
+    x = Conv2D(34, 3, strides=4, padding='same')(image)
+    y = Conv2D(17, 3, padding='same')(UpSampling2D()(x))
+    return Model(image, [x, y])
+
+
+@pytest.mark.parametrize('data_with_center', [False, True])
+def test_GetHeatmapsAndTags_batch_flip(heatmaps_model, flipped_joint_order,
+                                       data_with_center):
+    image = np.random.RandomState(0).rand(1, 64, 96, 3).astype(np.float32)
+    outputs = []
+    for batch_flip in [False, True]:
+        get_heatmaps_and_tags = GetHeatmapsAndTags(
+            heatmaps_model, flipped_joint_order, True, data_with_center,
+            batch_flip=batch_flip)
+        outputs.append(get_heatmaps_and_tags(image))
+    for output, batched_output in zip(*outputs):
+        assert np.allclose(output, batched_output, atol=1e-6)
+
+
+def test_GetMultiScaleHeatmapsAndTags(heatmaps_model, flipped_joint_order):
+    image = np.random.RandomState(0).rand(1, 64, 96, 3).astype(np.float32)
+    aggregate = pr.AggregateResults(with_flip=True)
+    get_heatmaps_and_tags = GetHeatmapsAndTags(
+        heatmaps_model, flipped_joint_order, True, False)
+    heatmaps, tags = aggregate(*get_heatmaps_and_tags(image))
+    get_multi_scale = GetMultiScaleHeatmapsAndTags(
+        heatmaps_model, flipped_joint_order, True, False)
+    scale_heatmaps, scale_tags = aggregate(*get_multi_scale([image]))
+    assert np.allclose(heatmaps, scale_heatmaps, atol=1e-6)
+    assert np.allclose(tags, scale_tags, atol=1e-6)
+    small_image = image[:, ::2, ::2]
+    scale_heatmaps, scale_tags = get_multi_scale([image, small_image, image])
+    assert len(scale_heatmaps) == len(scale_tags) == 6
+    for scale_heatmap in scale_heatmaps:
+        assert scale_heatmap.shape == (1, 17, 64, 96)
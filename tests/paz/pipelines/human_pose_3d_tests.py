@@ -212,6 +212,9 @@ def test_simple_baselines_multiple_persons(image_with_multiple_persons,
     predicted_rotation, predicted_translation = keypoints['pose6D']
     assert np.allclose(predicted_rotation, pose6D_multiple_persons[0])
     assert np.allclose(predicted_translation, pose6D_multiple_persons[1])
+    assert len(keypoints['poses6D']) == len(keypoints['keypoints3D'])
+    assert np.allclose(keypoints['poses6D'][0].translation,
+                       pose6D_multiple_persons[1])
 
 
 def test_simple_baselines_single_person(image_with_single_person,
@@ -1,12 +1,19 @@
 import pytest
 import os
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from tensorflow.keras.utils import get_file
+from tensorflow.keras.layers import Input, Conv2D
+from tensorflow.keras.models import Model
 from paz.abstract import Box2D, Pose6D
 
 from paz.backend.image import load_image
 from paz.backend.camera import Camera
 from paz.pipelines import PIX2YCBTools6D
+from paz.pipelines import MultiInstanceMultiClassPIX2POSE6D
+from paz.pipelines import SingleInstancePIX2POSE6D
+from paz.pipelines.pose import EfficientPosePostprocess
+from paz.backend.boxes import nms_per_class_args, to_corner_form
 
 
 @pytest.fixture
@@ -81,3 +88,124 @@ def test_PIX2YCBTools6D(image_with_YCB_objects, true_boxes2D, true_poses6D):
     inferences = pipeline(image_with_YCB_objects)
     assert_boxes2D(true_boxes2D, inferences['boxes2D'])
     assert_poses6D(true_poses6D, inferences['poses6D'])
+
+
+def test_PIX2YCBTools6D_batched(image_with_YCB_objects, true_boxes2D,
+                                true_poses6D):
+    camera = Camera()
+    camera.intrinsics_from_HFOV(55, image_with_YCB_objects.shape)
+    pipeline = PIX2YCBTools6D(camera, batch_size=2, num_threads=2)
+    inferences = pipeline(image_with_YCB_objects)
+    assert_boxes2D(true_boxes2D, inferences['boxes2D'])
+    assert_poses6D(true_poses6D, inferences['poses6D'])
+
+
+def test_MultiInstanceMultiClassPIX2POSE6D_batched_estimate_poses():
+    def build_model():
+        inputs = Input((32, 32, 3))
+        outputs = Conv2D(3, 3, padding='same', activation='sigmoid')(inputs)
+        return Model(inputs, outputs)
+
+    camera = Camera()
+    camera.intrinsics_from_HFOV(55, (120, 160))
+    name_to_size = {'a': np.array([0.2, 0.2, 0.1]),
+                    'b': np.array([0.1, 0.3, 0.1])}
+    name_to_model = {'a': build_model(), 'b': build_model()}
+    pipeline = MultiInstanceMultiClassPIX2POSE6D(
+        None, name_to_model, name_to_size, camera, [0, 0], draw=False,
+        batch_size=2, num_threads=2)
+    images = [np.random.randint(0, 255, (40 + 5 * arg, 50, 3), 'uint8')
+              for arg in range(5)]
+    boxes2D = [Box2D([10 * arg, 0, 10 * arg + 50, 40 + 5 * arg], 1.0,
+                     'ab'[arg % 2]) for arg in range(5)]
+    inferences = pipeline.estimate_poses(images, boxes2D)
+    assert len(inferences) == len(images)
+    for image, box2D, batch_inferences in zip(images, boxes2D, inferences):
+        points2D, points3D, pose6D = pipeline.estimate_pose(image, box2D)
+        assert np.allclose(points2D, batch_inferences[0])
+        assert np.allclose(points3D, batch_inferences[1])
+        if pose6D is None:
+            assert batch_inferences[2] is None
+        else:
+            assert np.allclose(pose6D.quaternion,
+                               batch_inferences[2].quaternion)
+            assert np.allclose(pose6D.translation,
+                               batch_inferences[2].translation)
+    executor = pipeline.executor
+    pipeline.close()
+    assert pipeline.executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+def test_SingleInstancePIX2POSE6D_predict_batch_keeps_class_name():
+    inputs = Input((32, 32, 3))
+    outputs = Conv2D(3, 3, padding='same', activation='sigmoid')(inputs)
+    camera = Camera()
+    camera.intrinsics_from_HFOV(55, (120, 160))
+    pipeline = SingleInstancePIX2POSE6D(
+        Model(inputs, outputs), np.array([0.2, 0.2, 0.1]), camera,
+        epsilon=0.0, class_name='a', draw=False)
+    images = [np.random.randint(0, 255, (40, 50, 3), 'uint8')
+              for arg in range(4)]
+    boxes2D = [Box2D([0, 0, 50, 40], 1.0, 'bc'[arg % 2])
+               for arg in range(4)]
+    with ThreadPoolExecutor(2) as executor:
+        inferences = pipeline.predict_batch(images, boxes2D, None, executor)
+    assert pipeline.class_name == 'a'
+    for box2D, batch_inferences in zip(boxes2D, inferences):
+        if batch_inferences['pose6D'] is not None:
+            assert batch_inferences['pose6D'].class_name == box2D.class_name
+
+
+class PriorBoxesModel(object):
+    def __init__(self, prior_boxes):
+        self.prior_boxes = prior_boxes
+
+
+def test_EfficientPosePostprocess_pairs_poses_with_prior_boxes():
+    # center form priors, prior 0 is suppressed by prior 1 and prior 3 is
+    # below the score threshold
+    prior_boxes = np.array([[0.20, 0.20, 0.2, 0.2],
+                            [0.23, 0.20, 0.2, 0.2],
+                            [0.70, 0.70, 0.2, 0.2],
+                            [0.50, 0.20, 0.2, 0.2],
+                            [0.20, 0.70, 0.2, 0.2]])
+    class_scores = np.array([[0.3, 0.7, 0.0],
+                             [0.1, 0.9, 0.0],
+                             [0.2, 0.0, 0.8],
+                             [0.7, 0.3, 0.0],
+                             [0.05, 0.0, 0.95]])
+    num_priors = len(prior_boxes)
+    detections = np.concatenate(
+        [np.zeros((num_priors, 4)), class_scores], axis=1)[None]
+    prior_args = np.arange(num_priors, dtype=float)
+    rotations = np.stack([np.zeros(num_priors), np.zeros(num_priors),
+                          0.1 * (prior_args + 1)], axis=1)
+    translations = np.repeat(prior_args[:, None], 3, axis=1)
+    transformations = np.concatenate([rotations, translations], axis=1)[None]
+
+    postprocess = EfficientPosePostprocess(
+        PriorBoxesModel(prior_boxes), ['background', 'a', 'b'], 0.5, 0.45,
+        np.eye(3), lambda translations: translations[0],
+        lambda translations, camera_matrix, image_scale: translations,
+        class_arg=0)
+    image = np.zeros((100, 100, 3))
+    boxes2D, poses6D = postprocess(
+        image, (detections, transformations), np.array(1.0))
+
+    box_data = np.concatenate(
+        [to_corner_form(prior_boxes), class_scores[:, 1:]], axis=1)
+    selected_args, _ = nms_per_class_args(box_data, 0.45)
+    is_confident = np.max(class_scores[selected_args, 1:], axis=1) >= 0.5
+    selected_args = selected_args[is_confident]
+    assert sorted(selected_args) == [1, 2, 4]
+    assert len(boxes2D) == len(poses6D) == len(selected_args)
+    corners = to_corner_form(prior_boxes) * 100
+    for prior_arg, box2D, pose6D in zip(selected_args, boxes2D, poses6D):
+        assert np.allclose(box2D.coordinates, corners[prior_arg], atol=1)
+        assert np.allclose(pose6D.translation, prior_arg)
+        rotation = np.pi * rotations[prior_arg]
+        quaternion = Pose6D.from_rotation_vector(rotation, [0, 0, 0])
+        assert np.allclose(pose6D.quaternion, quaternion.quaternion)
+        assert pose6D.class_name == box2D.class_name
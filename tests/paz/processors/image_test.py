@@ -1,6 +1,10 @@
+import os
+import pickle
+
 import pytest
 import numpy as np
 from paz import processors as pr
+from paz.backend.image import write_image, write_image_store
 
 
 def test_DrawBoxes2D_with_invalid_class_names_type():
@@ -124,3 +128,52 @@ def test_AddGaussianNoise(mean, scale):
     image_noisy = add_gaussian_noise(image)
     assert image_noisy.shape == image.shape
     assert image_noisy.dtype == image.dtype
+
+
+@pytest.fixture
+def image_paths(tmpdir):
+    image_paths = []
+    for image_arg in range(3):
+        image = np.full((4, 6, 3), image_arg, dtype=np.uint8)
+        image_path = os.path.join(str(tmpdir), 'image_%d.png' % image_arg)
+        write_image(image_path, image)
+        image_paths.append(image_path)
+    return image_paths
+
+
+def test_LoadImage_from_image_store(tmpdir, image_paths):
+    directory = os.path.join(str(tmpdir), 'store')
+    write_image_store(directory, image_paths[:2])
+    load = pr.LoadImage(image_store=directory)
+    for image_arg, image_path in enumerate(image_paths):
+        image = load(image_path)
+        assert np.array_equal(image, np.full((4, 6, 3), image_arg))
+        image[:] = 255
+    # returned images are copies of the stored images
+    assert np.array_equal(load(image_paths[0]), np.zeros((4, 6, 3)))
+    with pytest.raises(ValueError):
+        pr.LoadImage(num_channels=1, image_store=directory)
+
+
+def test_LoadImage_cache(image_paths):
+    load = pr.LoadImage(cache_size=2)
+    image = load(image_paths[0])
+    image[:] = 255
+    assert np.array_equal(load(image_paths[0]), np.zeros((4, 6, 3)))
+    load(image_paths[1])
+    load(image_paths[0])
+    load(image_paths[2])
+    # least recently used image is removed
+    assert list(load._cache.keys()) == [image_paths[0], image_paths[2]]
+    load = pickle.loads(pickle.dumps(load))
+    assert len(load._cache) == 0
+    assert np.array_equal(load(image_paths[2]), np.full((4, 6, 3), 2))
+
+
+def test_BlendRandomCroppedBackground_with_pool(image_paths):
+    blend = pr.BlendRandomCroppedBackground(image_paths, pool_size=2)
+    image = np.zeros((4, 6, 4), dtype=np.uint8)
+    for _ in range(5):
+        blended_image = blend(image)
+        assert blended_image.shape == (4, 6, 3)
+    assert len(blend.background_pool) == 2
@@ -110,3 +110,52 @@ def test_Scale(object_sizes):
     values = np.array([1.0, 0.5, 0.25])
     scaled_values = scale(values)
     assert np.allclose(scaled_values, values * object_sizes)
+
+
+@pytest.mark.parametrize(('score_thresh, nms_thresh'),
+                         [(0.5, 0.45), (0.9, 0.45), (0.3, 0.75)])
+def test_DecodeAndSuppressBoxes2D(score_thresh, nms_thresh):
+    random_state = np.random.RandomState(777)
+    class_names = ['background', 'cat', 'dog', 'bird']
+    prior_boxes = random_state.uniform(0.1, 0.9, (1000, 4))
+    prior_boxes[:, 2:] = prior_boxes[:, 2:] / 4.0
+    offsets = random_state.normal(0.0, 1.0, (1000, 4))
+    scores = random_state.rand(1000, len(class_names))
+    predictions = np.concatenate([offsets, scores], axis=1)[np.newaxis]
+    postprocess = pr.SequentialProcessor([
+        pr.Squeeze(axis=None),
+        pr.DecodeBoxes(prior_boxes),
+        pr.RemoveClass(list(class_names), 0),
+        pr.NonMaximumSuppressionPerClass(nms_thresh),
+        pr.MergeNMSBoxWithClass(),
+        pr.FilterBoxes(class_names[1:], score_thresh),
+        pr.ToBoxes2D(class_names[1:])])
+    decode_and_suppress = pr.DecodeAndSuppressBoxes2D(
+        prior_boxes, list(class_names), score_thresh, nms_thresh, class_arg=0)
+    boxes2D = postprocess(predictions)
+    fused_boxes2D = decode_and_suppress(predictions)
+    assert len(fused_boxes2D) == len(boxes2D)
+    for fused_box2D, box2D in zip(fused_boxes2D, boxes2D):
+        assert np.all(fused_box2D.coordinates == box2D.coordinates)
+        assert fused_box2D.score == box2D.score
+        assert fused_box2D.class_name == box2D.class_name
+
+
+def test_AdjustKeypointsLocations():
+    heatmaps = np.zeros((1, 2, 4, 4))
+    heatmaps[0, 0, 2, 3] = 1.0
+    heatmaps[0, 1, 0, 1] = 1.0
+    keypoints = np.array([[[2.0, 2.0, 0.5, 0, 0], [1.0, 1.0, 0.0, 0, 0]]])
+    adjusted = pr.AdjustKeypointsLocations()(heatmaps, [keypoints])[0]
+    assert np.allclose(adjusted[0, 0, :2], [2.75, 2.25])
+    assert np.allclose(adjusted[0, 1, :2], [1.0, 1.0])
+
+
+def test_RefineKeypointsLocations():
+    heatmaps = np.zeros((2, 4, 4))
+    heatmaps[1, 3, 1] = 0.8
+    tags = np.zeros((2, 4, 4))
+    keypoints = np.array([[[1.0, 2.0, 0.9, 0, 0], [0.0, 0.0, 0.0, 0, 0]]])
+    refined = pr.RefineKeypointsLocations()(heatmaps, tags, keypoints)
+    assert np.allclose(refined[0, 0, :3], [1.0, 2.0, 0.9])
+    assert np.allclose(refined[0, 1, :3], [1.25, 3.75, 0.8])
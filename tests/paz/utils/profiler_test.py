@@ -0,0 +1,75 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from paz import processors as pr
+from paz.abstract import Processor, SequentialProcessor
+from paz.abstract import processor as processor_module
+from paz.utils import Profiler
+
+
+class AddOne(Processor):
+    def __init__(self):
+        super(AddOne, self).__init__()
+
+    def call(self, x):
+        return x + 1.0
+
+
+class Pipeline(SequentialProcessor):
+    def __init__(self):
+        super(Pipeline, self).__init__()
+        self.add(AddOne())
+        self.add(pr.ControlMap(SequentialProcessor([AddOne(), AddOne()])))
+
+
+def test_profiler_records():
+    pipeline = Pipeline()
+    with Profiler() as profiler:
+        for call_arg in range(3):
+            values = pipeline(np.zeros((4, 4)))
+    assert processor_module.PROFILER is None
+    assert values[0].shape == (4, 4)
+    assert np.allclose(values[0], 3.0)
+    names = ['Pipeline', 'Pipeline/AddOne',
+             'Pipeline/ControlMap-SequentialProcessor',
+             'Pipeline/ControlMap-SequentialProcessor/SequentialProcessor',
+             'Pipeline/ControlMap-SequentialProcessor/SequentialProcessor/'
+             'AddOne']
+    assert sorted(profiler.records.keys()) == sorted(names)
+    assert profiler.records['Pipeline']['calls'] == 3
+    assert profiler.records[names[-1]]['calls'] == 6
+    assert profiler.records['Pipeline/AddOne']['output_bytes'] == 3 * 128
+    assert len(profiler.events) == 3 * 6
+    record = profiler.records['Pipeline']
+    assert record['self_time'] <= record['total_time']
+
+
+def test_profiler_writes_files(tmp_path):
+    with Profiler() as profiler:
+        Pipeline()(np.zeros(2))
+    lines = []
+    profiler.summary(lines.append)
+    assert len(lines) == 2 + len(profiler.records)
+    profiler.write_json(str(tmp_path / 'records.json'))
+    profiler.write_chrome_trace(str(tmp_path / 'trace.json'))
+    records = json.load(open(str(tmp_path / 'records.json')))
+    assert records[0]['name'] == 'Pipeline'
+    trace = json.load(open(str(tmp_path / 'trace.json')))
+    assert len(trace['traceEvents']) == len(profiler.events)
+
+
+def test_profiler_records_threads():
+    pipeline = Pipeline()
+    with Profiler() as profiler:
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(pipeline, [np.zeros(2)] * 40))
+    names = ['Pipeline', 'Pipeline/AddOne',
+             'Pipeline/ControlMap-SequentialProcessor',
+             'Pipeline/ControlMap-SequentialProcessor/SequentialProcessor',
+             'Pipeline/ControlMap-SequentialProcessor/SequentialProcessor/'
+             'AddOne']
+    assert sorted(profiler.records.keys()) == sorted(names)
+    assert profiler.records['Pipeline']['calls'] == 40
+    assert profiler.records[names[-1]]['calls'] == 80